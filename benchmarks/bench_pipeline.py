@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Times the whole pipeline and each stage over generated workloads of increasing size,
+    records peak memory and compares results against a baseline of the same host.
+    Run from repository root:
+    python -m benchmarks.bench_pipeline --against HEAD            # compare against HEAD, benchmarked in the same run
+    python -m benchmarks.bench_pipeline --update-baseline         # store results as baseline of this host
+    python -m benchmarks.bench_pipeline                           # compare against baseline of this host
+    python -m benchmarks.bench_pipeline --events 100,400 --horizons 365,730 --output results.json
+    Stage timings are the median of --repeat runs (default: 5). With --against, REV and the working tree
+    run in alternating rounds, which is the most robust comparison. Baselines hold absolute timings,
+    so they are stored per host in benchmarks/baselines/ (not version controlled) and a baseline
+    of another host is refused. Exits with status 1 if a stage is slower (or uses more memory)
+    than baseline beyond tolerance, and with status 2 if results are not comparable.
+    Comparing requires --repeat of at least 5, fewer runs are only allowed with --no-compare
+    or --update-baseline.
+"""
+from benchmarks import workload_runner
+
+from py_matplanering.core.schedule.schedule_serializer import ScheduleSerializer
+
+from py_matplanering.utilities import workload
+from py_matplanering.utilities.tracer import Tracer
+
+import argparse, io, json, os, platform, shutil, statistics, subprocess, sys, tempfile, time, tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'baselines')
+RESULTS_VERSION = 2
+# fewer runs per case are too noisy to fail on
+MIN_GATE_REPEAT = 5
+
+# stage => span name of traced builder method
+BUILDER_STAGES = dict(
+    candidates='ScheduleBuilder.build_candidates',
+    indeterminate_planning='ScheduleBuilder.plan_indeterminate_schedule',
+    determinate_planning='ScheduleBuilder.plan_determinate_schedule',
+    conflict_resolution='ScheduleBuilder.plan_resolve_conflicts'
+)
+STAGES = ['total', 'init_schedule_load'] + list(BUILDER_STAGES) + ['serialization']
+
+def make_case_name(n_events: int, horizon_days: int) -> str:
+    return 'e%s_h%s' % (n_events, horizon_days)
+
+def run_case(generated: dict, iterations: int) -> dict:
+    """ Runs workload once and returns stage timings in seconds. """
+    Tracer.reset()
+    Tracer.activate()
+    try:
+        run = workload_runner.run_workload(generated, iterations=iterations, seed=generated['params']['seed'])
+    finally:
+        Tracer.deactivate()
+    summary = Tracer.summarize(category='builder')
+    stages = dict(
+        init_schedule_load=run['init_schedule_load_s'] or 0.0
+    )
+    for stage, span_name in BUILDER_STAGES.items():
+        stages[stage] = summary[span_name]['wall_ms'] / 1e3 if span_name in summary else 0.0
+    start = time.perf_counter()
+    ScheduleSerializer(run['schedule']).dump(io.BytesIO())
+    stages['serialization'] = time.perf_counter() - start
+    stages['total'] = stages['init_schedule_load'] + run['build_s'] + stages['serialization']
+    return dict(
+        stages=stages,
+        placed_days=workload_runner.count_placed_days(run['schedule']),
+        days=len(run['schedule'].get_days())
+    )
+
+def measure_peak_memory(generated: dict, iterations: int) -> int:
+    """ Peak traced memory (bytes) of a separate (untimed) run, since tracemalloc slows down execution. """
+    tracemalloc.start()
+    try:
+        run = workload_runner.run_workload(generated, iterations=iterations, seed=generated['params']['seed'])
+        ScheduleSerializer(run['schedule']).dump(io.BytesIO())
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def get_default_baseline_path() -> str:
+    return os.path.join(DEFAULT_BASELINE_DIR, '%s.json' % (platform.node() or 'default'))
+
+def run_benchmarks(events: list, horizons: list, repeat: int=MIN_GATE_REPEAT, iterations: int=1, init_density: float=0.2,
+                   seed: int=0, memory: bool=True, progress: bool=True) -> dict:
+    """ Runs every combination of events and horizons. Timings are the median of repeat runs. """
+    cases = []
+    # warm up imports and per process caches (e.g. compiled boundary schemas) before timing
+    run_case(workload.generate_workload(n_events=min(events), horizon_days=min(horizons), init_density=init_density, seed=seed), iterations)
+    for horizon_days in horizons:
+        for n_events in events:
+            name = make_case_name(n_events, horizon_days)
+            generated = workload.generate_workload(n_events=n_events, horizon_days=horizon_days, init_density=init_density, seed=seed)
+            runs = [run_case(generated, iterations) for _ in range(repeat)]
+            stages = dict((stage, statistics.median(run['stages'][stage] for run in runs)) for stage in STAGES)
+            case = dict(
+                name=name,
+                params=dict(n_events=n_events, horizon_days=horizon_days, init_density=init_density, iterations=iterations, seed=seed),
+                stages=stages,
+                placed_days=runs[0]['placed_days'],
+                days=runs[0]['days'],
+                peak_memory_bytes=measure_peak_memory(generated, iterations) if memory else None
+            )
+            cases.append(case)
+            if progress:
+                print('%-14s total=%.3fs %s' % (name, stages['total'], ' '.join('%s=%.3fs' % (stage, stages[stage]) for stage in STAGES[1:])), file=sys.stderr)
+    return dict(
+        version=RESULTS_VERSION,
+        meta=dict(
+            host=platform.node(),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            created=time.strftime('%Y-%m-%d %H:%M:%S'),
+            repeat=repeat,
+            statistic='median'
+        ),
+        cases=cases
+    )
+
+def run_benchmarks_in(tree_dir: str, bench_args: list) -> dict:
+    """ Runs this script over the pipeline (and workload generator) of tree_dir in a subprocess,
+        with tree_dir first on the path. Returns its results. """
+    fd, output_path = tempfile.mkstemp(prefix='bench_pipeline_', suffix='.json')
+    os.close(fd)
+    try:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([tree_dir] + [path for path in [os.environ.get('PYTHONPATH')] if path]))
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--no-compare', '--output', output_path] + bench_args, cwd=tree_dir, env=env, check=True)
+        with open(output_path) as fp:
+            return json.load(fp)
+    finally:
+        os.remove(output_path)
+
+def merge_rounds(rounds: list) -> dict:
+    """ Merges results of single run rounds: stage timings are the median over rounds (timings
+        of each round are kept as round_stages), peak memory is taken from the first round. """
+    results = rounds[0]
+    for idx, case in enumerate(results['cases']):
+        case['round_stages'] = dict((stage, [round_results['cases'][idx]['stages'][stage] for round_results in rounds]) for stage in STAGES)
+        for stage in STAGES:
+            case['stages'][stage] = statistics.median(case['round_stages'][stage])
+    results['meta']['repeat'] = len(rounds)
+    return results
+
+def run_against(rev: str, bench_args: list, repeat: int, memory: bool=True) -> tuple:
+    """ Benchmarks git revision rev (checked out in a temporary worktree) and the working tree
+        in alternating single run rounds, so both are equally exposed to noise of the host.
+        Returns (results of rev, results of working tree). """
+    work_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    tree_dir = os.path.join(work_dir, 'tree')
+    subprocess.run(['git', 'worktree', 'add', '--detach', tree_dir, rev], cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL)
+    try:
+        rev_rounds, rounds = [], []
+        for idx in range(repeat):
+            round_args = bench_args + ['--repeat', '1'] + ([] if memory and idx == 0 else ['--no-memory'])
+            print('Round %s/%s: %s' % (idx+1, repeat, rev), file=sys.stderr)
+            rev_rounds.append(run_benchmarks_in(tree_dir, round_args))
+            print('Round %s/%s: working tree' % (idx+1, repeat), file=sys.stderr)
+            rounds.append(run_benchmarks_in(ROOT_DIR, round_args))
+        return merge_rounds(rev_rounds), merge_rounds(rounds)
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', tree_dir], cwd=ROOT_DIR, check=False)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def check_comparable(results: dict, baseline: dict) -> str:
+    """ Returns the reason why results can not be compared against baseline, or None. """
+    if baseline.get('version') != RESULTS_VERSION:
+        return 'baseline has results version %s, expected %s' % (baseline.get('version'), RESULTS_VERSION)
+    for key in ['host', 'python', 'statistic']:
+        if baseline['meta'].get(key) != results['meta'].get(key):
+            return 'baseline %s is %s, expected %s' % (key, baseline['meta'].get(key), results['meta'].get(key))
+    return None
+
+def compare(results: dict, baseline: dict, tolerance: float=0.25, memory_tolerance: float=0.10, min_delta_s: float=0.01) -> list:
+    """ Returns regressions as list of dict(case, metric, baseline, current, ratio).
+        A stage regresses if it is slower than baseline by more than tolerance (ratio)
+        and by more than min_delta_s (ignores noise of very fast stages).
+        If both results hold round_stages (see run_against), ratio is the median of the
+        ratios of each round, since rounds of baseline and results ran back to back. """
+    regressions = []
+    baseline_cases = dict((case['name'], case) for case in baseline.get('cases', []))
+    for case in results['cases']:
+        baseline_case = baseline_cases.get(case['name'])
+        if baseline_case is None:
+            continue
+        for stage, current in case['stages'].items():
+            previous = baseline_case['stages'].get(stage)
+            if previous is None:
+                continue
+            ratio = current / previous if previous else None
+            current_rounds, previous_rounds = case.get('round_stages', {}).get(stage), baseline_case.get('round_stages', {}).get(stage)
+            if current_rounds and previous_rounds and len(current_rounds) == len(previous_rounds) and all(previous_rounds):
+                ratio = statistics.median(current_round / previous_round for current_round, previous_round in zip(current_rounds, previous_rounds))
+            if ratio is not None and ratio > 1 + tolerance and current - previous > min_delta_s:
+                regressions.append(dict(case=case['name'], metric=stage, baseline=previous, current=current, ratio=ratio))
+        previous, current = baseline_case.get('peak_memory_bytes'), case.get('peak_memory_bytes')
+        if previous and current and current > previous * (1 + memory_tolerance):
+            regressions.append(dict(case=case['name'], metric='peak_memory_bytes', baseline=previous, current=current, ratio=current / previous))
+    return regressions
+
+def parse_int_list(value: str) -> list:
+    return [int(part) for part in value.split(',') if part.strip()]
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Benchmark pipeline stages over generated workloads.')
+    argparser.add_argument('--events', type=parse_int_list, default=[25, 50, 100], help='Comma separated event counts (default: 25,50,100)')
+    argparser.add_argument('--horizons', type=parse_int_list, default=[182, 365], help='Comma separated horizon lengths in days (default: 182,365)')
+    argparser.add_argument('--repeat', type=int, default=MIN_GATE_REPEAT, help='Runs per case, the median is kept (default: %s)' % (MIN_GATE_REPEAT))
+    argparser.add_argument('--iterations', type=int, default=1, help='Build iterations (default: 1)')
+    argparser.add_argument('--init-density', type=float, default=0.2, help='Init schedule density of workloads (default: 0.2)')
+    argparser.add_argument('--seed', type=int, default=0, help='Workload seed (default: 0)')
+    argparser.add_argument('--no-memory', action='store_true', help='Skip peak memory measurement')
+    argparser.add_argument('--output', type=str, default=None, help='Write JSON results to path')
+    argparser.add_argument('--against', type=str, default=None, metavar='REV', help='Compare against git revision REV, benchmarked in rounds alternating with the working tree')
+    argparser.add_argument('--baseline', type=str, default=None, help='Baseline JSON path (default: benchmarks/baselines/<host>.json)')
+    argparser.add_argument('--update-baseline', action='store_true', help='Write results to baseline instead of comparing')
+    argparser.add_argument('--no-compare', action='store_true', help='Only run benchmarks (and write --output)')
+    argparser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown of a stage as ratio (default: 0.25)')
+    argparser.add_argument('--memory-tolerance', type=float, default=0.10, help='Allowed growth of peak memory as ratio (default: 0.10)')
+    args = argparser.parse_args()
+    if args.repeat < MIN_GATE_REPEAT and not args.no_compare and not args.update_baseline:
+        argparser.error('--repeat %s is below %s runs per case, which is too noisy to compare against a baseline (use --no-compare to only run benchmarks)' % (args.repeat, MIN_GATE_REPEAT))
+    baseline_path = args.baseline or get_default_baseline_path()
+
+    baseline = None
+    if args.against:
+        bench_args = ['--events', ','.join(map(str, args.events)), '--horizons', ','.join(map(str, args.horizons)),
+                      '--iterations', str(args.iterations), '--init-density', str(args.init_density), '--seed', str(args.seed)]
+        baseline, results = run_against(args.against, bench_args, args.repeat, memory=not args.no_memory)
+    else:
+        results = run_benchmarks(args.events, args.horizons, repeat=args.repeat, iterations=args.iterations,
+                                 init_density=args.init_density, seed=args.seed, memory=not args.no_memory)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=2)
+    if args.no_compare:
+        sys.exit(0)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, 'w') as fp:
+            json.dump(results, fp, indent=2)
+        print('Wrote baseline: %s' % (baseline_path))
+        sys.exit(0)
+    baseline_name = args.against or baseline_path
+    if baseline is None:
+        if not os.path.exists(baseline_path):
+            print('No baseline at %s, run with --update-baseline to create one or compare with --against REV' % (baseline_path))
+            sys.exit(0)
+        with open(baseline_path) as fp:
+            baseline = json.load(fp)
+    reason = check_comparable(results, baseline)
+    if reason is not None:
+        print('Not comparable against %s: %s' % (baseline_name, reason))
+        sys.exit(2)
+    regressions = compare(results, baseline, tolerance=args.tolerance, memory_tolerance=args.memory_tolerance)
+    for regression in regressions:
+        print('REGRESSION %(case)s %(metric)s: %(baseline)s -> %(current)s (x%(ratio).2f)' % regression)
+    if len(regressions) > 0:
+        sys.exit(1)
+    print('OK: no regressions against %s (tolerance %.0f%%)' % (baseline_name, args.tolerance * 100))
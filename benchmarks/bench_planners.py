@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Compares planners (and iterations settings) by quality and time over a corpus of
+    generated workloads with fixed seeds, and prints a Pareto table.
+    Run from repository root:
+    python -m benchmarks.bench_planners
+    python -m benchmarks.bench_planners --planners PlannerDefault,PlannerRandomizer --iterations 1,3 --output planners.json
+    A configuration is on the Pareto front if no other configuration is at least as fast
+    and at least as good in every quality metric (and better in one).
+"""
+from benchmarks import workload_runner
+
+from py_matplanering.utilities import workload
+
+from tabulate import tabulate
+
+import argparse, json, statistics, sys
+
+QUALITY_METRICS = ['fill_rate', 'quota_satisfaction', 'distance_satisfaction']
+METRICS = ['wall_s'] + QUALITY_METRICS
+
+def run_config(corpus: list, planner: str, iterations: int, seeds: list) -> dict:
+    """ Runs planner over every workload of corpus with every seed.
+        Returns { metric: [[value per seed] per workload] }. """
+    values = dict((metric, []) for metric in METRICS)
+    for generated in corpus:
+        workload_values = dict((metric, []) for metric in METRICS)
+        for seed in seeds:
+            run = workload_runner.run_workload(generated, planner=planner, iterations=iterations, seed=seed)
+            quality = workload_runner.evaluate_quality(run['schedule'], generated)
+            workload_values['wall_s'].append(run['build_s'])
+            for metric in QUALITY_METRICS:
+                workload_values[metric].append(quality[metric])
+        for metric in METRICS:
+            values[metric].append(workload_values[metric])
+    return values
+
+def summarize_config(values: dict) -> dict:
+    """ Mean of each metric over corpus and seeds, and seed_stdev: mean over workloads
+        of the standard deviation across seeds. """
+    summary = {}
+    for metric, per_workload in values.items():
+        summary[metric] = statistics.mean(value for seed_values in per_workload for value in seed_values)
+        summary['%s_seed_stdev' % (metric)] = statistics.mean(
+            statistics.pstdev(seed_values) if len(seed_values) > 1 else 0.0 for seed_values in per_workload
+        )
+    return summary
+
+def dominates(row: dict, other: dict) -> bool:
+    """ True if row is at least as fast and good as other in all metrics and strictly better in one. """
+    if row['wall_s'] > other['wall_s'] or any(row[metric] < other[metric] for metric in QUALITY_METRICS):
+        return False
+    return row['wall_s'] < other['wall_s'] or any(row[metric] > other[metric] for metric in QUALITY_METRICS)
+
+def mark_pareto(rows: list) -> list:
+    for row in rows:
+        row['pareto'] = not any(dominates(other, row) for other in rows if other is not row)
+    return rows
+
+def run_harness(planners: list, iterations_list: list, events: list, horizons: list, workload_seeds: list, seeds: list,
+                init_density: float=0.0, progress: bool=True) -> dict:
+    corpus = []
+    for horizon_days in horizons:
+        for n_events in events:
+            for workload_seed in workload_seeds:
+                corpus.append(workload.generate_workload(n_events=n_events, horizon_days=horizon_days, init_density=init_density, seed=workload_seed))
+    rows = []
+    # warm up imports and per process caches before timing
+    for planner in planners:
+        workload_runner.run_workload(corpus[0], planner=planner, iterations=1, seed=seeds[0])
+    for planner in planners:
+        for iterations in iterations_list:
+            summary = summarize_config(run_config(corpus, planner, iterations, seeds))
+            rows.append(dict(planner=planner, iterations=iterations, **summary))
+            if progress:
+                print('%s iterations=%s wall=%.3fs %s' % (planner, iterations, summary['wall_s'], ' '.join('%s=%.3f' % (metric, summary[metric]) for metric in QUALITY_METRICS)), file=sys.stderr)
+    mark_pareto(rows)
+    return dict(
+        corpus=[generated['params'] for generated in corpus],
+        seeds=seeds,
+        results=sorted(rows, key=lambda row: row['wall_s'])
+    )
+
+def make_pareto_table(results: list) -> tuple:
+    headers = ['Planner', 'Iterations', 'Wall (s)', 'Fill rate', 'Quota sat.', 'Distance sat.', 'Pareto']
+    table = []
+    for row in results:
+        cells = [row['planner'], row['iterations']]
+        for metric in METRICS:
+            cells.append('%.3f ±%.3f' % (row[metric], row['%s_seed_stdev' % (metric)]))
+        cells.append('*' if row['pareto'] else '')
+        table.append(cells)
+    return table, headers
+
+def parse_list(value: str) -> list:
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+def parse_int_list(value: str) -> list:
+    return [int(part) for part in parse_list(value)]
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Compare planners by quality and time over generated workloads.')
+    argparser.add_argument('--planners', type=parse_list, default=['PlannerDefault', 'PlannerRandomizer'], help='Comma separated planners (default: PlannerDefault,PlannerRandomizer)')
+    argparser.add_argument('--iterations', type=parse_int_list, default=[1, 3], help='Comma separated build iterations settings (default: 1,3)')
+    argparser.add_argument('--events', type=parse_int_list, default=[25, 50], help='Comma separated event counts of corpus (default: 25,50)')
+    argparser.add_argument('--horizons', type=parse_int_list, default=[182], help='Comma separated horizon lengths in days of corpus (default: 182)')
+    argparser.add_argument('--workload-seeds', type=parse_int_list, default=[0, 1], help='Comma separated seeds of generated workloads (default: 0,1)')
+    argparser.add_argument('--seeds', type=parse_int_list, default=[0, 1, 2], help='Comma separated seeds of planning runs (default: 0,1,2)')
+    argparser.add_argument('--init-density', type=float, default=0.0, help='Init schedule density of workloads (default: 0)')
+    argparser.add_argument('--output', type=str, default=None, help='Write JSON results to path')
+    args = argparser.parse_args()
+
+    harness = run_harness(args.planners, args.iterations, args.events, args.horizons, args.workload_seeds, args.seeds, init_density=args.init_density)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(harness, fp, indent=2)
+    table, headers = make_pareto_table(harness['results'])
+    print(tabulate(table, headers, tablefmt='simple'))
+    print('Mean over %s workloads x %s seeds, ± is mean standard deviation across seeds. * = Pareto optimal.' % (len(harness['corpus']), len(harness['seeds'])))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Runs generated workloads (see utilities.workload) through the pipeline
+    the same way planera.py does, without reading or writing files.
+"""
+from py_matplanering.automator_controller import AutomatorController
+from py_matplanering.core.boundary.boundary_base import get_time_span_days
+from py_matplanering.core.schedule.schedule import Schedule
+
+from py_matplanering.utilities import loader, misc, schedule_helper, time_helper
+from py_matplanering.utilities.logger import Logger
+
+from typing import Any
+
+import random, time
+
+def load_init_schedule(workload: dict) -> Any:
+    """ Returns (Schedule, seconds) of the init schedule of workload, or (None, None). """
+    if workload['init_schedule'] is None:
+        return None, None
+    start = time.perf_counter()
+    init_sch = schedule_helper.parse_schedule(workload['init_schedule'])
+    init_sch.set_name('sampled_schedule')
+    return init_sch, time.perf_counter() - start
+
+def make_controller(workload: dict, planner: str='PlannerDefault', iterations: int=1) -> AutomatorController:
+    params = workload['params']
+    sch_interval = (params['startdate'], params['enddate'])
+    strategy = misc.BuildStrategy.REPLACE_PLACED_DAYS if workload['init_schedule'] is not None else misc.BuildStrategy.IGNORE_PLACED_DAYS
+    automator_ctrl = AutomatorController(sch_interval, sch_options=dict(
+        include_props=['id', 'name', 'prio'],
+        event_defaults=dict(
+            prio=5000
+        ),
+        iter_method='random',
+        planning_interval=sch_interval
+    ), build_options=dict(
+        iterations=iterations,
+        strategy=strategy,
+        planning=dict(
+            exclude_event_ids=[]
+        )
+    ))
+    automator_ctrl.set_planner(loader.build_planner(planner))
+    return automator_ctrl
+
+def run_workload(workload: dict, planner: str='PlannerDefault', iterations: int=1, seed: int=0) -> dict:
+    """ Builds a schedule of workload. The global random generator is seeded with seed
+        since planners and iter_method=random use it.
+        Returns dict(schedule, controller, build_s, init_schedule_load_s). """
+    Logger.deactivate()
+    init_sch, init_schedule_load_s = load_init_schedule(workload)
+    automator_ctrl = make_controller(workload, planner=planner, iterations=iterations)
+    if init_sch is not None:
+        automator_ctrl.init_schedule(init_sch)
+    random.seed(seed)
+    start = time.perf_counter()
+    schedule = automator_ctrl.build(workload['event_data'], [workload['rule_set']])
+    build_s = time.perf_counter() - start
+    if schedule is False:
+        raise Exception('Failed to build workload %s: %s' % (workload['params'], automator_ctrl.get_build_error('msg')))
+    return dict(
+        schedule=schedule,
+        controller=automator_ctrl,
+        build_s=build_s,
+        init_schedule_load_s=init_schedule_load_s
+    )
+
+def count_placed_days(schedule: Schedule) -> int:
+    return schedule_helper.count_placed_schedule_days(schedule)
+
+def get_placements(schedule: Schedule) -> dict:
+    """ Returns { event id: [date, ...] } of schedule, dates in order. """
+    placements = {}
+    for date, day in schedule.get_days().materialized():
+        for sch_event in day['events']:
+            placements.setdefault(sch_event.get_id(), []).append(date)
+    return placements
+
+def evaluate_quality(schedule: Schedule, workload: dict) -> dict:
+    """ Evaluates schedule against the rules of workload (independent of the planner):
+        * fill_rate:                share of days with a placed event
+        * quota_satisfaction:       share of cap buckets (see misc.make_event_quota) with min <= used <= max
+        * distance_satisfaction:    share of consecutive placements of an event which keep their distance
+        Satisfaction is 1.0 if there is nothing to satisfy. """
+    params = workload['params']
+    startdate, enddate = params['startdate'], params['enddate']
+    n_days = time_helper.date_to_ordinal(enddate) - time_helper.date_to_ordinal(startdate) + 1
+    rules_by_name = dict((row['name'], row['rules']) for row in workload['rule_set']['rule_set'])
+    placements = get_placements(schedule)
+    quota_total, quota_ok, distance_total, distance_ok = 0, 0, 0, 0
+    for event in workload['event_data']['data']:
+        ordinals = [time_helper.date_to_ordinal(date) for date in placements.get(event['id'], [])]
+        placed = set(placements.get(event['id'], []))
+        for rule_name in event['rules']:
+            for rule in rules_by_name[rule_name]:
+                if rule['boundary'] == 'cap':
+                    for cap in rule['cap']:
+                        quota_template = dict(min=cap.get('min', 0), max=cap.get('max', n_days), time_unit=cap['time_unit'])
+                        for quota in misc.make_event_quota(startdate, enddate, quota_template):
+                            used = sum(1 for date in quota['dates'] if date in placed)
+                            quota_total += 1
+                            quota_ok += 1 if quota['min'] <= used <= quota['max'] else 0
+                elif rule['boundary'] == 'distance':
+                    for distance in rule['distance']:
+                        days = get_time_span_days(distance)
+                        for prev_ordinal, next_ordinal in zip(ordinals, ordinals[1:]):
+                            distance_total += 1
+                            distance_ok += 1 if next_ordinal - prev_ordinal >= days else 0
+    return dict(
+        fill_rate=count_placed_days(schedule) / n_days,
+        quota_satisfaction=quota_ok / quota_total if quota_total else 1.0,
+        distance_satisfaction=distance_ok / distance_total if distance_total else 1.0
+    )
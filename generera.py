@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import argparse
+
+from py_matplanering.utilities import workload
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Generate a synthetic workload (events, rule set, init schedule and config) for planera.py.')
+    argparser.add_argument('out_dir',
+        type=str,
+        help='Directory to write workload files to')
+    argparser.add_argument('--events',
+        type=int,
+        default=100,
+        help='Number of events (default: 100)')
+    argparser.add_argument('--horizon-days',
+        type=int,
+        default=365,
+        help='Length of schedule in days (default: 365)')
+    argparser.add_argument('--startdate',
+        type=str,
+        default='2023-01-01',
+        help='First date of schedule (default: 2023-01-01)')
+    argparser.add_argument('--rule-mix',
+        type=str,
+        default=','.join('%s=%s' % (kind, weight) for kind, weight in workload.DEFAULT_RULE_MIX.items()),
+        help="Weights of rule kinds, e.g. 'period=4,date=1,cap=3,distance=2'")
+    argparser.add_argument('--rule-sharing',
+        type=float,
+        default=0.5,
+        help='0.0 (every event has its own rules) to 1.0 (all events share one rule per kind) (default: 0.5)')
+    argparser.add_argument('--rules-per-event',
+        type=int,
+        default=2,
+        help='Maximum number of rules referenced by an event (default: 2)')
+    argparser.add_argument('--init-density',
+        type=float,
+        default=0.0,
+        help='Share of days with a placed event in an init schedule, 0 for no init schedule (default: 0)')
+    argparser.add_argument('--planner',
+        type=str,
+        default='PlannerDefault',
+        help='Planner of generated config (default: PlannerDefault)')
+    argparser.add_argument('--iterations',
+        type=int,
+        default=1,
+        help='Build iterations of generated config (default: 1)')
+    argparser.add_argument('--seed',
+        type=int,
+        default=0,
+        help='Random seed, the same seed generates the same workload (default: 0)')
+    args = argparser.parse_args()
+
+    generated = workload.generate_workload(
+        n_events=args.events,
+        horizon_days=args.horizon_days,
+        startdate=args.startdate,
+        rule_mix=workload.parse_rule_mix(args.rule_mix),
+        rule_sharing=args.rule_sharing,
+        rules_per_event=args.rules_per_event,
+        init_density=args.init_density,
+        seed=args.seed
+    )
+    paths = workload.write_workload(generated, args.out_dir, planner=args.planner, iterations=args.iterations)
+    print("Generated %s events and %s rules over %s days" % (
+        len(generated['event_data']['data']), len(generated['rule_set']['rule_set']), args.horizon_days
+    ))
+    print("Run with: python planera.py %s" % (paths['config']))
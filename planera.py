@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import argparse, json, copy, random
+import argparse, copy
 from pathlib import Path
 
 from py_matplanering.automator_controller import AutomatorController
@@ -15,8 +15,6 @@ from py_matplanering.utilities.config import readConfig
 from py_matplanering.utilities import time_helper, loader, schedule_helper, common, misc
 from py_matplanering.utilities.logger import Logger, LoggerLevel
 
-from tabulate import tabulate
-
 from typing import List
 
 def make_schedule(args: dict) -> dict:
@@ -39,6 +37,8 @@ def make_schedule(args: dict) -> dict:
     ), build_options=dict(
         iterations=args.get('iterations', 1),
         strategy=args.get('strategy', misc.BuildStrategy.IGNORE_PLACED_DAYS),
+        compile_cache_dir=args.get('compile_cache_dir'),
+        keep_schedule_builder=bool(args.get('memory_report')),
         planning=dict(
             exclude_event_ids=exclude_event_ids
         )
@@ -62,8 +62,19 @@ def make_schedule(args: dict) -> dict:
     schedule = automator_ctrl.build(raw_event_data, raw_rule_set)
     if schedule is False:
         print("Failed to create schedule due to: %s" % (automator_ctrl.get_build_error('msg')))
+    elif args.get('memory_report'):
+        from py_matplanering.core.schedule.schedule_footprint import ScheduleFootprint
+        footprint = ScheduleFootprint.of_builder(automator_ctrl.get_schedule_builder())
+        table, headers = footprint.make_table()
+        print_table(table, headers)
     return schedule
 
+def print_table(table: list, headers: list, tablefmt: str='simple'):
+    """ Prints table with tabulate, which is imported on first use
+        since most runs (e.g. from cron) print no tables. """
+    from tabulate import tabulate
+    print(tabulate(table, headers, tablefmt=tablefmt))
+
 def make_event_table(sch: Schedule) -> tuple:
     headers = ['Event', 'Id', 'Planned', 'Dates']
     table = []
@@ -153,24 +164,29 @@ def make_date_table(sch: Schedule) -> tuple:
             table.append(row2)
     return table, headers
 
-def sample_schedule(schedule_dct: dict, n_percentage: int, n_min: int=1, d_keys: list=None):
-    """ Samples a subset of schedule_dct and returns a new dict """
-    if n_percentage > 100 or n_percentage < 0:
-        raise Exception('n_percentage must range between 0-100, instead got: %s' % (n_percentage))
-    if d_keys is None:
-        d_keys = list(schedule_dct['days'])
-    k = int((n_percentage/100)*len(d_keys))
-    if n_min is not None and k < n_min:
-        k = min(n_min, len(d_keys))
-    sampled_d_keys = random.sample(d_keys, k)
-
-    # clear events from days that are not sampled
-    sampled_schedule_dct = copy.deepcopy(schedule_dct)
-    for date in sampled_schedule_dct['days']:
-        day = sampled_schedule_dct['days'][date]
-        if date not in sampled_d_keys:
-            day['events'] = []
-    return sampled_schedule_dct
+def make_log_sinks(global_config_data: dict) -> list:
+    """ Creates log sinks from global config, e.g.:
+        logger_sinks = ring, ndjson
+        logger_ring_size = 10000
+        logger_file_path = matplanering_log.ndjson
+        logger_<sink>_level = DEBUG """
+    from py_matplanering.utilities.logger import ListSink, RingBufferSink, NdjsonFileSink, NullSink
+    sinks = []
+    sink_names = [name.strip() for name in global_config_data.get('logger_sinks', 'memory').split(',') if name.strip()]
+    for sink_name in sink_names:
+        sink_level = global_config_data.get('logger_%s_level' % (sink_name))
+        sink_level = LoggerLevel[sink_level] if sink_level else None
+        if sink_name == 'memory':
+            sinks.append(ListSink(max_verbosity=sink_level))
+        elif sink_name == 'ring':
+            sinks.append(RingBufferSink(common.nvl_int(global_config_data.get('logger_ring_size'), 10000), max_verbosity=sink_level))
+        elif sink_name == 'ndjson':
+            sinks.append(NdjsonFileSink(global_config_data.get('logger_file_path', 'matplanering_log.ndjson'), max_verbosity=sink_level))
+        elif sink_name == 'null':
+            sinks.append(NullSink())
+        else:
+            raise AppError('Unknown logger sink: %s (select from: %s)' % (sink_name, ['memory', 'ring', 'ndjson', 'null']))
+    return sinks
 
 if __name__ == '__main__':
     argparser = argparse.ArgumentParser(description='Process sources to produce a schedule.')
@@ -183,8 +199,27 @@ if __name__ == '__main__':
         type=str,
         choices=['DEBUG', 'INFO', 'FATAL', 'OFF'],
         help="Logger option. Accepts one of the following strings: 'DEBUG', 'INFO', 'FATAL', 'OFF'.")
+    argparser.add_argument('--profile',
+        metavar='PATH',
+        type=str,
+        nargs='?',
+        const='planera.pstats',
+        help="Profile the run (from reading config to writing output) with cProfile, write stats to PATH (default: planera.pstats) and print time per subsystem.")
+    argparser.add_argument('--profile-memory',
+        action='store_true',
+        help="Profile memory allocations with tracemalloc and print retained memory per subsystem.")
+    argparser.add_argument('--memory-report',
+        action='store_true',
+        help="Print retained memory per schedule structure (events, candidates, quota buckets, days) after build.")
     args = argparser.parse_args()
 
+    # started before config is read, so the whole run after argument parsing is profiled
+    profiler = None
+    if args.profile or args.profile_memory:
+        from py_matplanering.utilities.profiler import Profiler
+        profiler = Profiler(cpu=args.profile is not None, memory=args.profile_memory)
+        profiler.start()
+
     config_data = readConfig(args.config_path, 'Config')
 
     try:
@@ -205,26 +240,25 @@ if __name__ == '__main__':
         if global_config_data['logger'] == 'on':
             Logger.activate()
             max_verbosity = LoggerLevel[logger_level]
+    Logger.set_max_verbosity(max_verbosity)
+    if global_config_data and global_config_data.get('logger_sinks'):
+        Logger.set_sinks(make_log_sinks(global_config_data))
 
     Logger.log('initializing', verbosity=LoggerLevel.INFO)
 
     # Get event data
     # ==============
     Logger.log('fetch event data', verbosity=LoggerLevel.INFO)
-    event_data_str = Path(config_data['event_data_path']).read_text()
-    if len(event_data_str) == 0:
-        raise AppError("event data source file is empty. Expected: JSON formatted data")
-    event_data_dct = json.loads(event_data_str)
-    del event_data_str
     if config_data.get('filter_event_ids'):
         config_data['filter_event_ids'] = [int(id_) for id_ in config_data.get('filter_event_ids').split(',')]
-        tmp_event_data_lst = []
-        for event_row in event_data_dct['data']:
-            if event_row['id'] not in config_data['filter_event_ids']:
-                continue
-            tmp_event_data_lst.append(event_row)
-        event_data_dct['data'] = tmp_event_data_lst
-        del tmp_event_data_lst
+    from py_matplanering.utilities import event_loader
+    with open(config_data['event_data_path']) as event_data_fp:
+        # Inactive events are never planned, but may be part of an init schedule
+        event_data_dct = event_loader.load_event_data(
+            event_data_fp,
+            filter_event_ids=config_data.get('filter_event_ids'),
+            require_active=not config_data.get('init_schedule_path')
+        )
     # print("Event data:", event_data_dct)
 
     # Read schedule output file
@@ -232,27 +266,35 @@ if __name__ == '__main__':
     sampled_schedule_obj = None
     if config_data.get('init_schedule_path'):
         Logger.log('Initializing schedule from given path: %s' % (config_data['init_schedule_path']), verbosity=LoggerLevel.INFO)
+        from py_matplanering.core.schedule.schedule_sampler import ScheduleSampler
+        sampler = ScheduleSampler(
+            n_percentage=common.nvl_int(config_data.get('sample_size_percent')),
+            n_min=common.nvl_int(config_data.get('sample_size_min')),
+            require_placed_day=config_data.get('sample_method') == 'require_placed_day',
+            seed=common.nvl_int(config_data.get('sample_seed'))
+        )
         try:
-            sampled_schedule_str = Path(config_data['init_schedule_path']).read_text()
-            sampled_schedule_dct = json.loads(sampled_schedule_str)
-            d_keys = None # use default: all dates in sampled_schedule_dct
-            if config_data.get('sample_method') == 'require_placed_day':
-                d_keys = []
-                for date in sampled_schedule_dct['days']:
-                    if len(sampled_schedule_dct['days'][date]['events']) > 0:
-                        d_keys.append(date)
-            sampled_schedule_dct = sample_schedule(sampled_schedule_dct,
-                n_percentage=common.nvl_int(config_data.get('sample_size_percent')),
-                n_min=common.nvl_int(config_data.get('sample_size_min')),
-                d_keys=d_keys
-            )
-            del sampled_schedule_str
+            if Path(config_data['init_schedule_path']).suffix in ['.ndjson', '.jsonl']:
+                # NDJSON output is streamed back in record by record and sampled on the fly
+                with open(config_data['init_schedule_path'], 'rb') as init_schedule_fp:
+                    sampled_records = sampler.sample_records(schedule_helper.iter_schedule_records(init_schedule_fp))
+                    sampled_schedule_obj = schedule_helper.parse_schedule(sampled_records)
+            else:
+                from py_matplanering.utilities import json_codec
+                sampled_schedule_dct = json_codec.read_file(config_data['init_schedule_path'])
+                d_keys = list(sampled_schedule_dct['days']) # use default: all dates in sampled_schedule_dct
+                if config_data.get('sample_method') == 'require_placed_day':
+                    d_keys = []
+                    for date in sampled_schedule_dct['days']:
+                        if len(sampled_schedule_dct['days'][date]['events']) > 0:
+                            d_keys.append(date)
+                mask = sampler.sample_mask(d_keys)
+                sampled_records = sampler.mask_records(schedule_helper.iter_schedule_records(sampled_schedule_dct), mask)
+                sampled_schedule_obj = schedule_helper.parse_schedule(sampled_records)
+                del sampled_schedule_dct
         except FileNotFoundError:
-            sampled_schedule_dct = None
             Logger.log('File to init schedule path not found.', verbosity=LoggerLevel.INFO)
-        if sampled_schedule_dct:
-            # Convert sampled_schedule_dct: dict --> sampled_schedule_obj: Schedule
-            sampled_schedule_obj = schedule_helper.parse_schedule(sampled_schedule_dct)
+        if sampled_schedule_obj:
             sampled_schedule_obj.set_name('sampled_schedule')
             Logger.log('Reading pre-defined schedule with %s events' % (schedule_helper.count_placed_schedule_days(sampled_schedule_obj)), LoggerLevel.INFO)
 
@@ -275,18 +317,25 @@ if __name__ == '__main__':
 
     # Load files into rule sets
     # =========================
+    from py_matplanering.utilities import json_codec
     rule_sets = []
     for path in paths:
         Logger.log('Reading path: %s' % (path), verbosity=LoggerLevel.DEBUG)
-        rule_set_str = Path(path).read_text()
-        if len(rule_set_str) == 0:
+        rule_set_bytes = Path(path).read_bytes()
+        if len(rule_set_bytes) == 0:
             raise AppError("rule set source file is empty. Expected: JSON formatted data")
-        rule_set_dct = json.loads(rule_set_str)
+        rule_set_dct = json_codec.loads(rule_set_bytes)
         rule_sets.append(rule_set_dct)
 
     # Create schedule with input arguments
     # ====================================
     Logger.log('Make schedule', verbosity=LoggerLevel.INFO)
+    if config_data.get('trace_path'):
+        from py_matplanering.utilities.tracer import Tracer
+        Tracer.activate(trace_memory=config_data.get('trace_memory') == 'on')
+    if config_data.get('metrics_path'):
+        from py_matplanering.utilities.metrics import Metrics
+        Metrics.activate()
     strategy = misc.BuildStrategy.IGNORE_PLACED_DAYS
     if config_data.get('strategy'):
         strategy = misc.BuildStrategy[config_data['strategy']]
@@ -302,17 +351,35 @@ if __name__ == '__main__':
         schedule=sampled_schedule_obj,
         iterations=common.nvl_int(config_data['iterations']),
         strategy=strategy,
-        exclude_event_ids=config_data.get('exclude_event_ids')
+        exclude_event_ids=config_data.get('exclude_event_ids'),
+        compile_cache_dir=config_data.get('compile_cache_dir'),
+        memory_report=args.memory_report
     ))
+    if config_data.get('trace_path'):
+        Logger.log('Writing trace to: %s', LoggerLevel.INFO, config_data['trace_path'])
+        Tracer.export_chrome_trace(config_data['trace_path'])
+        Tracer.deactivate()
+    if config_data.get('metrics_path'):
+        Logger.log('Writing metrics to: %s', LoggerLevel.INFO, config_data['metrics_path'])
+        Metrics.write_prometheus(config_data['metrics_path'])
     if schedule is False:
         Logger.log('Schedule is False', LoggerLevel.FATAL)
     if schedule is not False:
         try:
-            sch_dct = schedule.as_dict()
-            if sch_dct is None:
-                raise AppError('Unexpected None returned by schedule.as_dict()')
             Logger.log('Writing schedule to: %s' % (config_data['output_path']), LoggerLevel.INFO)
-            Path(config_data['output_path']).write_text(json.dumps(sch_dct))
+            # validate output options before the output file is opened (and truncated)
+            output_format = config_data.get('output_format', 'json')
+            if output_format not in ['json', 'ndjson']:
+                raise AppError('Unknown output_format: %s (select from: %s)' % (output_format, ['json', 'ndjson']))
+            output_granularity = config_data.get('output_granularity', 'day')
+            if output_format == 'ndjson' and output_granularity not in ['day', 'placement']:
+                raise AppError('Unknown output_granularity: %s (select from: %s)' % (output_granularity, ['day', 'placement']))
+            from py_matplanering.core.schedule.schedule_serializer import ScheduleSerializer
+            with open(config_data['output_path'], 'wb') as output_fp:
+                if output_format == 'json':
+                    ScheduleSerializer(schedule).dump(output_fp)
+                else:
+                    ScheduleSerializer(schedule).dump_ndjson(output_fp, granularity=output_granularity)
             # Output in tabulate form
             if config_data.get('group_table_by'):
                 table, headers = None, None
@@ -323,14 +390,24 @@ if __name__ == '__main__':
                 else:
                     raise AppError('Unknown group_table_by: %s (select from: %s)' % (config_data['group_table_by'], ['event', 'date']))
                 if table and headers:
-                    print(tabulate(table, headers, tablefmt=config_data.get('tablefmt', 'fancy_grid')))
+                    print_table(table, headers, tablefmt=config_data.get('tablefmt', 'fancy_grid'))
             print("OK!")
         except Exception as exc:
             if Logger.is_activated():
-                Logger.print(max_verbosity=max_verbosity)
+                Logger.print_log(max_verbosity=max_verbosity)
             raise exc
+    if profiler is not None:
+        profiler.stop()
+        if args.profile:
+            profiler.dump_stats(args.profile)
+            print("Wrote profile stats to: %s" % (args.profile))
+        table, headers = profiler.make_subsystem_table()
+        print_table(table, headers)
+        if profiler.get_peak_bytes() is not None:
+            print("Peak traced memory: %.1f KiB" % (profiler.get_peak_bytes() / 1024))
     if Logger.is_activated():
         Logger.print_log(max_verbosity=max_verbosity)
+    Logger.close_sinks()
 
     if schedule:
         print("Total planned events: %s / %s" % (len(schedule.get_events()), len(schedule.get_days())))
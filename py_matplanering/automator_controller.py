@@ -3,6 +3,7 @@
 
 from py_matplanering.core.schedule.schedule import Schedule
 from py_matplanering.core.schedule.schedule_input import ScheduleInput
+from py_matplanering.core.schedule.compiled_input import CompiledInput, CompiledInputCache
 from py_matplanering.core.schedule.schedule_event_filter import CustomScheduleEventFilter
 from py_matplanering.core.validator import Validator
 from py_matplanering.core.scheduler import Scheduler
@@ -10,11 +11,14 @@ from py_matplanering.core.planner.planner_base import PlannerBase
 from py_matplanering.core.error import BaseError
 
 from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.metrics import Metrics
 from py_matplanering.utilities import schedule_helper
 from py_matplanering.utilities import misc
 
 from typing import Any, Callable
 
+import copy
+
 class AutomatorControllerError(BaseError):
     def __init__(self, message, capture_data = {}):
         super(AutomatorControllerError, self).__init__(message)
@@ -36,6 +40,7 @@ class AutomatorController:
     def __init__(self, sch_interval: tuple, sch_options: dict={}, build_options: dict={}):
         self.__build_error = None
         self.__built_run = False
+        self.__scheduler = None
         self.__sch_options = dict(
             schedule_interval=sch_interval,
             planning_interval=None, # None => planning interval is same as schedule interval
@@ -47,7 +52,10 @@ class AutomatorController:
         self.__sch_event_filters = []
         self.__build_options = dict(
             iterations=1,
-            strategy=misc.BuildStrategy.IGNORE_PLACED_DAYS
+            strategy=misc.BuildStrategy.IGNORE_PLACED_DAYS,
+            index_fields=[], # event attributes to index up front (others are indexed on first use)
+            compile_cache_dir=None, # directory of compiled input artifacts (None disables cache)
+            keep_schedule_builder=False # keep ScheduleBuilder of last iteration, see get_schedule_builder()
         )
         self.__build_options.update(build_options)
         if self.__build_options['iterations'] == 0:
@@ -61,7 +69,7 @@ class AutomatorController:
         return self.__build_error[col]
 
     def set_planner(self, planner: PlannerBase):
-        Logger.log('Setting planner to %s' % (planner), LoggerLevel.DEBUG)
+        Logger.log('Setting planner to %s', LoggerLevel.DEBUG, planner)
         self.__planner = planner
 
     def init_schedule(self, sch: Schedule):
@@ -78,26 +86,45 @@ class AutomatorController:
         sch_event_filter = CustomScheduleEventFilter(filter_name, filter_fn)
         self.__sch_event_filters.append(sch_event_filter)
 
+    def get_schedule_builder(self) -> Any:
+        """ ScheduleBuilder of the last iteration of latest build, e.g. for ScheduleFootprint.of_builder().
+            None if not built or unless build option keep_schedule_builder is set. """
+        if self.__scheduler is None:
+            return None
+        return self.__scheduler.get_last_schedule_builder()
+
+    def get_metrics(self) -> dict:
+        """ Metrics (counters and histograms) of latest build, see utilities.metrics.
+            Empty unless Metrics.activate() was called before build. """
+        return Metrics.snapshot()
+
     def build(self, event_data: dict, rule_set: list) -> Any:
         self.__built_run = True
-
-        # Inject global rules into event data.
-        # Find all names of global rules
-        # ====================================
-        global_rules = set()
-        for rule_data in rule_set:
-            if rule_data['scope'] == 'global':
-                for rule_set_data in rule_data['rule_set']:
-                    global_rules.add(rule_set_data['name'])
-        for event in event_data['data']:
-            event['rules'].extend(list(global_rules))
-            event['rules'] = list(set(event['rules']))
+        Metrics.reset()
+
+        # Compiled input
+        # ==============
+        compile_cache, compiled_inp = None, None
+        if self.__build_options['compile_cache_dir']:
+            compile_cache = CompiledInputCache(self.__build_options['compile_cache_dir'])
+            compile_key = CompiledInput.compute_key(event_data, rule_set, self.__sch_options)
+            compiled_inp = compile_cache.load(compile_key)
+            if compiled_inp is not None:
+                # Global rules are already injected and input is already validated
+                event_data, rule_set = compiled_inp.event_data, compiled_inp.rule_set
+        if compiled_inp is None:
+            event_data = self.__inject_global_rules(event_data, rule_set)
+            if compile_cache is not None:
+                # snapshot before event data is converted into schedule events
+                compiled_inp = CompiledInput(compile_key, copy.deepcopy(event_data), copy.deepcopy(rule_set))
 
         # Validation
         # ==========
-        inp = ScheduleInput(event_data, rule_set, self.__initial_schedule)
+        inp = ScheduleInput(event_data, rule_set, self.__initial_schedule, index_fields=self.__build_options['index_fields'])
+        if compiled_inp is not None and compiled_inp.has_candidates():
+            inp.set_compiled_candidates(compiled_inp.candidates)
         validator = Validator()
-        is_valid, validation_rs, validation_msg = validator.pre_validate(inp, self.__sch_options)
+        is_valid, validation_rs, validation_msg = validator.pre_validate(inp, self.__sch_options, compiled=compiled_inp is not None and compiled_inp.has_candidates())
         if not is_valid:
             Logger.log('Invalid ScheduleInput due to pre_validate', LoggerLevel.FATAL)
             self.__build_error = dict(
@@ -113,22 +140,30 @@ class AutomatorController:
         exclude_event_ids = self.__build_options['planning'].get('exclude_event_ids', [])
         scheduler = Scheduler(self.__planner, self.__sch_options, self.__initial_schedule, exclude_event_ids)
         scheduler.set_strategy(self.__build_options['strategy'])
+        scheduler.set_keep_schedule_builder(self.__build_options['keep_schedule_builder'])
         scheduler.set_schedule_event_filters(self.__sch_event_filters)
         scheduler.pre_process()
+        self.__scheduler = scheduler
 
         # Build Schedule instance
         # =======================
         Logger.log('Create Schedule', verbosity=LoggerLevel.DEBUG)
         schedule = None
         for idx in range(self.__build_options['iterations']):
-            Logger.log('Running iteration: %s/%s' % (idx+1, self.__build_options['iterations']), LoggerLevel.DEBUG)
+            Logger.log('Running iteration: %s/%s', LoggerLevel.DEBUG, idx+1, self.__build_options['iterations'])
             if idx > 0:
                 # feed back created schedule to scheduler which restarts the scheduling process
                 inp.set_init_schedule(schedule)
             schedule = scheduler.create_schedule(inp)
+            Metrics.inc('build_iterations_total')
+            if compiled_inp is not None and not compiled_inp.has_candidates():
+                # candidates are the same in every iteration
+                compiled_inp.candidates = dict((sch_event.get_id(), sch_event.get_candidates()) for sch_event in inp.event_data_lst)
+                compile_cache.store(compiled_inp)
+                inp.set_compiled_candidates(compiled_inp.candidates)
             is_valid, validation_rs, validation_msg = validator.post_validate(schedule)
             if not is_valid:
-                Logger.log('Invalid Schedule due to post_validate in iteration %s' % (idx+1), LoggerLevel.FATAL)
+                Logger.log('Invalid Schedule due to post_validate in iteration %s', LoggerLevel.FATAL, idx+1)
                 self.__build_error = dict(
                     validation_data=validation_rs,
                     msg=validation_msg
@@ -138,3 +173,16 @@ class AutomatorController:
             if schedule_helper.is_schedule_complete(schedule):
                 break
         return schedule
+
+    def __inject_global_rules(self, event_data: dict, rule_set: list) -> dict:
+        """ Inject global rules into event data. """
+        # Find all names of global rules
+        global_rules = set()
+        for rule_data in rule_set:
+            if rule_data['scope'] == 'global':
+                for rule_set_data in rule_data['rule_set']:
+                    global_rules.add(rule_set_data['name'])
+        for event in event_data['data']:
+            event['rules'].extend(list(global_rules))
+            event['rules'] = list(set(event['rules']))
+        return event_data
@@ -16,6 +16,18 @@ class BoundaryError(BaseError):
     def __str__(self):
         return self.message
 
+# days of each time unit of a time span, where a month is approximated by 30 days
+TIME_UNIT_DAYS = dict(day=1, week=7, month=30)
+
+def get_time_span_days(time_span: dict) -> int:
+    """ Days of a time span, e.g. { "time_unit": "week", "value": 2 } => 14.
+        Raises BoundaryError if value is not an int or time unit is unknown. """
+    if not isinstance(time_span['value'], int) or isinstance(time_span['value'], bool):
+        raise BoundaryError('Unexpected time span value: %s (time span=%s). Expected: int' % (time_span['value'], time_span))
+    if time_span['time_unit'] not in TIME_UNIT_DAYS:
+        raise BoundaryError('Unknown time unit: %s (time span=%s). Select from: %s' % (time_span['time_unit'], time_span, list(TIME_UNIT_DAYS)))
+    return time_span['value'] * TIME_UNIT_DAYS[time_span['time_unit']]
+
 class BoundaryBase(metaclass=ABCMeta):
     def set_boundary(self, boundary):
         self._boundary = boundary
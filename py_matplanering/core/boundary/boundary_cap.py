@@ -4,6 +4,29 @@ from py_matplanering.core.boundary.boundary_base import BoundaryBase
 from py_matplanering.core.schedule.schedule import ScheduleEvent
 from py_matplanering.core.context import BoundaryContext
 
+def _check_cap(cap: dict) -> str:
+    if 'min' not in cap and 'max' not in cap:
+        return 'expected at least one of "min" or "max"'
+    if cap.get('min', 1) > cap.get('max', cap.get('min', 1)):
+        return 'expected min <= max, instead got: min=%s, max=%s' % (cap.get('min', 1), cap.get('max'))
+    return None
+
+# Schema of boundary data (see utilities.schema), e.g.: [{"max": 1, "time_unit": "month"}]
+SCHEMA = dict(
+    type='list',
+    min_items=1,
+    items=dict(
+        type='dict',
+        required=['time_unit'],
+        properties=dict(
+            min=dict(type='int', min=0),
+            max=dict(type='int', min=0),
+            time_unit=dict(type='str', enum=['week', 'month', 'half_year', 'year'])
+        ),
+        check=_check_cap
+    )
+)
+
 class BoundaryCap(BoundaryBase):
     def filter_eligible_dates(self, boundary_context: BoundaryContext) -> list:
         # match all dates since it's indeterminate
@@ -5,11 +5,55 @@ from py_matplanering.core.schedule.schedule import ScheduleEvent
 from py_matplanering.core.context import BoundaryContext
 from py_matplanering.utilities import time_helper
 
+import calendar, datetime, functools
+
 from typing import List
 
+_MONTH_DAYS_SCHEMA = dict(
+    type='dict',
+    required=['values'],
+    properties=dict(
+        values=dict(
+            type='list',
+            items=dict(
+                type='dict',
+                required=['month_number', 'day_of_month'],
+                properties=dict(
+                    month_number=dict(type='int', min=1, max=12),
+                    day_of_month=dict(type='int', min=1, max=31)
+                )
+            )
+        )
+    )
+)
+
+# Schema of boundary data (see utilities.schema), e.g.: [{"values": [{"month_number": 12, "day_of_month": 25}]}]
+SCHEMA = dict(any_of=[
+    dict(type='list', min_items=1, items=_MONTH_DAYS_SCHEMA),
+    _MONTH_DAYS_SCHEMA
+])
+
+@functools.lru_cache(maxsize=256)
+def compile_month_days(month_days: tuple, startdate: str, enddate: str) -> tuple:
+    """ Compiles month days ((month_number, day_of_month), ...) into the sorted
+        tuple of ordinals they match in every year from startdate to enddate.
+        A month day which does not exist in a year (e.g. 02-29) is skipped for that year. """
+    start_ordinal = time_helper.date_to_ordinal(startdate)
+    end_ordinal = time_helper.date_to_ordinal(enddate)
+    ordinals = set()
+    for year in time_helper.get_year_range(startdate, enddate):
+        for month_number, day_of_month in month_days:
+            if day_of_month > calendar.monthrange(year, month_number)[1]:
+                continue
+            ordinal = datetime.date(year, month_number, day_of_month).toordinal()
+            if start_ordinal <= ordinal <= end_ordinal:
+                ordinals.add(ordinal)
+    return tuple(sorted(ordinals))
+
 class BoundaryDate(BoundaryBase):
-    def filter_eligible_dates(self, boundary_context: BoundaryContext) -> List[str]:
-        ret_dates = []
+    def get_month_days(self) -> tuple:
+        """ Returns validated month days ((month_number, day_of_month), ...) of boundary. """
+        month_days = []
         for outer_row in self._boundary['date']:
             if isinstance(outer_row, str) and outer_row == 'values':
                 iter_outer_row = self._boundary['date']['values']
@@ -18,12 +62,25 @@ class BoundaryDate(BoundaryBase):
             else:
                 raise BoundaryError('Unexpected value provided to boundary: %s (value=%s of type=%s). Expected: str=\'values\' or dict' % (self._boundary, outer_row, type(outer_row)))
             for inner_row in iter_outer_row:
-                cur_year = time_helper.get_year()
-                date_str = "%s-%s-%s" % (cur_year, inner_row['month_number'], inner_row['day_of_month'])
-                # validates date_str
-                date = time_helper.format_date(time_helper.parse_date(date_str))
-                ret_dates.append(date)
-        return ret_dates
+                month_number, day_of_month = int(inner_row['month_number']), int(inner_row['day_of_month'])
+                # 2000 is a leap year, so every possible month day exists in it.
+                if month_number < 1 or month_number > 12 or day_of_month < 1 or day_of_month > calendar.monthrange(2000, month_number)[1]:
+                    raise BoundaryError('Invalid date provided to boundary: month_number=%s, day_of_month=%s' % (inner_row['month_number'], inner_row['day_of_month']))
+                month_days.append((month_number, day_of_month))
+        return tuple(sorted(set(month_days)))
+
+    def filter_eligible_dates(self, boundary_context: BoundaryContext) -> List[str]:
+        dates = boundary_context.get_dates()
+        if len(dates) == 0:
+            return []
+        startdate, enddate = min(dates), max(dates)
+        ordinals = compile_month_days(self.get_month_days(), startdate, enddate)
+        ret_dates = [time_helper.ordinal_to_date(ordinal) for ordinal in ordinals]
+        if len(dates) == time_helper.date_to_ordinal(enddate) - time_helper.date_to_ordinal(startdate) + 1:
+            # dates cover the whole interval
+            return ret_dates
+        date_set = set(dates)
+        return [date for date in ret_dates if date in date_set]
 
     def get_boundary_class(self) -> str:
         return 'determinate'
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from py_matplanering.core.boundary.boundary_base import BoundaryBase, BoundaryError
+from py_matplanering.core.boundary.boundary_base import BoundaryBase, get_time_span_days
 from py_matplanering.core.context import BoundaryContext
 from py_matplanering.core.schedule.schedule import Schedule
 from py_matplanering.core.schedule.schedule import ScheduleEvent
@@ -10,6 +10,20 @@ from py_matplanering.utilities.logger import Logger, LoggerLevel
 from typing import List
 
 
+# Schema of boundary data (see utilities.schema), e.g.: [{"time_unit": "day", "value": 7}]
+SCHEMA = dict(
+    type='list',
+    min_items=1,
+    items=dict(
+        type='dict',
+        required=['time_unit', 'value'],
+        properties=dict(
+            time_unit=dict(type='str', enum=['day', 'week', 'month']),
+            value=dict(type='int', min=1)
+        )
+    )
+)
+
 class BoundaryDistance(BoundaryBase):
     """
         Checks for conflicts between events in a time distance span.
@@ -36,24 +50,15 @@ class BoundaryDistance(BoundaryBase):
             return False
         grouped_events = sch.get_grouped_events(sch_event.get_id())
         for distance in self._boundary['distance']:
-            if not isinstance(distance['value'], int) or isinstance(distance['value'], bool):
-                raise BoundaryError('Unexpected distance value: %s (given date=%s, event id=%s, distance data=%s). Expected: int' % (distance['value'], date, sch_event.get_id(), distance))
-            if distance['time_unit'] == 'day':
-                days = distance['value']
-            elif distance['time_unit'] == 'week':
-                days = distance['value'] * 7
-            elif distance['time_unit'] == 'month':
-                days = distance['value'] * 30
-            else:
-                raise BoundaryError('Unknown distance time unit: %s (given date=%s, event id=%s, distance data=%s)' % (distance['time_unit'], date, sch_event.get_id(), distance))
-            start_date = time_helper.format_date(time_helper.add_days(time_helper.parse_date(date), -days+1))
-            end_date = time_helper.format_date(time_helper.add_days(time_helper.parse_date(date), +days-1))
+            days = get_time_span_days(distance)
+            start_date = time_helper.shift_date(date, -days+1)
+            end_date = time_helper.shift_date(date, +days-1)
             examine_dates = time_helper.get_date_range(start_date, end_date)
             examine_dates.remove(date)
             for exam_date in examine_dates:
                 if grouped_events.get(exam_date):
                     if len(grouped_events[exam_date]) > 0:
-                        Logger.log('Found distance conflict on event id=%s between %s and %s' % (sch_event.get_id(), exam_date, date), LoggerLevel.DEBUG)
+                        Logger.log('Found distance conflict on event id=%s between %s and %s', LoggerLevel.DEBUG, sch_event.get_id(), exam_date, date)
                         return True
         return False
 
@@ -8,6 +8,16 @@ from py_matplanering.utilities import time_helper
 
 from typing import List
 
+# Schema of boundary data (see utilities.schema), e.g.: ["mon", "q1", "dec"]
+SCHEMA = dict(
+    type='list',
+    min_items=1,
+    items=dict(
+        type='str',
+        enum=time_helper.get_named_weekdays(short=True, to_lower=True) + ['q1', 'q2', 'q3', 'q4'] + time_helper.get_named_months(short=True, to_lower=True)
+    )
+)
+
 class BoundaryPeriod(BoundaryBase):
     def filter_eligible_dates(self, boundary_context: BoundaryContext) -> List[str]:
         matching_dates = set()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from py_matplanering.core.boundary.boundary_base import BoundaryBase, get_time_span_days
+from py_matplanering.core.context import BoundaryContext
+from py_matplanering.core.schedule.schedule import Schedule
+from py_matplanering.core.schedule.schedule import ScheduleEvent
+from py_matplanering.utilities.logger import Logger, LoggerLevel
+
+from typing import List
+
+
+# Schema of boundary data (see utilities.schema), e.g.:
+# [{"attribute": "type", "value": "fish", "max": 2, "window": {"time_unit": "week", "value": 1}}]
+SCHEMA = dict(
+    type='list',
+    min_items=1,
+    items=dict(
+        type='dict',
+        required=['attribute', 'max', 'window'],
+        properties=dict(
+            attribute=dict(type='str'),
+            max=dict(type='int', min=0),
+            window=dict(
+                type='dict',
+                required=['time_unit', 'value'],
+                properties=dict(
+                    time_unit=dict(type='str', enum=['day', 'week', 'month']),
+                    value=dict(type='int', min=1)
+                )
+            )
+        )
+    )
+)
+
+class BoundaryVariety(BoundaryBase):
+    """
+        Limits how often an event attribute value may be planned within
+        a sliding window of time, e.g. no more than two fish dishes a week:
+        { "attribute": "type", "value": "fish", "max": 2, "window": { "time_unit": "week", "value": 1 } }
+        If value is omitted, the attribute value of the event itself is limited,
+        e.g. no more than two dishes of the same type a week.
+        Every window (of the given length) which contains the date is checked.
+        Placed events are counted by the schedule (see ScheduleAttributeCounter),
+        so checking a date does not scan the schedule.
+        If the context holds several dates, an event is eligible only if it
+        has no conflict on any of them.
+    """
+    def filter_eligible_dates(self, boundary_context: BoundaryContext) -> List[str]:
+        return boundary_context.get_dates()
+
+    def filter_eligible_events(self, boundary_context: BoundaryContext) -> List[ScheduleEvent]:
+        eligible_events = []
+        sch = boundary_context.extract_schedule()
+        dates = boundary_context.get_dates()
+        for sch_event in boundary_context.get_schedule_events():
+            if not any(self.__has_variety_conflict(sch, date, sch_event) for date in dates):
+                eligible_events.append(sch_event)
+        return eligible_events
+
+    def __has_variety_conflict(self, sch: Schedule, date: str, sch_event: ScheduleEvent) -> bool:
+        for variety in self._boundary['variety']:
+            attribute = variety['attribute']
+            event_value = sch_event.get_attribute(attribute)
+            if event_value is None:
+                continue
+            if 'value' in variety and variety['value'] != event_value:
+                continue
+            days = get_time_span_days(variety['window'])
+            count = sch.get_attribute_window_count(attribute, event_value, date, days)
+            if count + 1 > variety['max']:
+                Logger.log('Found variety conflict on event id=%s (%s=%s) at %s', LoggerLevel.DEBUG, sch_event.get_id(), attribute, event_value, date)
+                return True
+        return False
+
+    def get_boundary_class(self) -> str:
+        return 'variety'
@@ -63,7 +63,7 @@ class BoundaryContext(Context):
 class ScheduleEventFilterContext(Context):
     """ A context which holds data required to run schedule event filter functions.
     """
-    def __init__(self, sch: Schedule, date: str, sch_events: List[ScheduleEvent]):
+    def __init__(self, sch: Schedule, date: str, sch_events: List[ScheduleEvent], attr_index: Any=None):
         if not isinstance(sch, Schedule):
             raise ContextError('Unexpected sch is not a Schedule. Instead got: %s' % (sch))
         if not isinstance(sch_events, list):
@@ -73,7 +73,8 @@ class ScheduleEventFilterContext(Context):
         self._set_context(dict(
             sch=sch,
             date=date,
-            sch_events=sch_events
+            sch_events=sch_events,
+            attr_index=attr_index
         ))
 
     def get_schedule_events(self) -> List[ScheduleEvent]:
@@ -84,3 +85,7 @@ class ScheduleEventFilterContext(Context):
 
     def get_schedule(self) -> Schedule:
         return self._context['sch']
+
+    def get_attribute_index(self) -> Any:
+        """ Returns EventAttributeIndex over the event catalog (or None if not available). """
+        return self._context['attr_index']
@@ -4,11 +4,13 @@
 from py_matplanering.core.handler.handler import AbstractHandler
 
 from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.tracer import traced
 
 from typing import (Any)
 
 class DeterminateDecideCandidateHandler(AbstractHandler):
     """ Handles building determinate candidates. """
+    @traced(category='handler')
     def handle(self, request: Any) ->  Any:
         Logger.log('Running handler', verbosity=LoggerLevel.DEBUG)
         sch_builder = request.get_schedule_builder()
@@ -10,6 +10,7 @@ from py_matplanering.core.schedule import schedule_event_filter
 from py_matplanering.core.planner.planner_base import PlannerBase
 
 from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.tracer import traced
 from py_matplanering.utilities import schedule_helper
 
 from typing import (Any)
@@ -26,6 +27,7 @@ class SetupHandler(AbstractHandler):
         self.__exclude_event_ids = exclude_event_ids
         return self
 
+    @traced(category='handler')
     def handle(self, request: Any) -> Any:
         Logger.log('Running handler', verbosity=LoggerLevel.DEBUG)
         sch_builder = request.get_schedule_builder()
@@ -42,6 +44,7 @@ class SetupHandler(AbstractHandler):
             (schedule_event_filter.PlacingScheduleEventFilter(), False),
             (schedule_event_filter.DateIntervalScheduleEventFilter(), False),
             (schedule_event_filter.DistanceScheduleEventFilter(), False),
+            (schedule_event_filter.VarietyScheduleEventFilter(), False),
             (schedule_event_filter.QuotaScheduleEventFilter(), False)
         ]
 
@@ -55,7 +58,7 @@ class SetupHandler(AbstractHandler):
         for filter_obj, is_custom in filter_objects:
             if filter_obj.get_name() in registered_names:
                 raise HandlerError('Attempting to re-register filter schedule event function: %s' % (filter_obj.get_name()))
-            Logger.log('Registering filter event function: %s' % (filter_obj.get_name()), LoggerLevel.DEBUG)
-            sch_builder.register_filter_event_function(filter_obj.get_filter_function(), test_run=not is_custom)
+            Logger.log('Registering filter event function: %s', LoggerLevel.DEBUG, filter_obj.get_name())
+            sch_builder.register_filter_event_function(filter_obj.get_filter_function(), test_run=not is_custom, name=filter_obj.get_name())
             registered_names.add(filter_obj.get_name())
         return super().handle(request)
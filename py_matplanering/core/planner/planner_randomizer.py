@@ -13,17 +13,20 @@ class PlannerRandomizer(PlannerBase):
     def __init__(self):
         pass
 
-    def plan_init(self, sch_options: dict, prep_events: dict={}) -> Schedule:
-        schedule = schedule_helper.make_schedule(sch_options, prep_events)
+    def plan_init(self, sch_options: dict, schedule: Schedule=None) -> Schedule:
+        if schedule is None:
+            # Current version only allows one event each day (as PlannerDefault).
+            # The limit is set on a copy, sch_options belongs to the caller.
+            sch_options = dict(sch_options, daily_event_limit=1)
+            schedule = schedule_helper.make_schedule(sch_options)
         self._sch_builder.set_build_options(dict(
             apply_boundaries=False # ignore boundaries since events are randomized
         ))
         return schedule
 
-    def plan_resolve_conflict(self, date: str, conflicting_events: list) -> Any:
+    def plan_resolve_conflict(self, schedule: Schedule, date: str, conflicting_events: list) -> Any:
         """ This should always occur because all events are in conflict since
         no boundaries are ever applied. """
-        build_options = self._sch_builder.get_build_options()
         r_event = random.choice(conflicting_events)
         return r_event
 
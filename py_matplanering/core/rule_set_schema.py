@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Validates rules of rule sets against the schema of each boundary.
+    A boundary module registers its schema as module level SCHEMA (see utilities.schema),
+    which is compiled once per process. Boundary modules without SCHEMA accept any data.
+    Results are cached by content hash of the rule set, so an unchanged
+    rule set is only validated once. The cache keeps the results of the
+    RULE_SET_CACHE_SIZE most recently validated rule sets.
+"""
+from py_matplanering.utilities import loader
+from py_matplanering.utilities.common import hash_content
+from py_matplanering.utilities.schema import compile_schema
+
+from typing import Any, Callable, List
+
+import re
+
+_BOUNDARY_NAME = re.compile(r'^[a-z][a-z0-9_]*$')
+_boundary_validators = {}
+RULE_SET_CACHE_SIZE = 32
+_rule_set_results = {} # content hash -> errors, in order of last use
+
+def get_boundary_validator(boundary: str) -> Callable[[Any, str], List[str]]:
+    """ Returns compiled validator of boundary data.
+        Raises Exception if boundary is unknown. """
+    if boundary not in _boundary_validators:
+        if not isinstance(boundary, str) or not _BOUNDARY_NAME.match(boundary):
+            raise Exception('Invalid boundary name: %s' % (boundary))
+        module_name = 'boundary_%s' % (boundary)
+        try:
+            boundary_module = loader.load_boundaries([module_name])[module_name]
+        except ModuleNotFoundError:
+            raise Exception('Unknown boundary: %s' % (boundary))
+        schema = getattr(boundary_module, 'SCHEMA', None)
+        _boundary_validators[boundary] = compile_schema(schema if schema is not None else dict(type='any'))
+    return _boundary_validators[boundary]
+
+def validate_rule(rule: Any, path: str='rule') -> List[str]:
+    """ Returns error messages of rule, e.g. {"type": "boundary", "boundary": "cap", "cap": [...]} """
+    if not isinstance(rule, dict):
+        return ['%s: expected dict, instead got: %s' % (path, type(rule).__name__)]
+    if rule.get('type') != 'boundary':
+        return ['%s: unknown rule type: %s' % (path, rule.get('type'))]
+    boundary = rule.get('boundary')
+    try:
+        validate = get_boundary_validator(boundary)
+    except Exception as e:
+        return ['%s: %s' % (path, e)]
+    if boundary not in rule:
+        return ['%s: missing boundary data "%s"' % (path, boundary)]
+    return validate(rule[boundary], '%s.%s' % (path, boundary))
+
+def validate_rule_set(rule_set: dict) -> List[tuple]:
+    """ Returns errors of all rules in rule set as (index, id, msg).
+        index and id are those of the rule set row containing the rule. """
+    key = hash_content(rule_set)
+    errors = _rule_set_results.pop(key, None)
+    if errors is None:
+        errors = []
+        for idx, row in enumerate(rule_set.get('rule_set') or []):
+            if not isinstance(row, dict) or not isinstance(row.get('rules'), list):
+                continue # structure is validated by Validator
+            for rule_idx, rule in enumerate(row['rules']):
+                for err_msg in validate_rule(rule, '%s.rules[%s]' % (row.get('name'), rule_idx)):
+                    errors.append((idx, row.get('id'), err_msg))
+        errors = tuple(errors)
+        if len(_rule_set_results) >= RULE_SET_CACHE_SIZE:
+            del _rule_set_results[next(iter(_rule_set_results))]
+    _rule_set_results[key] = errors
+    return list(errors)
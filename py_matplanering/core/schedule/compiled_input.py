@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from py_matplanering.core.error import BaseError
+
+from py_matplanering.utilities import json_codec
+from py_matplanering.utilities.common import hash_content
+from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.time_helper import intern_date
+
+import functools, hashlib, os
+
+PACKAGE_NAME = 'pymatplanering'
+
+class CompiledInputError(BaseError):
+    def __init__(self, message, capture_data = {}):
+        super(CompiledInputError, self).__init__(message)
+        self.capture_data = capture_data
+
+    def __str__(self):
+        return self.message
+
+@functools.lru_cache(maxsize=1)
+def compute_code_fingerprint() -> str:
+    """ Fingerprint of the code which produces compiled input: installed package version and
+        the source of every module of py_matplanering (boundaries, validation, candidates...).
+        Any code change thus invalidates cached artifacts. Computed once per process. """
+    from importlib import metadata # imported on use, the cache is optional
+    try:
+        version = metadata.version(PACKAGE_NAME)
+    except metadata.PackageNotFoundError:
+        version = None
+    package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sources = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(package_dir):
+        dir_names[:] = sorted(dir_name for dir_name in dir_names if dir_name != '__pycache__')
+        for file_name in sorted(file_names):
+            if not file_name.endswith('.py'):
+                continue
+            path = os.path.join(dir_path, file_name)
+            sources.update(os.path.relpath(path, package_dir).encode('utf-8'))
+            with open(path, 'rb') as fp:
+                sources.update(fp.read())
+    return hash_content(dict(version=version, sources=sources.hexdigest()))
+
+class CompiledInput:
+    """ A compiled input artifact holds what is derived from (event data, rule sets, schedule options)
+    before planning starts:
+        * event_data:   validated event data with global rules injected.
+        * rule_set:     validated rule sets.
+        * candidates:   determinate candidate dates by event id.
+    The artifact is keyed by content hashes of its inputs and by a fingerprint of the code
+    which derives them (see CompiledInput.compute_key), so identical inputs map onto the
+    same artifact until the code changes.
+    """
+    VERSION = 2
+
+    def __init__(self, key: str, event_data: dict, rule_set: list, candidates: dict=None):
+        self.version = CompiledInput.VERSION
+        self.key = key
+        self.event_data = event_data
+        self.rule_set = rule_set
+        self.candidates = candidates
+
+    @staticmethod
+    def compute_key(event_data: dict, rule_set: list, sch_options: dict) -> str:
+        """ Key of raw input. Only schedule options which affect candidates are part of the key. """
+        content_hashes = dict(
+            version=CompiledInput.VERSION,
+            code=compute_code_fingerprint(),
+            event_data=hash_content(event_data),
+            rule_set=hash_content(rule_set),
+            sch_options=hash_content(dict(
+                schedule_interval=sch_options.get('schedule_interval'),
+                event_defaults=sch_options.get('event_defaults')
+            ))
+        )
+        return hash_content(content_hashes)
+
+    def has_candidates(self) -> bool:
+        return self.candidates is not None
+
+    def as_dict(self) -> dict:
+        # candidates are stored as [event id, dates] pairs since JSON keys must be str
+        candidates = None
+        if self.candidates is not None:
+            candidates = [[event_id, dates] for event_id, dates in self.candidates.items()]
+        return dict(
+            version=self.version,
+            key=self.key,
+            event_data=self.event_data,
+            rule_set=self.rule_set,
+            candidates=candidates
+        )
+
+    @staticmethod
+    def from_dict(dct: dict) -> 'CompiledInput':
+        candidates = None
+        if dct['candidates'] is not None:
+            candidates = dict((event_id, [intern_date(date) for date in dates]) for event_id, dates in dct['candidates'])
+        artifact = CompiledInput(dct['key'], dct['event_data'], dct['rule_set'], candidates)
+        artifact.version = dct['version']
+        return artifact
+
+class CompiledInputCache:
+    """ Stores compiled input artifacts as JSON files in cache_dir (one file per key).
+    Loading an artifact does not execute any code, however, an artifact is trusted
+    as already validated input, so cache_dir must only be writable by trusted users.
+    Example:
+    cache = CompiledInputCache('.cache')
+    key = CompiledInput.compute_key(event_data, rule_set, sch_options)
+    artifact = cache.load(key)
+    if artifact is None:
+        ...
+        cache.store(CompiledInput(key, event_data, rule_set, candidates))
+    """
+    def __init__(self, cache_dir: str):
+        if not cache_dir:
+            raise CompiledInputError('cache_dir is required')
+        self.__cache_dir = cache_dir
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.__cache_dir, 'compiled_input_%s.json' % (key))
+
+    def load(self, key: str) -> CompiledInput:
+        """ Returns artifact of key or None if missing (or unreadable). """
+        path = self.get_path(key)
+        if not os.path.isfile(path):
+            Logger.log('Compiled input cache miss: %s', LoggerLevel.DEBUG, key)
+            return None
+        try:
+            artifact = CompiledInput.from_dict(json_codec.read_file(path))
+        except Exception as e:
+            Logger.log('Ignoring unreadable compiled input artifact: %s (%s)', LoggerLevel.INFO, path, e)
+            return None
+        if artifact.version != CompiledInput.VERSION or artifact.key != key:
+            Logger.log('Ignoring stale compiled input artifact: %s', LoggerLevel.INFO, path)
+            return None
+        Logger.log('Compiled input cache hit: %s', LoggerLevel.DEBUG, key)
+        return artifact
+
+    def store(self, artifact: CompiledInput) -> str:
+        """ Writes artifact atomically. Returns path of artifact. """
+        if not isinstance(artifact, CompiledInput):
+            raise CompiledInputError('artifact must be instance of CompiledInput, instead got: %s' % (type(artifact)))
+        import tempfile # imported on use, the cache is optional
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        path = self.get_path(artifact.key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.__cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                json_codec.dump(artifact.as_dict(), fp)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        Logger.log('Stored compiled input artifact: %s', LoggerLevel.DEBUG, path)
+        return path
@@ -12,10 +12,15 @@ from py_matplanering.utilities.time_helper import (
 )
 
 from py_matplanering.utilities import common, misc, time_helper
+from py_matplanering.utilities.metrics import Metrics
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping
+from types import MappingProxyType
 
 import copy, random
 
-from typing import Any, Union, List
+from typing import Any, Iterable, Union, List
 
 class ScheduleError(BaseError):
     def __init__(self, message, capture_data = {}):
@@ -58,6 +63,9 @@ class ScheduleEvent:
     def get_candidates(self) -> list:
         return self.__event['candidates']
 
+    def has_candidates(self) -> bool:
+        return 'candidates' in self.__event
+
     def get_mindate(self) -> str:
         return self.__event.get('mindate')
 
@@ -99,9 +107,27 @@ class ScheduleEvent:
                 dct['candidates'] = partial1 + interm + partial2
         return dct
 
+    def project(self, props: list=None) -> dict:
+        """ Projects the event onto props without copying the event.
+            props=None includes all props (candidates are shortened as in as_dict).
+            Values are shared with the event and should not be mutated. """
+        if props is None:
+            dct = dict(self.__event)
+            if dct.get('candidates'):
+                showlen = 3
+                if len(dct['candidates']) > (showlen*2):
+                    dct['candidates'] = dct['candidates'][0:showlen] + ["[...]"] + dct['candidates'][-showlen:]
+            return dct
+        event = self.__event
+        return dict((k, event[k]) for k in props if k in event)
+
     def get_prio(self) -> int:
         return self.__event['prio']
 
+    def get_attribute(self, attribute: str, default: Any=None) -> Any:
+        """ Returns catalog attribute of event, e.g. type, difficulty or class. """
+        return self.__event.get(attribute, default)
+
 
 class ScheduleQuota:
     def __init__(self):
@@ -142,6 +168,28 @@ class ScheduleQuota:
         """
         return self.__consume_quota_usage(sch_event, dates, consume)
 
+    def consume_bulk_quota_usage(self, placed_dates: dict) -> int:
+        """
+            Consumes quota usage in aggregate for many placements at once.
+            placed_dates:   { event_id: [date, ...] } where each date is one placement.
+            Equivalent to calling consume_quota_usage (consume=1) once per placement,
+            but each quota is only visited once. Returns number of consumed placements.
+        """
+        consumed = 0
+        for event_id, dates in placed_dates.items():
+            quotas = self.event_quotas.get(event_id)
+            if not quotas:
+                continue
+            for quota in quotas:
+                quota_dates = set(quota['dates'])
+                used = sum(1 for date in dates if date in quota_dates)
+                if used == 0:
+                    continue
+                quota['used'] += used
+                quota['quota'] = max(0, quota['quota'] - used)
+                consumed += used
+        return consumed
+
     def exists(self, event_id: int) -> bool:
         return self.event_quotas.get(event_id) is not None
 
@@ -162,13 +210,155 @@ class ScheduleQuota:
         return(True, 'ok', None)
 
 
+class ScheduleAttributeCounter:
+    """
+        Counts placed events by attribute value and day, e.g. how many events
+        with type=fish that are placed on each date. Attributes are tracked
+        lazily: the first query of an attribute counts existing placements,
+        after which each placement (or removal) updates a sorted list of the
+        date ordinals of placed events with that value in O(log n).
+        { attribute: { value: [date ordinal, ...] } }
+    """
+    def __init__(self):
+        self.attribute_counts = dict()
+
+    def is_tracked(self, attribute: str) -> bool:
+        return attribute in self.attribute_counts
+
+    def track(self, attribute: str, placements: Iterable[tuple]):
+        """ Starts tracking attribute given existing placements (date, ScheduleEvent). """
+        self.attribute_counts[attribute] = dict()
+        for date, sch_event in placements:
+            self.__update(attribute, sch_event, date, 1)
+
+    def __update(self, attribute: str, sch_event: ScheduleEvent, date: str, delta: int):
+        value = sch_event.get_attribute(attribute)
+        if value is None:
+            return
+        ordinals = self.attribute_counts[attribute].setdefault(value, [])
+        ordinal = time_helper.date_to_ordinal(date)
+        if delta > 0:
+            insort(ordinals, ordinal)
+            return
+        idx = bisect_left(ordinals, ordinal)
+        if idx < len(ordinals) and ordinals[idx] == ordinal:
+            del ordinals[idx]
+
+    def update(self, sch_event: ScheduleEvent, date: str, delta: int):
+        """ Updates all tracked attributes. delta: 1 when placed, -1 when removed. """
+        for attribute in self.attribute_counts:
+            self.__update(attribute, sch_event, date, delta)
+
+    def get_max_window_count(self, attribute: str, value: Any, date: str, window: int) -> int:
+        """ Returns the highest count of placed events with attribute == value
+            within any window of window days which contains date.
+            Costs O(k log n) where k is the number of such events near date,
+            independent of the window length. """
+        ordinals = self.attribute_counts[attribute].get(value)
+        if not ordinals:
+            return 0
+        ordinal = time_helper.date_to_ordinal(date)
+        # a window containing date starts within [ordinal-window+1, ordinal]. The highest
+        # count is found by a window which starts at a placed event or at date itself.
+        lo = bisect_left(ordinals, ordinal-window+1)
+        hi = bisect_right(ordinals, ordinal)
+        max_count = 0
+        for start in ordinals[lo:hi] + [ordinal]:
+            count = bisect_right(ordinals, start+window-1) - bisect_left(ordinals, start)
+            max_count = max(max_count, count)
+        return max_count
+
+
+class ScheduleDays(Mapping):
+    """
+    Sparse store of the days in a Schedule, mapping str date -> day ({'events': [...]}).
+    Every date in the schedule interval is a key, but a day record is only
+    materialized when it is written to through days.materialize(date)
+    (e.g. days.materialize(date)['events'].append(...)).
+    Lookups with days[date] or days.get(date) are read-only and return a shared
+    immutable empty day for dates that have not been materialized.
+    Dates outside the schedule interval may be added with days[date] = day.
+    Materialized dates are kept sorted as they are added, so lookups are O(1)
+    and iterating materialized days scales with placements, not interval length.
+    """
+    EMPTY_DAY = MappingProxyType({'events': ()})
+
+    def __init__(self, dates: tuple, prep_events: dict=None):
+        # dates is a sorted tuple of all dates in the schedule interval.
+        self.__dates = tuple(dates)
+        self.__date_set = time_helper.get_date_set(self.__dates[0], self.__dates[-1]) if self.__dates else frozenset()
+        self.__extra_dates = []
+        self.__days = {}
+        # sorted list of the dates in self.__days
+        self.__materialized_dates = []
+        for date in prep_events or ():
+            if date in self.__date_set:
+                self.__materialize(date, { 'events': prep_events[date] })
+
+    def __materialize(self, date: str, day: dict) -> dict:
+        if date not in self.__days:
+            insort(self.__materialized_dates, date)
+        self.__days[date] = day
+        return day
+
+    def __contains__(self, date: Any) -> bool:
+        return date in self.__days or date in self.__date_set
+
+    def __getitem__(self, date: str) -> dict:
+        day = self.__days.get(date)
+        if day is None:
+            if date not in self.__date_set:
+                raise KeyError(date)
+            return ScheduleDays.EMPTY_DAY
+        return day
+
+    def __setitem__(self, date: str, day: dict):
+        if date not in self:
+            self.__extra_dates.append(date)
+        self.__materialize(date, day)
+
+    def __iter__(self):
+        yield from self.__dates
+        yield from self.__extra_dates
+
+    def __len__(self) -> int:
+        return len(self.__dates) + len(self.__extra_dates)
+
+    def materialize(self, date: str) -> dict:
+        """ Returns writable day of date, materializing it if needed.
+            Raises KeyError if date is not in the schedule. """
+        day = self.__days.get(date)
+        if day is None:
+            if date not in self.__date_set:
+                raise KeyError(date)
+            day = self.__materialize(date, { 'events': [] })
+        return day
+
+    def get(self, date: str, default: Any=None) -> Any:
+        """ Looks up day without materializing it. """
+        day = self.__days.get(date)
+        if day is not None:
+            return day
+        if date in self.__date_set:
+            return ScheduleDays.EMPTY_DAY
+        return default
+
+    def materialized(self) -> list:
+        """ Returns list of (date, day) of materialized days in date order. """
+        days = self.__days
+        return [(date, days[date]) for date in self.__materialized_dates]
+
+    def count_materialized(self) -> int:
+        return len(self.__days)
+
+
 class Schedule:
     """
     Schedule is organized by:
         each Schedule has many days.
         each day has many ScheduleEvent.
     """
-    def __init__(self, sch_options: dict, prep_events: dict={}):
+    def __init__(self, sch_options: dict, prep_events: dict=None):
         # self.schedule contains any details that should be
         # visible outside the class via as_dict.
         if 'schedule_interval' not in sch_options:
@@ -185,18 +375,18 @@ class Schedule:
             schedule_enddate=sch_options['schedule_interval'][1],
             planning_startdate=planning_startdate,
             planning_enddate=planning_enddate,
-            days={},
+            days=None,
             use_validation=bool(sch_options.get('use_validation', True)),
             event_defaults=sch_options.get('event_defaults', {}),
             name=sch_options.get('name')
         )
         sr = get_date_range(self.schedule['schedule_startdate'], self.schedule['schedule_enddate'])
-        for date in sr:
-            # self.schedule['days'][date] = { 'events': [] }
-            self.schedule['days'][date] = { 'events': prep_events.get(date, []) }
+        # days are materialized on demand, see ScheduleDays
+        self.schedule['days'] = ScheduleDays(sr, prep_events)
         self.sch_options = sch_options
         # { sch_event_id: [ { 'quota': ...} ]}
         self.sch_quota = ScheduleQuota()
+        self.sch_counter = ScheduleAttributeCounter()
         # wr = get_week_range(sch_options['startdate'], sch_options['enddate'])
         # self.week_range = wr # Lazy load?
 
@@ -212,24 +402,17 @@ class Schedule:
         self.schedule['days'][date] = {'events': [] }
 
     def as_dict(self) -> dict:
-        sch_dct = copy.deepcopy(self.schedule)
-        sch_dct['options'] = self.sch_options
-        for day_num in sch_dct['days']:
-            day = sch_dct['days'][day_num]
-            tmp_events = []
-            for event in day['events']:
-                event_dct = copy.deepcopy(event.as_dict())
-                if self.sch_options.get('include_props'):
-                    new_event_dct = dict((k, event_dct[k]) for k in self.sch_options['include_props'] if k in event_dct)
-                tmp_events.append(new_event_dct)
-            sch_dct['days'][day_num]['events'] = tmp_events
-            del tmp_events
-        return sch_dct
+        """ Returns a dict representation of the schedule where each event
+            is projected onto the schedule option include_props.
+            Event values are shared with the schedule (no deep copies). """
+        from py_matplanering.core.schedule.schedule_serializer import ScheduleSerializer
+        return ScheduleSerializer(self).as_dict()
 
     def mark_as_built(self):
         self.schedule['built_dt'] = time_now()
 
     def get_day(self, date: str):
+        """ Read-only day of date, see ScheduleDays. """
         return self.schedule['days'][date]
 
     def get_days(self):
@@ -276,7 +459,9 @@ class Schedule:
         self.schedule['planning_enddate'] = planning_enddate
 
     def get_events_by_date(self, date: str) -> list:
-        day = self.get_day(date)
+        day = self.get_days().get(date)
+        if day is None:
+            raise ScheduleError('Attempting to get events of missing schedule date: %s' % (date))
         return day['events']
 
     def get_events_by_day(self, day) -> list:
@@ -284,39 +469,36 @@ class Schedule:
 
     def get_events_by_week_num(self, week_num: int) -> list:
         events = []
-        days = self.get_days()
-        for date in days:
+        for date, day in self.get_days().materialized():
             if time_helper.get_week_number(date) == week_num:
-                events.extend(days[date]['events'])
+                events.extend(day['events'])
         return events
 
     def get_events(self, sch_event_id: int=None) -> list:
-        days = self.get_days()
         events = []
-        for date in days:
+        for date, day in self.get_days().materialized():
             if sch_event_id:
-                events.extend([event for event in days[date]['events'] if event.get_id() == sch_event_id])
+                events.extend([event for event in day['events'] if event.get_id() == sch_event_id])
             else:
-                events.extend(days[date]['events'])
+                events.extend(day['events'])
         return events
 
     def get_grouped_events(self, sch_event_id: int=None) -> dict:
+        """ Returns { date: [ScheduleEvent, ...] } of materialized days (in date order).
+            Dates which have never held an event are left out. """
         rs = {}
-        days = self.get_days()
-        for date in days:
+        for date, day in self.get_days().materialized():
             if sch_event_id:
-                events = [event for event in days[date]['events'] if event.get_id() == sch_event_id]
+                rs[date] = [event for event in day['events'] if event.get_id() == sch_event_id]
             else:
-                events = days[date]['events']
-            rs[date] = events
+                rs[date] = day['events']
         return rs
 
     def get_events_by_id(self, sch_event_id: int) -> list:
         return self.get_events(sch_event_id)
 
     def day_has_event(self, date: str) -> bool:
-        day = self.get_day(date)
-        return len(day['events']) > 0
+        return len(self.get_events_by_date(date)) > 0
 
     def clear_day(self, date: str) -> bool:
         """ Clear day from events.
@@ -324,10 +506,13 @@ class Schedule:
                 True if cleared any event(s).
                 False if no event(s) cleared.
         """
-        day = self.get_day(date)
+        if not self.day_has_event(date):
+            return False
+        day = self.get_days().materialize(date)
         cleared = False
         for sch_event in day['events']:
             self.sch_quota.consume_quota_usage(sch_event, [date], consume=-1)
+            self.sch_counter.update(sch_event, date, -1)
             day['events'] = []
             cleared = True
         return cleared
@@ -348,6 +533,7 @@ class Schedule:
         return ok, msg, data
 
     def validate_quota(self, sch_event: ScheduleEvent, date: str) -> tuple:
+        Metrics.inc('quota_validations_total')
         return self.__validate_add_event(sch_event, date)
 
     def add_event(self, dates: list, sch_event: ScheduleEvent):
@@ -363,6 +549,7 @@ class Schedule:
             # Check if it exceeds quota
             valid, validity_msg, validity_data = self.__validate_add_event(sch_event, date)
             if valid:
+                selected_day = self.get_days().materialize(date)
                 selected_day['events'].append(sch_event)
                 if len(selected_day['events']) > self.sch_options['daily_event_limit']:
                     event_str = ""
@@ -372,6 +559,7 @@ class Schedule:
                     event_str = event_str.strip(", ")
                     raise ScheduleError('Date (%s) contains multiple (%s) instances of events (%s). Expected: %s event(s)on this date' % (date, len(selected_day['events']), event_str, self.sch_options['daily_event_limit']))
                 self.sch_quota.consume_quota_usage(sch_event, dates, consume=1)
+                self.sch_counter.update(sch_event, date, 1)
             else:
                 # Invalid addition not allowed
                 validity_data['excessive_event'] = sch_event.as_dict(short=True)
@@ -381,18 +569,60 @@ class Schedule:
             #     if len(selected_day['events']) > self.sch_options['daily_event_limit']:
             #         raise Exception('A schedule day is restricted to contain only %s event, exceeded given date %s: %s' % (date, selected_day['events']))
 
+    def load_events(self, placements: Iterable[tuple], verify: bool=True) -> int:
+        """ Bulk loads placements, an iterable of (date, ScheduleEvent), in one pass.
+            Intended for schedules that have already been produced, so unlike
+            add_event the placements are not validated one by one against
+            planning interval and quotas. Quota usage is instead rebuilt in
+            aggregate once all placements are loaded.
+            verify: batch-verifies the loaded days against the daily event limit.
+            Raises ScheduleError if a date is missing from the schedule.
+            Returns number of loaded placements. """
+        days = self.get_days()
+        placed_dates = {}
+        loaded_dates = set()
+        loaded = 0
+        for date, sch_event in placements:
+            if not isinstance(sch_event, ScheduleEvent):
+                raise ScheduleError('sch_event must be instance of ScheduleEvent, instead got: %s of type %s' % (repr(sch_event), type(sch_event)))
+            if date not in days:
+                raise ScheduleError("Attempting to load event to missing schedule date: %s" % (date))
+            days.materialize(date)['events'].append(sch_event)
+            self.sch_counter.update(sch_event, date, 1)
+            if sch_event.get_id() not in placed_dates:
+                placed_dates[sch_event.get_id()] = []
+            placed_dates[sch_event.get_id()].append(date)
+            loaded_dates.add(date)
+            loaded += 1
+        daily_event_limit = self.sch_options.get('daily_event_limit')
+        if verify and daily_event_limit:
+            for date in sorted(loaded_dates):
+                if len(days[date]['events']) > daily_event_limit:
+                    raise ScheduleError('Date (%s) contains multiple (%s) instances of events. Expected: %s event(s) on this date' % (date, len(days[date]['events']), daily_event_limit))
+        self.sch_quota.consume_bulk_quota_usage(placed_dates)
+        return loaded
+
     def remove_event(self, sch_event: ScheduleEvent):
-        for date in self.get_days():
+        for date, day in self.get_days().materialized():
             tmp_events = []
-            for event in self.get_events_by_date(date):
+            for event in day['events']:
                 if event.get_id() == sch_event.get_id():
+                    self.sch_counter.update(event, date, -1)
                     continue
                 tmp_events.append(event)
-            self.get_day(date)['events'] = tmp_events
+            day['events'] = tmp_events
 
     def add_quota(self, sch_event_id: int, startdate: str, enddate: str, quota: dict) -> list:
         return self.sch_quota.add_quota(sch_event_id, startdate, enddate, quota)
 
+    def get_attribute_window_count(self, attribute: str, value: Any, date: str, window: int) -> int:
+        """ Returns the highest number of placed events with attribute == value
+            within any window of window days which contains date. """
+        if not self.sch_counter.is_tracked(attribute):
+            placements = [(day_date, event) for day_date, day in self.get_days().materialized() for event in day['events']]
+            self.sch_counter.track(attribute, placements)
+        return self.sch_counter.get_max_window_count(attribute, value, date, window)
+
     def get_quotas(self, sch_event_id: int):
         return self.sch_quota.get(sch_event_id)
 
@@ -426,7 +656,7 @@ class ScheduleIterator:
                             certain boundaries to fully eliminate repeatable patterns.
         """
         if isinstance(sch_dct, Schedule):
-            sch_dct = sch_dct.as_dict()
+            sch_dct = sch_dct.get_days()
         if iter_method in ['sorted', 'standard']:
             self.iter_list = sorted(list(sch_dct))
         elif iter_method == 'random':
@@ -15,6 +15,8 @@ from py_matplanering.utilities import (
     misc
 )
 from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.tracer import traced
+from py_matplanering.utilities.metrics import Metrics
 
 import copy, random
 
@@ -66,6 +68,7 @@ class ScheduleBuilder:
         self.__boundaries = None
         self.__sch_manager = ScheduleManager()
         self.__filter_event_functions = []
+        self.__filter_event_names = []
 
     def set_planner(self, planner: PlannerBase):
         """ May only be called once. """
@@ -81,7 +84,7 @@ class ScheduleBuilder:
             master schedule and spawning candidates from the master
             schedule.
         """
-        Logger.log('Setting schedule to: %s' % (schedule), verbosity=LoggerLevel.INFO)
+        Logger.log('Setting schedule to: %s', LoggerLevel.INFO, schedule)
         if schedule is None:
             raise ScheduleBuilderError('Schedule is not allowed to be null')
         if self.__sch_manager.has_master_schedule():
@@ -90,7 +93,7 @@ class ScheduleBuilder:
         self.__sch_manager.spawn_minion_schedule('candidates')
 
     def set_build_options(self, build_options: dict):
-        Logger.log('Setting build options to: %s' % (build_options), verbosity=LoggerLevel.DEBUG)
+        Logger.log('Setting build options to: %s', LoggerLevel.DEBUG, build_options)
         self.__build_options.update(build_options)
 
     def get_build_options(self) -> dict:
@@ -102,7 +105,7 @@ class ScheduleBuilder:
     def load_boundaries(self) -> dict:
         Logger.log('Loading boundaries', verbosity=LoggerLevel.DEBUG)
         boundaries = schedule_helper.load_boundaries(self.sch_inp)
-        Logger.log('Loaded boundaries: %s' % (boundaries), verbosity=LoggerLevel.DEBUG)
+        Logger.log('Loaded boundaries: %s', LoggerLevel.DEBUG, boundaries)
         return boundaries
 
     def set_boundaries(self, boundaries: dict):
@@ -122,6 +125,7 @@ class ScheduleBuilder:
             return list(candidates)
         return candidates
 
+    @traced(category='builder')
     def build_candidates(self, boundaries: dict, match_boundary_cb=None):
         Logger.log(verbosity=LoggerLevel.INFO)
         if self.__build_options['build_candidates'] is False:
@@ -129,9 +133,12 @@ class ScheduleBuilder:
         event_data = self.sch_inp.get_event_data(require_active=True, event_defaults=self.__sch_manager.get_master_schedule().get_options('event_defaults'))
         all_dates = self.get_candidates(as_sorted=True, as_list=True)
         final_rule_set = schedule_helper.convert_rule_set(self.sch_inp, boundaries)
-        Logger.log('Converted final rule set into: %s' % (final_rule_set), LoggerLevel.INFO)
+        Logger.log('Converted final rule set into: %s', LoggerLevel.INFO, final_rule_set)
+        # Candidates of a compiled input are already narrowed down by boundaries
+        compiled_candidates = self.sch_inp.get_compiled_candidates() if self.__build_options['apply_boundaries'] is True else None
         # Narrow down matching event <-> date by applying date intersection by each boundary
         for event in event_data:
+            compiled_dates = compiled_candidates.get(event.get_id()) if compiled_candidates is not None else None
             matching_dates = set(all_dates)
             if self.__build_options['apply_boundaries'] is True:
                 for event_rule in event.get_rules():
@@ -147,31 +154,38 @@ class ScheduleBuilder:
                         if match_boundary_cb:
                             if not match_boundary_cb(boundary_obj):
                                 continue
+                        if compiled_dates is not None:
+                            continue
                         boundary_context = BoundaryContext(self.__sch_manager, [event], all_dates)
                         date_matches = boundary_obj.filter_eligible_dates(boundary_context)
                         matching_dates = matching_dates.intersection(set(date_matches))
-            matching_dates = sorted(list(matching_dates))
+            matching_dates = list(compiled_dates) if compiled_dates is not None else sorted(list(matching_dates))
             event.set_candidates(matching_dates)
             for date in event.get_candidates():
-                self.get_candidates()[date]['events'].append(event)
-        return self.get_candidates()
+                self.get_candidates().materialize(date)['events'].append(event)
+        candidates = self.get_candidates()
+        for _, day in candidates.materialized():
+            Metrics.observe('candidates_per_day', len(day['events']))
+        return candidates
 
+    @traced(category='builder')
     def build_event_mapping(self, candidates: list, event_mapping: dict):
         """ Maps event id -> event (from candidates) into event_mapping """
         Logger.log('Building event mapping', verbosity=LoggerLevel.INFO)
         for date in candidates:
-            for event in candidates[date]['events']:
+            for event in candidates.get(date)['events']:
                 if event_mapping.get(event.get_id()):
                     continue
                 event_mapping[event.get_id()] = event
 
+    @traced(category='builder')
     def build_event_occurrence(self, candidates: list, sch_event_dct: dict):
         """ How many times has an event occurred within candidates?
         Such information is placed into sch_event_dct. """
         Logger.log('Building event occurrence from candidates', verbosity=LoggerLevel.INFO)
         for date in candidates:
             occ_dates = []
-            for event in candidates[date]['events']:
+            for event in candidates.get(date)['events']:
                 if event.get_id() not in sch_event_dct:
                     sch_event_dct[event.get_id()] = dict(
                         occurrence=0,
@@ -191,12 +205,13 @@ class ScheduleBuilder:
         iter_plans = self.__sch_manager.get_master_schedule().add_quota(sch_event_id, min(valid_dates), max(valid_dates), quota_plan)
         return iter_plans
 
+    @traced(category='builder')
     def build_indeterminate_boundaries(self, candidates: dict, event_dct: dict):
         Logger.log('Building indeterminate boundaries', verbosity=LoggerLevel.INFO)
         date_to_event_mapping = {}
         processed_ids = set()
         for date in candidates:
-            events = candidates[date]['events']
+            events = candidates.get(date)['events']
             for event in events:
                 if date not in date_to_event_mapping:
                     date_to_event_mapping[date] = set()
@@ -235,7 +250,7 @@ class ScheduleBuilder:
                     event_dates.append(date)
         return event_dates
 
-    def register_filter_event_function(self, filter_fn: Callable, test_run: False=bool):
+    def register_filter_event_function(self, filter_fn: Callable, test_run: False=bool, name: str=None):
         """ Registers a filter event function.
         It mainly adds the filter function to the builder.
         test_run: runs the filter function through a test run to ensure that the filter
@@ -263,9 +278,11 @@ class ScheduleBuilder:
 
         # Finally: register event
         self.__filter_event_functions.append(filter_fn)
+        self.__filter_event_names.append(name or getattr(filter_fn, '__name__', repr(filter_fn)))
 
+    @traced(category='builder')
     def _filter_plannable_events(self, date_list: Union[str, list], sch_events: Union[ScheduleEvent, List[ScheduleEvent]]) -> List[ScheduleEvent]:
-        Logger.log('Filter plannable events from date list: %s and schedule events: %s' % (date_list, sch_events), LoggerLevel.DEBUG)
+        Logger.log('Filter plannable events from date list: %s and schedule events: %s', LoggerLevel.DEBUG, date_list, sch_events)
         if not isinstance(date_list, list):
             date_list = [date_list]
         if not isinstance(sch_events, list):
@@ -273,9 +290,11 @@ class ScheduleBuilder:
 
         if len(self.__filter_event_functions) == 0:
             raise ScheduleBuilderError("Missing filter event functions. Expected: at least one filter function. Call register_filter_event_function() to resolve issue.")
-        ok_events = schedule_helper.run_filter_events_function_chain(self.__sch_manager.get_master_schedule(), date_list, sch_events, self.__filter_event_functions)
+        attr_index = self.sch_inp.get_attribute_index() if self.sch_inp is not None and self.sch_inp.event_data_lst is not None else None
+        ok_events = schedule_helper.run_filter_events_function_chain(self.__sch_manager.get_master_schedule(), date_list, sch_events, self.__filter_event_functions, attr_index, self.__filter_event_names)
         return ok_events
 
+    @traced(category='builder')
     def plan_indeterminate_schedule(self, candidates):
         """ Plans schedule by applying indeterminates.
             This planner method will only plan single events
@@ -328,10 +347,12 @@ class ScheduleBuilder:
                 sch_event = self.__planner.plan_single_event(date_list, sch_event)
                 sch_event.add_metadata('method', 'indeterminate', scope='__system')
                 self.__sch_manager.add_master_event(date_list, sch_event, remove_from_minions=True)
+                Metrics.inc('placements_total', len(date_list), method='indeterminate')
                 planned_days.extend(date_list)
         planned_days = list(set(planned_days))
         self.__build_status = 'indeterminates_planned'
 
+    @traced(category='builder')
     def plan_determinate_schedule(self, candidates):
         # In previous planning phase we created determinate candidates and
         # planned those according to indeterminate rules.
@@ -341,7 +362,7 @@ class ScheduleBuilder:
         Logger.log('Planning determinate schedule', verbosity=LoggerLevel.INFO)
         for next_date in sorted(list(candidates)):
             method = 'determinate'
-            day_obj = candidates[next_date]
+            day_obj = candidates.get(next_date)
             selected_event = None
             if len(day_obj['events']) == 1:
                 method = 'determinate_single'
@@ -353,8 +374,10 @@ class ScheduleBuilder:
                     raise ScheduleBuilderError('Expected event selected by planner to be instance of ScheduleEvent, instead got: %s' % (selected_event))
                 selected_event.add_metadata('method', method, scope='__system')
                 self.__sch_manager.add_master_event([next_date], selected_event, remove_from_minions=False)
+                Metrics.inc('placements_total', method=method)
         self.__build_status = 'plan_ok'
 
+    @traced(category='builder')
     def plan_resolve_conflicts(self, candidates: dict, iter_order: List[str]):
         # In previous phases we identified indeterminate and determinate candidates
         # and planned. However, conflicts were ignored and are instead handled within
@@ -362,21 +385,23 @@ class ScheduleBuilder:
         Logger.log('Planning resolve conflicts', verbosity=LoggerLevel.INFO)
         method = 'resolve_conflict'
         for next_date in iter_order:
-            Logger.log('Attempting to resolve conflict with date %s' % (next_date), verbosity=LoggerLevel.INFO)
-            day_obj = candidates[next_date]
+            Logger.log('Attempting to resolve conflict with date %s', LoggerLevel.INFO, next_date)
+            day_obj = candidates.get(next_date)
             selected_event = None
             if len(day_obj['events']) > 1:
                 ok_events = self._filter_plannable_events(next_date, day_obj['events'])
+                Metrics.inc('conflicts_total', outcome='resolved' if len(ok_events) > 0 else 'unresolved', planner=type(self.__planner).__name__)
                 if len(ok_events) > 0:
                     selected_event = self.__planner.plan_resolve_conflict(self.__sch_manager.get_master_schedule(), next_date, ok_events)
-                    Logger.log('Selected id=%s, name=%s' % (selected_event.get_id(), selected_event.get_name()), verbosity=LoggerLevel.INFO)
+                    Logger.log('Selected id=%s, name=%s', LoggerLevel.INFO, selected_event.get_id(), selected_event.get_name())
                 else:
-                    Logger.log('No OK events found with date %s' % (next_date), LoggerLevel.DEBUG)
+                    Logger.log('No OK events found with date %s', LoggerLevel.DEBUG, next_date)
             if selected_event:
                 if not isinstance(selected_event, ScheduleEvent):
                     raise ScheduleBuilderError('Expected event selected by planner to be instance of ScheduleEvent, instead got: %s' % (selected_event))
                 selected_event.add_metadata('method', 'conflict_resolution', scope='__system')
                 self.__sch_manager.add_master_event([next_date], selected_event, remove_from_minions=False)
+                Metrics.inc('placements_total', method='conflict_resolution')
             else:
                 Logger.log('No selected event', verbosity=LoggerLevel.INFO)
         self.__build_status = 'plan_ok'
@@ -394,6 +419,9 @@ class ScheduleBuilder:
     def get_schedule_input(self):
         return self.sch_inp
 
+    def get_schedule_manager(self) -> ScheduleManager:
+        return self.__sch_manager
+
     def set_schedule_input(self, sch_inp: ScheduleInput):
         self.sch_inp = sch_inp
 
@@ -105,6 +105,27 @@ class DistanceScheduleEventFilter(BaseScheduleEventFilter):
             return filtered_sch_events
         return filter_fn
 
+class VarietyScheduleEventFilter(BaseScheduleEventFilter):
+    def get_name(self) -> str:
+        return 'default__variety_sch_event_filter'
+
+    def get_filter_function(self) -> Callable:
+        def filter_fn(ctx: ScheduleEventFilterContext) -> List[ScheduleEvent]:
+            filtered_sch_events = []
+            for sch_event in ctx.get_schedule_events():
+                event_ok = True
+                for boundary in sch_event.get_boundaries():
+                    if boundary.get_boundary_class() == 'variety':
+                        boundary_ctx = BoundaryContext(ctx.get_schedule(), [sch_event], [ctx.get_date()])
+                        ok_events = boundary.filter_eligible_events(boundary_ctx)
+                        if len(ok_events) == 0:
+                            event_ok = False
+                            break
+                if event_ok:
+                    filtered_sch_events.append(sch_event)
+            return filtered_sch_events
+        return filter_fn
+
 class ExcludeEventIdsScheduleEventFilter(BaseScheduleEventFilter):
     def __init__(self, exclude_event_ids: list):
         self.__exclude_event_ids = exclude_event_ids
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Reports retained memory (bytes) per structure of a schedule build:
+    events, their candidate lists, quota buckets, attribute counters,
+    days of the master and minion schedules and the schedule input.
+    An object shared by several structures is counted once, by the structure
+    which is measured first. Pooled date str (see time_helper.intern_date) are
+    shared by all structures and are reported as a structure of their own.
+    Example:
+    automator_ctrl.set_build_option('keep_schedule_builder', True)
+    schedule = automator_ctrl.build(event_data, rule_set)
+    report = ScheduleFootprint.of_builder(automator_ctrl.get_schedule_builder())
+    table, headers = report.make_table()
+"""
+from py_matplanering.core.planner.planner_base import PlannerBase
+from py_matplanering.core.schedule.schedule import Schedule
+from py_matplanering.core.error import BaseError
+
+from py_matplanering.utilities import time_helper
+
+from typing import Any, Iterable
+
+import sys, types
+
+# never descended into: code, classes and the planner (which refers back to the builder)
+_STOP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, PlannerBase)
+_CONTAINER_TYPES = (list, tuple, set, frozenset)
+
+class ScheduleFootprintError(BaseError):
+    def __init__(self, message, capture_data = {}):
+        super(ScheduleFootprintError, self).__init__(message)
+        self.capture_data = capture_data
+
+    def __str__(self):
+        return self.message
+
+def _iter_slots(obj: Any) -> Iterable[Any]:
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if slot.startswith('__') and not slot.endswith('__'):
+                slot = '_%s%s' % (cls.__name__.lstrip('_'), slot)
+            if hasattr(obj, slot):
+                yield getattr(obj, slot)
+
+class ScheduleFootprint:
+    def __init__(self):
+        self.__seen = set()
+        self.__rows = []
+        # roots are kept alive, since ids of counted objects must not be reused
+        self.__roots = []
+
+    def sizeof(self, *roots: Any) -> tuple:
+        """ Returns (bytes, objects) retained by roots which have not been counted yet. """
+        total, count = 0, 0
+        self.__roots.append(roots)
+        stack = list(roots)
+        seen = self.__seen
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen or isinstance(obj, _STOP_TYPES):
+                continue
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+            count += 1
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, _CONTAINER_TYPES):
+                stack.extend(obj)
+            elif isinstance(obj, types.MappingProxyType):
+                stack.extend(obj.values())
+            else:
+                if hasattr(obj, '__dict__'):
+                    stack.append(vars(obj))
+                stack.extend(_iter_slots(obj))
+        return total, count
+
+    def measure(self, structure: str, *roots: Any) -> dict:
+        """ Measures roots as structure and adds it to the report. """
+        size, count = self.sizeof(*roots)
+        row = dict(structure=structure, bytes=size, objects=count)
+        self.__rows.append(row)
+        return row
+
+    def get_rows(self) -> list:
+        return self.__rows
+
+    def get_total(self) -> int:
+        return sum(row['bytes'] for row in self.__rows)
+
+    def measure_schedule(self, name: str, schedule: Schedule):
+        """ Measures quota buckets, attribute counters and days of schedule. """
+        self.measure('%s.quota_buckets' % (name), schedule.sch_quota)
+        self.measure('%s.attribute_counters' % (name), schedule.sch_counter)
+        self.measure('%s.days' % (name), schedule.get_days())
+        self.measure('%s.other' % (name), schedule)
+
+    def make_table(self) -> tuple:
+        """ Returns (table, headers), largest structure first, with a total row. """
+        headers = ['Structure', 'KiB', 'Share', 'Objects']
+        total = self.get_total() or 1
+        table = []
+        for row in sorted(self.__rows, key=lambda row: -row['bytes']):
+            table.append([row['structure'], round(row['bytes'] / 1024, 1), '%.1f%%' % (100 * row['bytes'] / total), row['objects']])
+        table.append(['Total', round(self.get_total() / 1024, 1), '100.0%', sum(row['objects'] for row in self.__rows)])
+        return table, headers
+
+    @staticmethod
+    def of_schedule(schedule: Schedule) -> 'ScheduleFootprint':
+        """ Footprint of a (built) schedule. """
+        report = ScheduleFootprint()
+        report.measure('date_pool', *time_helper.get_pooled_dates())
+        events = [sch_event for _, day in schedule.get_days().materialized() for sch_event in day['events']]
+        report.measure('event_candidates', *[sch_event.get_candidates() for sch_event in events if sch_event.has_candidates()])
+        report.measure('events', *events)
+        report.measure_schedule(schedule.get_name() or 'schedule', schedule)
+        return report
+
+    @staticmethod
+    def of_builder(sch_builder: Any) -> 'ScheduleFootprint':
+        """ Footprint of a ScheduleBuilder after build: schedule input, events, candidate lists
+            and every schedule of its ScheduleManager (master and minions). """
+        if sch_builder is None:
+            raise ScheduleFootprintError('Missing schedule builder. Expected a build to have run')
+        report = ScheduleFootprint()
+        report.measure('date_pool', *time_helper.get_pooled_dates())
+        sch_inp = sch_builder.get_schedule_input()
+        sch_manager = sch_builder.get_schedule_manager()
+        events = list(sch_inp.event_data_lst or []) if sch_inp is not None else []
+        report.measure('event_candidates', *[sch_event.get_candidates() for sch_event in events if sch_event.has_candidates()])
+        report.measure('events', *events)
+        for sch_key, schedule in sch_manager.schedules.items():
+            report.measure_schedule(sch_key, schedule)
+        if sch_inp is not None:
+            report.measure('schedule_input', sch_inp)
+        report.measure('builder_other', sch_builder)
+        return report
@@ -2,11 +2,90 @@
 # -*- coding: utf-8 -*-
 
 from py_matplanering.core.schedule.schedule import Schedule, ScheduleEvent
+from py_matplanering.core.error import BaseError
 
-from typing import Union
+from typing import Any, Iterable, List, Union
+
+class ScheduleInputError(BaseError):
+    def __init__(self, message, capture_data = {}):
+        super(ScheduleInputError, self).__init__(message)
+        self.capture_data = capture_data
+
+    def __str__(self):
+        return self.message
+
+class EventAttributeIndex:
+    """
+    Secondary indexes over catalog fields of schedule events, e.g. type, difficulty or class.
+    Each index maps attribute value -> bitset (int) where bit n is set if the n:th
+    indexed event has that value. Bitsets are combined with set algebra, e.g.:
+    idx = ctx.get_attribute_index()
+    bitset = idx.select('type', 'fish') & ~idx.select('difficulty', 'hard')
+    ok_events = idx.filter_events(ctx.get_schedule_events(), bitset)
+    Fields are indexed on first use unless given to the constructor.
+    Unhashable attribute values (e.g. lists) are not indexed.
+    """
+    def __init__(self, sch_events: List[ScheduleEvent], fields: Iterable[str]=()):
+        self.__sch_events = sch_events
+        self.__positions = dict((sch_event.get_id(), pos) for pos, sch_event in enumerate(sch_events))
+        self.__indexes = {}
+        for field in fields:
+            self.get_index(field)
+
+    def __make_bitset(self, positions: List[int]) -> int:
+        bits = bytearray((len(self.__sch_events) >> 3) + 1)
+        for pos in positions:
+            bits[pos >> 3] |= 1 << (pos & 7)
+        return int.from_bytes(bits, 'little')
+
+    def get_index(self, field: str) -> dict:
+        """ Returns index of field: { value: bitset } """
+        if field not in self.__indexes:
+            value_positions = {}
+            for pos, sch_event in enumerate(self.__sch_events):
+                value = sch_event.get_attribute(field)
+                try:
+                    value_positions.setdefault(value, []).append(pos)
+                except TypeError:
+                    continue # unhashable
+            self.__indexes[field] = dict((value, self.__make_bitset(positions)) for value, positions in value_positions.items())
+        return self.__indexes[field]
+
+    def get_fields(self) -> list:
+        return list(self.__indexes)
+
+    def select(self, field: str, value: Any) -> int:
+        """ Returns bitset of events where field == value. """
+        return self.get_index(field).get(value, 0)
+
+    def select_any(self, field: str, values: Iterable[Any]) -> int:
+        """ Returns bitset of events where field is any of values. """
+        bitset = 0
+        for value in values:
+            bitset |= self.select(field, value)
+        return bitset
+
+    def mask(self, sch_events: List[ScheduleEvent]) -> int:
+        """ Returns bitset of sch_events. """
+        return self.__make_bitset([self.__positions[sch_event.get_id()] for sch_event in sch_events if sch_event.get_id() in self.__positions])
+
+    def ids(self, bitset: int) -> set:
+        """ Returns event ids of bitset. """
+        ids = set()
+        for pos, sch_event in enumerate(self.__sch_events):
+            if bitset >> pos == 0:
+                break
+            if bitset >> pos & 1:
+                ids.add(sch_event.get_id())
+        return ids
+
+    def filter_events(self, sch_events: List[ScheduleEvent], bitset: int) -> List[ScheduleEvent]:
+        """ Returns sch_events which are members of bitset (order is kept). """
+        positions = self.__positions
+        return [sch_event for sch_event in sch_events if sch_event.get_id() in positions and bitset >> positions[sch_event.get_id()] & 1]
 
 class ScheduleInput:
-    def __init__(self, event_data: dict, rule_set: Union[dict, list], init_schedule: Schedule=None):
+    def __init__(self, event_data: dict, rule_set: Union[dict, list], init_schedule: Schedule=None, index_fields: list=None):
         # Find global rules and insert those into event data
         self.org_event_data_dct = event_data
         if isinstance(rule_set, dict):
@@ -17,6 +96,9 @@ class ScheduleInput:
         self.__converted = False
         self.__require_active = False
         self.__init_schedule = init_schedule
+        self.__index_fields = index_fields or []
+        self.__attr_index = None
+        self.__compiled_candidates = None
 
     def get_event_data(self, require_active: bool=False, event_defaults={}) -> list:
         # Lazy convertion of event data (dict) to schedule events (list of ScheduleEvent)
@@ -34,9 +116,26 @@ class ScheduleInput:
             self.event_data_lst = tmp_event_data
             del tmp_event_data
             self.__converted = True
+            self.__attr_index = None
         self.__require_active = require_active
         return self.event_data_lst
 
+    def get_attribute_index(self) -> EventAttributeIndex:
+        """ Returns attribute index over converted event data (see get_event_data). """
+        if self.event_data_lst is None:
+            raise ScheduleInputError('Attempting to index event data before it has been converted. Call get_event_data() first.')
+        if self.__attr_index is None:
+            self.__attr_index = EventAttributeIndex(self.event_data_lst, self.__index_fields)
+        return self.__attr_index
+
+    def set_compiled_candidates(self, compiled_candidates: dict):
+        """ Determinate candidate dates by event id (see CompiledInput)
+            which replace building candidates by applying boundaries. """
+        self.__compiled_candidates = compiled_candidates
+
+    def get_compiled_candidates(self) -> dict:
+        return self.__compiled_candidates
+
     def get_org_event_data(self):
         return self.org_event_data_dct
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from py_matplanering.core.error import BaseError
+
+from py_matplanering.utilities.time_helper import get_date_range
+
+from typing import Any, Iterable, Iterator, List
+
+import random
+
+class ScheduleSamplerError(BaseError):
+    def __init__(self, message, capture_data = {}):
+        super(ScheduleSamplerError, self).__init__(message)
+        self.capture_data = capture_data
+
+    def __str__(self):
+        return self.message
+
+class ScheduleSampler:
+    """ ScheduleSampler selects a subset of days from a schedule without
+    copying it. Days which are not sampled keep their date but lose their events.
+    Sampling works on schedule records (see schedule_helper.iter_schedule_records)
+    and the sampled records can be fed directly into schedule_helper.parse_schedule.
+    Two ways of sampling are supported:
+        * sample_mask:      seeded selection over a known list of dates,
+                            returns the set of sampled dates (mask).
+        * sample_records:   samples a stream of records. If only placed days
+                            are eligible (require_placed_day), reservoir sampling
+                            is used so that only the sampled days are held in memory.
+    Example:
+    sampler = ScheduleSampler(n_percentage=50, seed=1)
+    records = sampler.sample_records(schedule_helper.iter_schedule_records(fp))
+    schedule = schedule_helper.parse_schedule(records)
+    """
+    def __init__(self, n_percentage: int, n_min: int=1, require_placed_day: bool=False, seed: Any=None):
+        if n_percentage is None or n_percentage > 100 or n_percentage < 0:
+            raise ScheduleSamplerError('n_percentage must range between 0-100, instead got: %s' % (n_percentage))
+        self.__n_percentage = n_percentage
+        self.__n_min = n_min
+        self.__require_placed_day = require_placed_day
+        # Without seed the module level random is used which
+        # respects any random.seed() applied by the caller.
+        self.__random = random if seed is None else random.Random(seed)
+
+    def get_sample_size(self, population: int) -> int:
+        k = int((self.__n_percentage/100)*population)
+        if self.__n_min is not None and k < self.__n_min:
+            k = min(self.__n_min, population)
+        return k
+
+    def sample_mask(self, dates: List[str]) -> set:
+        """ Selects dates from a known population of dates. Returns sampled dates. """
+        return set(self.__random.sample(dates, self.get_sample_size(len(dates))))
+
+    def mask_records(self, records: Iterable[dict], mask: set) -> Iterator[dict]:
+        """ Passes records through, dropping events of days not in mask. """
+        placements = 0
+        for record in records:
+            if record['record'] == 'day':
+                if record['date'] not in mask:
+                    continue
+                placements += len(record['events'])
+            elif record['record'] == 'placement':
+                if record['date'] not in mask:
+                    continue
+                placements += 1
+            elif record['record'] == 'footer':
+                record = dict(record, placements=placements)
+            yield record
+
+    def sample_records(self, records: Iterable[dict]) -> Iterator[dict]:
+        """ Samples a stream of schedule records starting with a header record. """
+        records = iter(records)
+        header = next(records, None)
+        if header is None or header['record'] != 'header':
+            raise ScheduleSamplerError('Schedule records must start with a header record, instead got: %s' % (header))
+        if not self.__require_placed_day:
+            # every date in the schedule interval is eligible, so the population is known up front.
+            mask = self.sample_mask(get_date_range(*header['options']['schedule_interval']))
+            yield header
+            yield from self.mask_records(records, mask)
+            return
+        yield header
+        placed_days = header.get('stats', {}).get('placed_days')
+        units = self.__iter_placed_days(records)
+        if placed_days is None:
+            # population is unknown, fall back to collecting all placed days.
+            sampled = list(units)
+            sampled = self.__random.sample(sampled, self.get_sample_size(len(sampled)))
+        else:
+            sampled = self.__reservoir_sample(units, self.get_sample_size(placed_days))
+        placements = 0
+        for date, day_records in sorted(sampled, key=lambda unit: unit[0]):
+            for record in day_records:
+                placements += len(record['events']) if record['record'] == 'day' else 1
+                yield record
+        if self.__footer is not None:
+            yield dict(self.__footer, placements=placements)
+
+    def __iter_placed_days(self, records: Iterator[dict]) -> Iterator[tuple]:
+        """ Groups consecutive records of the same date into (date, [records]),
+            skipping days without events. The footer is kept aside. """
+        self.__footer = None
+        cur_date, cur_records = None, []
+        for record in records:
+            if record['record'] == 'footer':
+                self.__footer = record
+                continue
+            if record['record'] == 'day' and len(record['events']) == 0:
+                continue
+            if record['date'] != cur_date and len(cur_records) > 0:
+                yield cur_date, cur_records
+                cur_records = []
+            cur_date = record['date']
+            cur_records.append(record)
+        if len(cur_records) > 0:
+            yield cur_date, cur_records
+
+    def __reservoir_sample(self, units: Iterator[tuple], k: int) -> list:
+        """ Algorithm R: keeps a uniform sample of k units from a stream of unknown length. """
+        reservoir = []
+        for idx, unit in enumerate(units):
+            if idx < k:
+                reservoir.append(unit)
+                continue
+            j = self.__random.randrange(idx+1)
+            if j < k:
+                reservoir[j] = unit
+        return reservoir
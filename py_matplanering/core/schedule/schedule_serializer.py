@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from py_matplanering.core.schedule.schedule import Schedule
+from py_matplanering.core.error import BaseError
+
+from py_matplanering.utilities import json_codec
+
+from typing import IO, Any, AnyStr, Callable, Iterator
+
+import io
+
+class ScheduleSerializerError(BaseError):
+    def __init__(self, message, capture_data = {}):
+        super(ScheduleSerializerError, self).__init__(message)
+        self.capture_data = capture_data
+
+    def __str__(self):
+        return self.message
+
+class ScheduleSerializer:
+    """ ScheduleSerializer walks a Schedule once and produces its
+    serialized form without copying the schedule first.
+    Each placed ScheduleEvent is projected onto the schedule option
+    include_props directly from the underlying event, which means
+    that the output is produced in chunks (one chunk per day) that can
+    be written to a file handle as they are created.
+    The produced JSON is compact (see json_codec) and identical to
+    json_codec.dumps_text(schedule.as_dict()). If the file handle is opened in binary
+    mode, values are encoded by json_codec.dumps (which uses an accelerated JSON library
+    when installed) and the produced bytes are the UTF-8 encoding of the text output.
+    The schedule may also be streamed as NDJSON (one JSON record per line):
+        * header:       schedule properties, options and day statistics.
+        * day:          one record per day with its events (granularity='day').
+        * placement:    one record per placed event (granularity='placement').
+        * footer:       number of placements and quota state.
+    Example:
+    serializer = ScheduleSerializer(schedule)
+    with open('output.json', 'wb') as fp:
+        serializer.dump(fp)
+    with open('output.ndjson', 'w') as fp:
+        serializer.dump_ndjson(fp, granularity='placement')
+    """
+    def __init__(self, schedule: Schedule):
+        if not isinstance(schedule, Schedule):
+            raise ScheduleSerializerError('schedule must be instance of Schedule, instead got: %s' % (type(schedule)))
+        self.__schedule = schedule
+        self.__include_props = schedule.get_options().get('include_props')
+
+    def iter_days(self) -> Iterator[tuple]:
+        """ Yields (date, list of projected event dicts) for every day in schedule. """
+        include_props = self.__include_props
+        for date in self.__schedule.get_days():
+            events = self.__schedule.get_events_by_date(date)
+            yield date, [event.project(include_props) for event in events]
+
+    def as_dict(self) -> dict:
+        sch_dct = {}
+        for key, value in self.__schedule.schedule.items():
+            if key == 'days':
+                value = dict((date, dict(events=events)) for date, events in self.iter_days())
+            sch_dct[key] = value
+        sch_dct['options'] = self.__schedule.get_options()
+        return sch_dct
+
+    def iter_encode(self) -> Iterator[str]:
+        """ Yields the JSON representation of the schedule in chunks. """
+        return self.__iter_encode(json_codec.dumps_text, str)
+
+    def iter_encode_bytes(self) -> Iterator[bytes]:
+        """ Yields the JSON representation of the schedule in chunks encoded by json_codec. """
+        return self.__iter_encode(json_codec.dumps, str.encode)
+
+    def __iter_encode(self, encode: Callable[[Any], AnyStr], literal: Callable[[str], AnyStr]) -> Iterator[AnyStr]:
+        """ Walks the schedule once. encode encodes values and literal converts
+            the JSON punctuation into the same type (str or bytes) as encode. """
+        open_brace, close_brace, colon, separator = literal('{'), literal('}'), literal(':'), literal(',')
+        open_events = literal(':{"events":')
+        yield open_brace
+        next_separator = literal('')
+        for key, value in self.__schedule.schedule.items():
+            yield next_separator + encode(key) + colon
+            if key == 'days':
+                yield open_brace
+                day_separator = literal('')
+                for date, events in self.iter_days():
+                    yield day_separator + encode(date) + open_events + encode(events) + close_brace
+                    day_separator = separator
+                yield close_brace
+            else:
+                yield encode(value)
+            next_separator = separator
+        yield next_separator + encode('options') + colon + encode(self.__schedule.get_options())
+        yield close_brace
+
+    def dumps(self) -> str:
+        return ''.join(self.iter_encode())
+
+    def dump(self, fp: IO):
+        """ Writes the JSON representation of the schedule to file handle fp (text or binary). """
+        chunks = self.iter_encode_bytes() if self.__is_binary(fp) else self.iter_encode()
+        for chunk in chunks:
+            fp.write(chunk)
+
+    def __is_binary(self, fp: IO) -> bool:
+        return isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(fp, 'mode', '')
+
+    def iter_records(self, granularity: str='day') -> Iterator[dict]:
+        """ Yields the NDJSON records (header, day|placement..., footer) of the schedule. """
+        if granularity not in ['day', 'placement']:
+            raise ScheduleSerializerError('Unknown NDJSON granularity: %s. Select from: day, placement' % (granularity))
+        sch = self.__schedule
+        days, placed_days = 0, 0
+        for date in sch.get_days():
+            days += 1
+            if sch.day_has_event(date):
+                placed_days += 1
+        yield dict(
+            record='header',
+            schedule=dict((key, value) for key, value in sch.schedule.items() if key != 'days'),
+            options=sch.get_options(),
+            granularity=granularity,
+            stats=dict(days=days, placed_days=placed_days)
+        )
+        placements = 0
+        for date, events in self.iter_days():
+            placements += len(events)
+            if granularity == 'day':
+                yield dict(record='day', date=date, events=events)
+                continue
+            for event in events:
+                yield dict(record='placement', date=date, event=event)
+        quotas = {}
+        for event_id, event_quotas in sch.get_quotas(None).items():
+            quotas[event_id] = [self.__summarize_quota(quota) for quota in event_quotas]
+        yield dict(record='footer', placements=placements, quotas=quotas)
+
+    def __summarize_quota(self, quota: dict) -> dict:
+        """ Quota without its list of dates, which is replaced by first and last date. """
+        summary = dict((key, value) for key, value in quota.items() if key != 'dates')
+        summary['startdate'] = quota['dates'][0] if quota['dates'] else None
+        summary['enddate'] = quota['dates'][-1] if quota['dates'] else None
+        return summary
+
+    def dump_ndjson(self, fp: IO, granularity: str='day'):
+        """ Streams the schedule to file handle fp (text or binary) as NDJSON, one record per line. """
+        if self.__is_binary(fp):
+            encode, newline = json_codec.dumps, b'\n'
+        else:
+            encode, newline = json_codec.dumps_text, '\n'
+        for record in self.iter_records(granularity):
+            fp.write(encode(record))
+            fp.write(newline)
@@ -27,6 +27,7 @@ from py_matplanering.core.handler.handler_helper import (
 # Utilities
 from py_matplanering.utilities import time_helper, misc
 from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.tracer import traced
 
 class SchedulerError(BaseError):
     def __init__(self, message, capture_data = {}):
@@ -45,6 +46,8 @@ class Scheduler:
         self.__pre_processed = False
         self.__sch_event_filters = []
         self.__exclude_event_ids = exclude_event_ids
+        self.__keep_sch_builder = False
+        self.__last_sch_builder = None
 
     def set_strategy(self, strategy: misc.BuildStrategy):
         self.__strategy = strategy
@@ -52,6 +55,19 @@ class Scheduler:
     def set_schedule_event_filters(self, sch_event_filters: list):
         self.__sch_event_filters = sch_event_filters
 
+    def set_keep_schedule_builder(self, keep_sch_builder: bool):
+        """ Keep ScheduleBuilder of latest create_schedule() for diagnostics (see ScheduleFootprint).
+            Off by default since the builder holds all planning state. """
+        self.__keep_sch_builder = keep_sch_builder
+        if not keep_sch_builder:
+            self.__last_sch_builder = None
+
+    def get_last_schedule_builder(self) -> ScheduleBuilder:
+        """ ScheduleBuilder of latest create_schedule(), None before first run
+            or unless set_keep_schedule_builder(True). """
+        return self.__last_sch_builder
+
+    @traced(category='scheduler')
     def pre_process(self):
         """ Any kind of pre processing of planner, schedule options or init schedule
         goes into this method. This method can only be executed once. """
@@ -70,8 +86,9 @@ class Scheduler:
                     cleared = self.__init_sch.clear_day(date)
                     if cleared:
                         cleared_dates.append(date)
-                Logger.log('Dates with events cleared within planning range: %s' % (cleared_dates), LoggerLevel.DEBUG)
+                Logger.log('Dates with events cleared within planning range: %s', LoggerLevel.DEBUG, cleared_dates)
 
+    @traced(category='scheduler')
     def create_schedule(self, sch_inp: ScheduleInput) -> Schedule:
         handler_order = [
             SetupHandler().with_input(self.__planner, sch_inp, self.__sch_options, self.__init_sch, self.__sch_event_filters, self.__exclude_event_ids),
@@ -89,6 +106,8 @@ class Scheduler:
         linked_handlers = link_handler_chain(handler_order)
         Logger.log('Run defined handler chain', LoggerLevel.DEBUG)
         run_handler_chain(linked_handlers, sch_req)
+        if self.__keep_sch_builder:
+            self.__last_sch_builder = sch_builder
         schedule = sch_req.extract_schedule()
         schedule.mark_as_built()
         return schedule
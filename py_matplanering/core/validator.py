@@ -4,8 +4,10 @@
 from py_matplanering.core.schedule.schedule_input import ScheduleInput
 from py_matplanering.core.schedule.schedule import Schedule
 from py_matplanering.core.error import BaseError
+from py_matplanering.core import rule_set_schema
 
 from py_matplanering.utilities.logger import Logger, LoggerLevel
+from py_matplanering.utilities.tracer import traced
 
 from typing import Any
 
@@ -17,138 +19,187 @@ class ValidatorError(BaseError):
     def __str__(self):
         return self.message
 
+class ValidationReport:
+    """ Collects validation errors up to max_errors (None => no limit). """
+    def __init__(self, max_errors: int=100):
+        self.__max_errors = max_errors
+        self.__errors = []
+
+    def add(self, source: str, err_msg: str, index: int=None, id_: Any=None):
+        if self.is_full():
+            return
+        self.__errors.append(dict(source=source, msg=Validator.format_error(err_msg, index, id_), index=index, id=id_))
+
+    def is_full(self) -> bool:
+        return self.__max_errors is not None and len(self.__errors) >= self.__max_errors
+
+    def is_ok(self) -> bool:
+        return len(self.__errors) == 0
+
+    def get_errors(self) -> list:
+        return self.__errors
+
+    def get_message(self) -> str:
+        if self.is_ok():
+            return None
+        msg = '\n'.join(error['msg'] for error in self.__errors)
+        if self.is_full():
+            msg += '\nValidation stopped after %s errors (max_errors)' % (self.__max_errors)
+        return msg
+
 class Validator:
 
     @staticmethod
-    def report_error(err_msg: str, index: int=None, error_container: dict=None, id_: int=None) -> Any:
-        if not isinstance(error_container, dict):
-            raise ValidatorError('Expected error_container to be dict, instead got: %s' % (type(error_container)))
+    def format_error(err_msg: str, index: int=None, id_: Any=None) -> str:
         full_err_msg = 'Validation error: %s' % (err_msg)
-        if index:
+        if index is not None:
             full_err_msg += ' at index position: %s' % (index)
-        if id_:
+        if id_ is not None:
             full_err_msg += ' (with row id: %s)' % (id_)
-        if error_container:
-            error_container['error'] = True
-            error_container['msg'] = full_err_msg
-            return error_container
         return full_err_msg
 
+    @staticmethod
+    def report_error(err_msg: str, index: int=None, error_container: dict=None, id_: int=None) -> Any:
+        if not isinstance(error_container, dict):
+            raise ValidatorError('Expected error_container to be dict, instead got: %s' % (type(error_container)))
+        error_container['error'] = True
+        error_container['msg'] = Validator.format_error(err_msg, index, id_)
+        return error_container
 
     @staticmethod
-    def __validate_event_data(event_data: dict) -> dict:
-        rs = dict(ok=False, data=event_data, msg=None)
-        if len(event_data) == 0:
-            return Validator.report_error('event_data is empty', error_container=rs)
+    def __validate_event_data(event_data: dict, report: ValidationReport) -> dict:
+        """ Validates event data. Returns rule references: rule name -> id of first event referencing it. """
+        rule_refs = {}
+        if not isinstance(event_data, dict) or len(event_data) == 0:
+            report.add('event_data', 'event_data is empty')
+            return rule_refs
         if not event_data.get('data'):
-            return Validator.report_error('event_data is missing required property "data"', error_container=rs)
+            report.add('event_data', 'event_data is missing required property "data"')
+            return rule_refs
         required_props = ['id', 'name']
         ids = set()
         for idx, row in enumerate(event_data['data']):
+            if report.is_full():
+                break
+            id_ = row.get('id')
             for prop in required_props:
                 if not row.get(prop):
-                    return Validator.report_error('event_data->data is missing required property "{prop}"'.format(**{'prop': prop}), index=idx, error_container=rs, id_=row['id'])
-            if row['id'] in ids:
-                return Validator.report_error('Multiple instances of events with same id', error_container=rs, id_=row['id'])
-            ids.add(row['id'])
-        if rs['ok'] and rs['msg']:
-            raise ValidatorError('Validation error: marked as OK but contains error msg. Expected msg=None, instead got: %s' % (rs['msg']))
-        rs['ok'] = True
-        return rs
+                    report.add('event_data', 'event_data->data is missing required property "%s"' % (prop), index=idx, id_=id_)
+            if id_ is not None:
+                if id_ in ids:
+                    report.add('event_data', 'Multiple instances of events with same id', index=idx, id_=id_)
+                ids.add(id_)
+            rules = row.get('rules', [])
+            if not isinstance(rules, list):
+                report.add('event_data', 'event_data->data.rules is not a list', index=idx, id_=id_)
+                continue
+            for rule_name in rules:
+                rule_refs.setdefault(rule_name, id_)
+        return rule_refs
 
     @staticmethod
-    def __validate_rule_set(rule_set: dict) -> dict:
-        rs = dict(ok=False, data=rule_set, msg=None)
-        if len(rule_set) == 0:
-            return Validator.report_error('rule_set is empty', error_container=rs)
+    def __validate_rule_set(rule_set: dict, rule_names: set, report: ValidationReport):
+        """ Validates rule set and adds the names of its rules to rule_names. """
+        if not isinstance(rule_set, dict) or len(rule_set) == 0:
+            report.add('rule_set', 'rule_set is empty')
+            return
         if not rule_set.get('name'):
-            return Validator.report_error('rule_set is missing required property "name"', error_container=rs)
+            report.add('rule_set', 'rule_set is missing required property "name"')
         if not rule_set.get('rule_set'):
-            return Validator.report_error('rule_set is missing required property "rule_set"', error_container=rs)
+            report.add('rule_set', 'rule_set is missing required property "rule_set"')
+            return
         required_props = ['name', 'rules']
         for idx, row in enumerate(rule_set['rule_set']):
-            id_ = row['id']
+            if report.is_full():
+                break
+            id_ = row.get('id')
+            if id_ is None:
+                report.add('rule_set', 'rule_set->rule_set is missing required property "id"', index=idx)
             for prop in required_props:
                 if not row.get(prop):
-                    return Validator.report_error('rule_set->rule_set is missing required property "{prop}"'.format(**{'prop': prop}), index=idx, error_container=rs, id_=id_)
-            if not isinstance(row['rules'], list):
-                return Validator.report_error('rule_set->rule_set.rules is not a list', index=idx, error_container=rs, id_=id_)
-            if len(row['rules']) == 0:
-                return Validator.report_error('rule_set->rule_set.rules is empty', index=idx, error_container=rs, id_=id_)
-        if rs['ok'] and rs['msg']:
-            raise ValidatorError('Validation error: marked as OK but contains msg. Expected msg=None, instead got: %s' % (rs['msg']))
-        rs['ok'] = True
-        return rs
+                    report.add('rule_set', 'rule_set->rule_set is missing required property "%s"' % (prop), index=idx, id_=id_)
+            if row.get('name'):
+                if row['name'] in rule_names:
+                    report.add('rule_set', 'Multiple rules with same name: %s' % (row['name']), index=idx, id_=id_)
+                rule_names.add(row['name'])
+            if 'rules' in row and not isinstance(row['rules'], list):
+                report.add('rule_set', 'rule_set->rule_set.rules is not a list', index=idx, id_=id_)
+        # Validate: rules against the schema of their boundary
+        for idx, id_, err_msg in rule_set_schema.validate_rule_set(rule_set):
+            report.add('rule_set', 'rule_set->rule_set.rules: %s' % (err_msg), index=idx, id_=id_)
+
+    @staticmethod
+    def __validate_rule_references(rule_refs: dict, rule_names: set, report: ValidationReport):
+        for rule_name, event_id in rule_refs.items():
+            if rule_name not in rule_names:
+                report.add('event_data', 'event_data->data.rules references unknown rule: %s' % (rule_name), id_=event_id)
 
     @staticmethod
-    def __validate_initial_schedule(init_sch: Schedule, event_data: dict) -> dict:
-        rs = dict(ok=False, data=init_sch, msg=None)
-        init_sch_event_ids = list(set([event.get_id() for event in init_sch.get_events()]))
-
-        event_pool_sch_event_ids = []
-        for event_row in event_data['data']:
-            event_pool_sch_event_ids.append(event_row['id'])
-        for idx, init_sch_event_id in enumerate(init_sch_event_ids):
-            if init_sch_event_id not in event_pool_sch_event_ids:
-                return Validator.report_error('Initial schedule (init_sch) contains event id missing from event pool', index=idx, error_container=rs, id_=init_sch_event_id)
-        if rs['ok'] and rs['msg']:
-            raise ValidatorError('Validation error: marked as OK but contains msg. Expected msg=None, instead got: %s' % (rs['msg']))
-        rs['ok'] = True
-        return rs
+    def __validate_initial_schedule(init_sch: Schedule, event_data: dict, report: ValidationReport):
+        event_pool_ids = set(event_row.get('id') for event_row in event_data.get('data') or [])
+        reported = set()
+        for event in init_sch.get_events():
+            event_id = event.get_id()
+            if event_id not in event_pool_ids and event_id not in reported:
+                report.add('init_sch', 'Initial schedule (init_sch) contains event id missing from event pool', id_=event_id)
+                reported.add(event_id)
 
     @staticmethod
-    def __validate_sch_options(sch_options: dict) -> dict:
-        rs = dict(ok=False, data=sch_options, msg=None)
-        if sch_options['planning_interval']:
+    def __validate_sch_options(sch_options: dict, report: ValidationReport):
+        if sch_options.get('planning_interval'):
             if not isinstance(sch_options['planning_interval'], tuple):
-                return Validator.report_error('Schedule options: planning_interval is not instance of tuple. Instead got: %s' % (sch_options['planning_interval']))
+                report.add('sch_options', 'Schedule options: planning_interval is not instance of tuple. Instead got: %s' % (sch_options['planning_interval'],))
+                return
             planning_startdate, planning_enddate = sch_options['planning_interval']
             sch_startdate, sch_enddate = sch_options['schedule_interval']
             if sch_startdate > planning_startdate:
-                return Validator.report_error('Schedule options: invalid interval dependency. schedule interval  startdate cannot exceed planning interval startdate. Got: planning_startdate=%s, sch_startdate=%s.' % (planning_startdate, sch_startdate))
+                report.add('sch_options', 'Schedule options: invalid interval dependency. schedule interval startdate cannot exceed planning interval startdate. Got: planning_startdate=%s, sch_startdate=%s.' % (planning_startdate, sch_startdate))
             if planning_enddate > sch_enddate:
-                return Validator.report_error('Schedule options: invalid interval dependency. planning interval enddate cannot exceed schedule interval enddate. Got: planning_enddate=%s, sch_enddate=%s.' % (planning_enddate, sch_enddate))
+                report.add('sch_options', 'Schedule options: invalid interval dependency. planning interval enddate cannot exceed schedule interval enddate. Got: planning_enddate=%s, sch_enddate=%s.' % (planning_enddate, sch_enddate))
             if planning_startdate > planning_enddate:
-                return Validator.report_error('Schedule options: invalid interval dependency. planning interval startdate cannot exceed planning interval enddate. Got: planning_startdate=%s, planning_enddate=%s.' % (planning_startdate, planning_enddate))
+                report.add('sch_options', 'Schedule options: invalid interval dependency. planning interval startdate cannot exceed planning interval enddate. Got: planning_startdate=%s, planning_enddate=%s.' % (planning_startdate, planning_enddate))
             if sch_startdate > sch_enddate:
-                return Validator.report_error('Schedule options: invalid interval dependency. schedule interval startdate cannot exceed schedule interval enddate. Got: sch_startdate=%s, sch_enddate=%s.' % (sch_startdate, sch_enddate))
-        if rs['ok'] and rs['msg']:
-            raise ValidatorError('Validation error: marked as OK but contains msg. Expected msg=None, instead got: %s' % (rs['msg']))
-        rs['ok'] = True
+                report.add('sch_options', 'Schedule options: invalid interval dependency. schedule interval startdate cannot exceed schedule interval enddate. Got: sch_startdate=%s, sch_enddate=%s.' % (sch_startdate, sch_enddate))
 
     @staticmethod
-    def pre_validate(inp: ScheduleInput, sch_options: dict) -> tuple:
+    @traced(category='validator')
+    def pre_validate(inp: ScheduleInput, sch_options: dict, compiled: bool=False, max_errors: int=100) -> tuple:
+        """ Validates input in a single pass over each source and collects
+            all errors (up to max_errors). Returns (is_valid, errors, msg).
+            If compiled is True then rule set and event data are considered validated
+            (input comes from a compiled input artifact, see CompiledInput). """
         Logger.log('Running input through pre validation method', verbosity=LoggerLevel.DEBUG)
+        report = ValidationReport(max_errors)
 
-        # Validate: rule set
-        # ==================
-        for rule_set_dct in inp.get_org_rule_set():
-            validation_rule_set = Validator.__validate_rule_set(rule_set_dct)
-            if not validation_rule_set['ok']:
-                return (False, validation_rule_set['data'], validation_rule_set['msg'])
+        if not compiled:
+            # Validate: rule set
+            # ==================
+            rule_names = set()
+            for rule_set_dct in inp.get_org_rule_set():
+                Validator.__validate_rule_set(rule_set_dct, rule_names, report)
 
-        # Validate: event data
-        # ====================
-        validation_event_data = Validator.__validate_event_data(inp.get_org_event_data())
-        if not validation_event_data['ok']:
-            return (False, validation_event_data['data'], validation_event_data['msg'])
+            # Validate: event data and its references to rules
+            # ================================================
+            rule_refs = Validator.__validate_event_data(inp.get_org_event_data(), report)
+            Validator.__validate_rule_references(rule_refs, rule_names, report)
 
         # Validate: schedule
         # ==================
         if inp.get_init_schedule():
-            validation_init_sch = Validator.__validate_initial_schedule(inp.get_init_schedule(), inp.get_org_event_data())
-            if not validation_init_sch['ok']:
-                return (False, validation_init_sch['data'], validation_init_sch['msg'])
+            Validator.__validate_initial_schedule(inp.get_init_schedule(), inp.get_org_event_data(), report)
 
         # Validate: schedule options
         # ===========================
         if sch_options:
-            validation_sch_options = Validator.__validate_sch_options(sch_options)
+            Validator.__validate_sch_options(sch_options, report)
 
+        if not report.is_ok():
+            return (False, report.get_errors(), report.get_message())
         # All validation OK
         return (True, None, None)
 
     @staticmethod
+    @traced(category='validator')
     def post_validate(sch: Schedule) -> tuple:
         Logger.log('Running input through post validation method', verbosity=LoggerLevel.DEBUG)
         return (True, None, None) # nothing validated for now
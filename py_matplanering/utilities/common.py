@@ -15,6 +15,8 @@ import sys
 import decimal
 import copy
 import inspect
+import hashlib
+import json
 
 from typing import Any, Callable, Dict, Type, Union
 
@@ -149,3 +151,7 @@ def get_parameter_signature(func: Callable[..., Any]) -> Dict[str, Dict[str, Uni
 
     return signature_dict
 
+def hash_content(content: Any) -> str:
+    """ sha256 of the canonical JSON representation of content. """
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Streaming loader of event data (event catalog) files, e.g.:
+    { "name": "...", "data": [ { "id": 1, "name": "...", ... }, ... ] }
+    The "data" array is parsed one event at a time, so the raw text of the
+    whole file is never held in memory, and events which are filtered out are
+    dropped as soon as they have been parsed. Each event (and any other object
+    or array) is decoded by json_codec, i.e. by orjson or msgspec if installed.
+"""
+from py_matplanering.utilities import json_codec
+from py_matplanering.utilities.time_helper import intern_date
+
+from typing import Iterable, Iterator, TextIO
+
+import json, re, sys
+
+CHUNK_SIZE = 1 << 16
+INTERN_MAX_LEN = 32 # short strings (types, classes, rule names) repeat across the catalog
+DATE_PROPS = ('mindate', 'maxdate')
+
+_CONTAINER_TOKEN = re.compile(r'[{}\[\]"]')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+
+def _find_container_end(buf: str, pos: int) -> int:
+    """ Returns end offset of the object or array which starts at pos,
+        or -1 if it is not complete within buf. """
+    depth = 0
+    while True:
+        match = _CONTAINER_TOKEN.search(buf, pos)
+        if match is None:
+            return -1
+        if match.group() == '"':
+            match = _STRING.match(buf, match.start())
+            if match is None:
+                return -1
+            pos = match.end()
+            continue
+        depth += 1 if match.group() in '{[' else -1
+        pos = match.end()
+        if depth == 0:
+            return pos
+
+class _ChunkReader:
+    """ Buffer over a text file handle which is consumed from the front. """
+    def __init__(self, fp: TextIO, chunk_size: int):
+        self.__fp = fp
+        self.__chunk_size = chunk_size
+        self.__decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """ Reads next chunk. Returns False on end of file. """
+        if self.eof:
+            return False
+        chunk = self.__fp.read(self.__chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > 0:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """ Returns next non-whitespace character (empty string on end of file). """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise Exception('Unexpected event data: expected one of %s at offset %s, instead got: %s' % (list(chars), self.pos, repr(char)))
+        self.pos += 1
+        return char
+
+    def decode(self):
+        """ Decodes next JSON value. Reads more chunks until the value is complete.
+            Objects and arrays are decoded by json_codec, scalars (e.g. keys) by json. """
+        if self.peek() in ('{', '['):
+            while True:
+                end = _find_container_end(self.buf, self.pos)
+                if end != -1:
+                    break
+                if not self.fill():
+                    raise Exception('Unexpected event data: unterminated %s at offset %s' % (repr(self.buf[self.pos]), self.pos))
+            value = json_codec.loads(self.buf[self.pos:end])
+            self.pos = end
+            return value
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            if end == len(self.buf) and self.fill():
+                # a scalar (e.g. a number) may continue in next chunk
+                continue
+            self.pos = end
+            return value
+
+def iter_event_rows(fp: TextIO, header: dict=None, chunk_size: int=CHUNK_SIZE) -> Iterator[dict]:
+    """ Yields the rows of the "data" array of event data file fp.
+        Other top level properties are collected into header (if given) as they are parsed. """
+    reader = _ChunkReader(fp, chunk_size)
+    if reader.peek() == '':
+        raise Exception('Event data source is empty. Expected: JSON formatted data')
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.decode()
+        reader.expect(':')
+        if key == 'data':
+            if header is not None:
+                header[key] = None # keeps order of properties, rows are returned by iteration
+            reader.expect('[')
+            if reader.peek() != ']':
+                while True:
+                    yield reader.decode()
+                    if reader.expect(',]') == ']':
+                        break
+            else:
+                reader.pos += 1
+        else:
+            value = reader.decode()
+            if header is not None:
+                header[key] = value
+        if reader.expect(',}') == '}':
+            break
+
+def compact_event_row(row: dict, keep_props: Iterable[str]=None) -> dict:
+    """ Projects row onto keep_props (None keeps all) and interns repeated strings. """
+    if keep_props is not None:
+        row = dict((prop, row[prop]) for prop in keep_props if prop in row)
+    for prop, value in row.items():
+        if isinstance(value, str):
+            if prop in DATE_PROPS:
+                row[prop] = intern_date(value)
+            elif len(value) <= INTERN_MAX_LEN:
+                row[prop] = sys.intern(value)
+        elif prop == 'rules' and isinstance(value, list):
+            row[prop] = [sys.intern(rule) if isinstance(rule, str) else rule for rule in value]
+    return row
+
+def load_event_data(fp: TextIO, filter_event_ids: Iterable[int]=None, exclude_event_ids: Iterable[int]=None,
+                    require_active: bool=False, keep_props: Iterable[str]=None, chunk_size: int=CHUNK_SIZE) -> dict:
+    """ Loads event data from file handle fp while filtering events:
+        * filter_event_ids:     keep only events with these ids.
+        * exclude_event_ids:    drop events with these ids.
+        * require_active:       drop inactive events (active == 0).
+        * keep_props:           keep only these properties of each event.
+        Returns event data dict, e.g.: { "name": "...", "data": [...] }
+    """
+    filter_event_ids = set(filter_event_ids) if filter_event_ids else None
+    exclude_event_ids = set(exclude_event_ids) if exclude_event_ids else None
+    if keep_props is not None:
+        keep_props = list(keep_props)
+    event_data = {}
+    rows = []
+    for row in iter_event_rows(fp, header=event_data, chunk_size=chunk_size):
+        if filter_event_ids is not None and row.get('id') not in filter_event_ids:
+            continue
+        if exclude_event_ids is not None and row.get('id') in exclude_event_ids:
+            continue
+        if require_active and row.get('active') == 0:
+            continue
+        rows.append(compact_event_row(row, keep_props))
+    event_data['data'] = rows
+    return event_data
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    JSON codec which selects the fastest available JSON library:
+    orjson, msgspec or the standard library json module (fallback).
+    All encoding produces bytes (UTF-8) and decoding accepts bytes or str,
+    so files should be opened in binary mode, e.g.:
+    with open(path, 'rb') as fp:
+        data = json_codec.load(fp)
+    Output is compact (no whitespace after separators) and UTF-8 (non-ASCII is not escaped)
+    whichever backend is selected, since accelerated libraries can not produce anything else.
+"""
+from pathlib import Path
+
+from typing import Any, BinaryIO, Union
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKENDS = ['orjson', 'msgspec', 'json']
+# separators of the standard library json module which match the accelerated libraries
+SEPARATORS = (',', ':')
+
+def _get_default_backend() -> str:
+    if orjson is not None:
+        return 'orjson'
+    if msgspec is not None:
+        return 'msgspec'
+    return 'json'
+
+_backend = _get_default_backend()
+
+def get_backend() -> str:
+    return _backend
+
+def set_backend(backend: str):
+    """ Selects backend (e.g. to compare backends). Raises Exception if backend is not installed. """
+    if backend not in BACKENDS:
+        raise Exception('Unknown JSON codec backend: %s (select from: %s)' % (backend, BACKENDS))
+    if (backend == 'orjson' and orjson is None) or (backend == 'msgspec' and msgspec is None):
+        raise Exception('JSON codec backend is not installed: %s' % (backend))
+    global _backend
+    _backend = backend
+
+def loads(data: Union[bytes, str]) -> Any:
+    backend = get_backend()
+    if backend == 'orjson':
+        return orjson.loads(data)
+    if backend == 'msgspec':
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+def dumps(obj: Any) -> bytes:
+    backend = get_backend()
+    if backend == 'orjson':
+        # schedule quotas are keyed by (int) event id
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    if backend == 'msgspec':
+        return msgspec.json.encode(obj)
+    return dumps_text(obj).encode('utf-8')
+
+def dumps_text(obj: Any) -> str:
+    """ Encodes obj as str in the same (compact) style as dumps. """
+    return json.dumps(obj, separators=SEPARATORS, ensure_ascii=False)
+
+def load(fp: BinaryIO) -> Any:
+    return loads(fp.read())
+
+def dump(obj: Any, fp: BinaryIO):
+    fp.write(dumps(obj))
+
+def read_file(path: Union[str, Path]) -> Any:
+    """ Decodes JSON file at path. Raises Exception if file is empty. """
+    data = Path(path).read_bytes()
+    if len(data.strip()) == 0:
+        raise Exception('JSON source file is empty: %s. Expected: JSON formatted data' % (path))
+    return loads(data)
+
+def write_file(path: Union[str, Path], obj: Any):
+    Path(path).write_bytes(dumps(obj))
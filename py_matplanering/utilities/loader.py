@@ -3,6 +3,8 @@
 """
 loader.py loads core modules so it can be dynamically
 produced. It's also capable of building classes.
+Modules and classes are resolved once per process and kept in a
+registry, so repeated builds do not import or look them up again.
 """
 from __future__ import absolute_import
 from __future__ import unicode_literals
@@ -10,12 +12,22 @@ import importlib
 import os, os.path
 from py_matplanering.utilities import common
 
+# (module folder, module name) -> module
+__module_registry = {}
+# (module folder, module name) -> class named as the module in camel case
+__class_registry = {}
+
 def __load_module(module_name, module_folder: str):
+    key = (module_folder, module_name)
+    safe_module = __module_registry.get(key)
+    if safe_module is not None:
+        return safe_module
     safe_module_name = common.path_leaf(module_name)
     if not safe_module_name.startswith("py_matplanering.core.%s" % module_folder):
         safe_module_name.replace(".", "")
         safe_module_name = "%s.%s" % (module_folder, safe_module_name)
     safe_module = importlib.import_module("%s" % safe_module_name)
+    __module_registry[key] = safe_module
     return safe_module
 
 def __load_modules(module_names: list, module_folder) -> dict:
@@ -25,9 +37,21 @@ def __load_modules(module_names: list, module_folder) -> dict:
         rs[module_name] = safe_module
     return rs
 
+def __load_class(module_name: str, module_folder: str) -> type:
+    key = (module_folder, module_name)
+    cls = __class_registry.get(key)
+    if cls is None:
+        cls = getattr(__load_module(module_name, module_folder), common.underscore_to_camelcase(common.path_leaf(module_name)))
+        __class_registry[key] = cls
+    return cls
+
 def load_boundaries(boundaries: list) -> dict:
     return __load_modules(boundaries, "py_matplanering.core.boundary")
 
+def load_boundary_class(boundary_module_name: str) -> type:
+    """ Returns class of boundary module, e.g. boundary_cap => BoundaryCap """
+    return __load_class(boundary_module_name, "py_matplanering.core.boundary")
+
 def load_planners(planners: list) -> dict:
     return __load_modules(planners, "py_matplanering.core.planner")
 
@@ -36,12 +60,9 @@ def load_planner(planner: str):
 
 def build_planner(planner_name: str):
     if '_' not in planner_name: # assume camel case
-        planner_name_cc = planner_name
         planner_name_us = common.camelcase_to_underscore(planner_name)
     else: # assume underscore
         planner_name_us = planner_name
-        planner_name_cc = common.underscore_to_camelcase(planner_name)
-
-    planner_module = load_planner(planner_name_us)
-    planner = getattr(planner_module, planner_name_cc)()
+    planner_cls = __load_class(planner_name_us, "py_matplanering.core.planner")
+    planner = planner_cls()
     return planner
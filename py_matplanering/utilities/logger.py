@@ -2,12 +2,13 @@
 # -*- coding: utf-8 -*-
 from py_matplanering.utilities import common, time_helper
 
-import inspect, os
+from typing import Iterable
+
+import collections, json, os, sys
 
 from enum import Enum, unique
 
 logger__log = []
-logger__settings = dict(on=False)
 
 @unique
 class LoggerLevel(Enum):
@@ -15,7 +16,85 @@ class LoggerLevel(Enum):
     DEBUG = 1
     INFO = 2
 
+class LogSink:
+    """ Receives log entries with a verbosity within max_verbosity (None => all). """
+    def __init__(self, max_verbosity: LoggerLevel=None):
+        self._max_verbosity = max_verbosity
+
+    def accepts(self, verbosity: LoggerLevel) -> bool:
+        return self._max_verbosity is None or verbosity.value <= self._max_verbosity.value
+
+    def emit(self, entry: dict):
+        raise NotImplementedError
+
+    def get_entries(self) -> list:
+        """ Entries kept in memory by sink (if any). """
+        return []
+
+    def close(self):
+        pass
+
+class ListSink(LogSink):
+    """ Keeps every entry in memory (default sink). """
+    def __init__(self, entries: list=None, max_verbosity: LoggerLevel=None):
+        super(ListSink, self).__init__(max_verbosity)
+        self.__entries = entries if entries is not None else []
+
+    def emit(self, entry: dict):
+        self.__entries.append(entry)
+
+    def get_entries(self) -> list:
+        return self.__entries
+
+class RingBufferSink(LogSink):
+    """ Keeps the latest capacity entries in memory. """
+    def __init__(self, capacity: int=10000, max_verbosity: LoggerLevel=None):
+        super(RingBufferSink, self).__init__(max_verbosity)
+        if capacity is None or capacity < 1:
+            raise Exception('Ring buffer capacity must be a positive integer, instead got: %s' % (capacity))
+        self.__entries = collections.deque(maxlen=capacity)
+
+    def emit(self, entry: dict):
+        self.__entries.append(entry)
+
+    def get_entries(self) -> list:
+        return list(self.__entries)
+
+class NdjsonFileSink(LogSink):
+    """ Streams entries to a file as NDJSON (one JSON entry per line) as they arrive.
+        The file is flushed after each entry unless flush=False. """
+    def __init__(self, path: str, max_verbosity: LoggerLevel=None, flush: bool=True, mode: str='a'):
+        super(NdjsonFileSink, self).__init__(max_verbosity)
+        self.__fp = open(path, mode)
+        self.__flush = flush
+
+    def emit(self, entry: dict):
+        self.__fp.write(json.dumps(dict(entry, verbosity=entry['verbosity'].name), default=str))
+        self.__fp.write('\n')
+        if self.__flush:
+            self.__fp.flush()
+
+    def close(self):
+        if not self.__fp.closed:
+            self.__fp.close()
+
+class NullSink(LogSink):
+    """ Discards every entry. """
+    def accepts(self, verbosity: LoggerLevel) -> bool:
+        return False
+
+    def emit(self, entry: dict):
+        pass
+
+logger__settings = dict(on=False, max_verbosity=None, sinks=[ListSink(logger__log)])
+
 class Logger(metaclass=common.Singleton):
+    """ Module global logger.
+        Entries are only created if the logger is activated and verbosity is
+        within max verbosity (see set_max_verbosity), which is checked before
+        the message is formatted. Message arguments are formatted lazily, e.g.:
+        Logger.log('Planned %s events on %s', LoggerLevel.DEBUG, len(events), date)
+    """
     @staticmethod
     def activate():
         logger__settings['on'] = True
@@ -29,7 +108,41 @@ class Logger(metaclass=common.Singleton):
         return logger__settings['on']
 
     @staticmethod
-    def log(msg: str='', verbosity: LoggerLevel=None) -> bool:
+    def set_max_verbosity(max_verbosity: LoggerLevel=None):
+        """ Entries with a verbosity above max_verbosity are not logged (None => log all). """
+        logger__settings['max_verbosity'] = max_verbosity
+
+    @staticmethod
+    def is_enabled_for(verbosity: LoggerLevel) -> bool:
+        """ Whether an entry of verbosity would be logged. Useful to guard expensive log arguments. """
+        if not logger__settings['on']:
+            return False
+        max_verbosity = logger__settings['max_verbosity']
+        if max_verbosity is not None and verbosity.value > max_verbosity.value:
+            return False
+        return any(sink.accepts(verbosity) for sink in logger__settings['sinks'])
+
+    @staticmethod
+    def set_sinks(sinks: Iterable[LogSink]):
+        """ Replaces sinks (closing the current ones). """
+        Logger.close_sinks()
+        logger__settings['sinks'] = list(sinks)
+
+    @staticmethod
+    def add_sink(sink: LogSink):
+        logger__settings['sinks'].append(sink)
+
+    @staticmethod
+    def get_sinks() -> list:
+        return logger__settings['sinks']
+
+    @staticmethod
+    def close_sinks():
+        for sink in logger__settings['sinks']:
+            sink.close()
+
+    @staticmethod
+    def log(msg: str='', verbosity: LoggerLevel=None, *args) -> bool:
         if verbosity is None:
             members = []
             for name, member in LoggerLevel.__members__.items():
@@ -37,30 +150,44 @@ class Logger(metaclass=common.Singleton):
             raise Exception('Verbosity is None, choose verbosity from LoggerLevel.[%s]' % (", ".join(members)))
         if not logger__settings['on']:
             return False
-        if verbosity.value > 2 or verbosity.value < 0:
-            raise Exception('Verbosity must be an integer from {0,1,2}. Got: %s' % (verbosity))
-        frame = inspect.stack()[1]
-        module = inspect.getmodule(frame[0])
-        curframe = inspect.currentframe()
-        calframe = inspect.getouterframes(curframe, 2)
+        if not isinstance(verbosity, LoggerLevel):
+            raise Exception('Verbosity must be a LoggerLevel. Got: %s' % (verbosity))
+        max_verbosity = logger__settings['max_verbosity']
+        if max_verbosity is not None and verbosity.value > max_verbosity.value:
+            return False
+        sinks = [sink for sink in logger__settings['sinks'] if sink.accepts(verbosity)]
+        if len(sinks) == 0:
+            return False
+        if args:
+            msg = msg % args
+        frame = sys._getframe(1)
+        filename = frame.f_code.co_filename
         dt_str = time_helper.time_now()
-        logger__log.append(dict(
+        entry = dict(
             msg=msg,
             full_date=dt_str,
             date=dt_str[0:10],
             time=dt_str[11:],
-            filename=os.path.basename(frame.filename),
-            full_path=frame.filename,
+            filename=os.path.basename(filename),
+            full_path=filename,
             verbosity=verbosity,
-            method=calframe[1][3]
-        ))
+            method=frame.f_code.co_name
+        )
+        for sink in sinks:
+            sink.emit(entry)
         return True
 
     @staticmethod
-    def get_log(max_verbosity: LoggerLevel=None):
-        if verbosity is None:
-            return logger__log
-        return [entry for entry in logger__log if entry['verbosity'] <= max_verbosity.value]
+    def get_log(max_verbosity: LoggerLevel=None) -> list:
+        """ Entries of the first sink which keeps entries in memory. """
+        entries = []
+        for sink in logger__settings['sinks']:
+            entries = sink.get_entries()
+            if len(entries) > 0:
+                break
+        if max_verbosity is None:
+            return entries
+        return [entry for entry in entries if entry['verbosity'].value <= max_verbosity.value]
 
     @staticmethod
     def print_log(format_=None, max_verbosity: LoggerLevel=None):
@@ -68,12 +195,11 @@ class Logger(metaclass=common.Singleton):
             raise NotImplementedError
         if logger__settings['on'] is False:
             raise Exception('Attempting to print log with deactivated logger.')
-        for entry in logger__log:
-            if max_verbosity is None or entry['verbosity'].value <= max_verbosity.value:
-                print("%s:%s (%s): %s - %s" % (
-                    entry['filename'],
-                    entry['method'],
-                    entry['time'],
-                    entry['verbosity'].name,
-                    entry['msg']
-                ))
+        for entry in Logger.get_log(max_verbosity):
+            print("%s:%s (%s): %s - %s" % (
+                entry['filename'],
+                entry['method'],
+                entry['time'],
+                entry['verbosity'].name,
+                entry['msg']
+            ))
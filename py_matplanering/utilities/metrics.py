@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Process wide registry of counters and histograms, e.g.:
+    Metrics.inc('filter_invocations_total', filter='quota')
+    Metrics.observe('candidates_per_day', len(events))
+    Metrics.to_prometheus() # Prometheus text exposition format
+    Counting is off by default, so inc and observe return at once until
+    Metrics.activate() is called (planera.py does so if metrics_path is set).
+"""
+from py_matplanering.utilities import common
+
+from typing import Any
+
+METRIC_PREFIX = 'matplanering_'
+DEFAULT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+metrics__counters = {}
+metrics__histograms = {}
+metrics__help = {}
+metrics__settings = dict(on=False)
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items())) if labels else ()
+
+def _format_labels(labels_key: tuple, extra: tuple=()) -> str:
+    labels = labels_key + extra
+    if len(labels) == 0:
+        return ''
+    return '{%s}' % (','.join('%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"')) for key, value in labels))
+
+class Metrics(metaclass=common.Singleton):
+    @staticmethod
+    def activate():
+        metrics__settings['on'] = True
+
+    @staticmethod
+    def deactivate():
+        metrics__settings['on'] = False
+
+    @staticmethod
+    def is_activated() -> bool:
+        return metrics__settings['on']
+
+    @staticmethod
+    def reset():
+        metrics__counters.clear()
+        metrics__histograms.clear()
+
+    @staticmethod
+    def describe(name: str, help_: str):
+        metrics__help[name] = help_
+
+    @staticmethod
+    def inc(name: str, value: int=1, **labels):
+        """ Increments counter name (with labels) by value. """
+        if not metrics__settings['on']:
+            return
+        key = (name, _labels_key(labels))
+        metrics__counters[key] = metrics__counters.get(key, 0) + value
+
+    @staticmethod
+    def observe(name: str, value: float, buckets: tuple=DEFAULT_BUCKETS, **labels):
+        """ Observes value in histogram name (with labels). Buckets are fixed on first observation. """
+        if not metrics__settings['on']:
+            return
+        key = (name, _labels_key(labels))
+        histogram = metrics__histograms.get(key)
+        if histogram is None:
+            histogram = metrics__histograms[key] = dict(buckets=tuple(buckets), bucket_counts=[0] * len(buckets), count=0, sum=0)
+        for idx, upper_bound in enumerate(histogram['buckets']):
+            if value <= upper_bound:
+                histogram['bucket_counts'][idx] += 1
+                break
+        histogram['count'] += 1
+        histogram['sum'] += value
+
+    @staticmethod
+    def get(name: str, **labels) -> Any:
+        """ Returns value of counter (0 if missing) or histogram (None if missing). """
+        key = (name, _labels_key(labels))
+        if key in metrics__histograms:
+            return metrics__histograms[key]
+        return metrics__counters.get(key, 0)
+
+    @staticmethod
+    def snapshot() -> dict:
+        """ Returns { counters: {name: {labels: value}}, histograms: {name: {labels: {count, sum, mean, buckets}}} } """
+        counters, histograms = {}, {}
+        for (name, labels_key), value in metrics__counters.items():
+            counters.setdefault(name, {})[_format_labels(labels_key)] = value
+        for (name, labels_key), histogram in metrics__histograms.items():
+            histograms.setdefault(name, {})[_format_labels(labels_key)] = dict(
+                count=histogram['count'],
+                sum=histogram['sum'],
+                mean=histogram['sum'] / histogram['count'] if histogram['count'] else None,
+                buckets=dict(zip(histogram['buckets'], histogram['bucket_counts']))
+            )
+        return dict(counters=counters, histograms=histograms)
+
+    @staticmethod
+    def to_prometheus() -> str:
+        lines = []
+        for kind, registry in [('counter', metrics__counters), ('histogram', metrics__histograms)]:
+            described = set()
+            for (name, labels_key), value in sorted(registry.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+                full_name = METRIC_PREFIX + name
+                if name not in described:
+                    if name in metrics__help:
+                        lines.append('# HELP %s %s' % (full_name, metrics__help[name]))
+                    lines.append('# TYPE %s %s' % (full_name, kind))
+                    described.add(name)
+                if kind == 'counter':
+                    lines.append('%s%s %s' % (full_name, _format_labels(labels_key), value))
+                    continue
+                cumulative = 0
+                for upper_bound, bucket_count in zip(value['buckets'], value['bucket_counts']):
+                    cumulative += bucket_count
+                    lines.append('%s_bucket%s %s' % (full_name, _format_labels(labels_key, (('le', upper_bound),)), cumulative))
+                lines.append('%s_bucket%s %s' % (full_name, _format_labels(labels_key, (('le', '+Inf'),)), value['count']))
+                lines.append('%s_sum%s %s' % (full_name, _format_labels(labels_key), value['sum']))
+                lines.append('%s_count%s %s' % (full_name, _format_labels(labels_key), value['count']))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def write_prometheus(path: str):
+        with open(path, 'w') as fp:
+            fp.write(Metrics.to_prometheus())
+
+Metrics.describe('filter_invocations_total', 'Schedule event filter invocations by filter.')
+Metrics.describe('filter_rejections_total', 'Schedule events rejected by filter.')
+Metrics.describe('quota_validations_total', 'Calls of Schedule.validate_quota.')
+Metrics.describe('conflicts_total', 'Conflict days by outcome of planner step.')
+Metrics.describe('placements_total', 'Placed events by planning method.')
+Metrics.describe('build_iterations_total', 'Build iterations run.')
+Metrics.describe('candidates_per_day', 'Candidate events per day.')
@@ -51,12 +51,12 @@ def make_event_quota(startdate: str, enddate: str, quota_template: dict) -> list
         startdate_year = int(startdate[:4])
         enddate_year = int(enddate[:4])
         for year in year_range:
-            first_day_in_year = "%s-01-01" % (year)
+            first_day_in_year = time_helper.intern_date("%s-01-01" % (year))
             if startdate_year == year:
                 first_day = startdate
             else:
                 first_day = first_day_in_year
-            last_day_in_year = "%s-12-31" % (year)
+            last_day_in_year = time_helper.intern_date("%s-12-31" % (year))
             if enddate_year == year:
                 last_day = enddate
             else:
@@ -81,7 +81,7 @@ def make_event_quota(startdate: str, enddate: str, quota_template: dict) -> list
             center_day = time_helper.get_nth_day_of_year(year, first_half)
 
             # Build first range
-            first_day_in_year = "%s-01-01" % (year)
+            first_day_in_year = time_helper.intern_date("%s-01-01" % (year))
             if startdate_year == year:
                 first_day = startdate
             else:
@@ -96,7 +96,7 @@ def make_event_quota(startdate: str, enddate: str, quota_template: dict) -> list
             del first_day_in_year
 
             # Build second range
-            last_day_in_year = "%s-12-31" % (year)
+            last_day_in_year = time_helper.intern_date("%s-12-31" % (year))
             center_day_plus_one = time_helper.format_date(time_helper.add_days(time_helper.parse_date(center_day), +1))
             if center_day_plus_one > enddate:
                 continue
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Profiles a block of code with cProfile and/or tracemalloc and groups the
+    results by subsystem (boundary, filter, quota, planner, io, serialization, ...).
+    Example:
+    profiler = Profiler(cpu=True, memory=True)
+    with profiler:
+        ...
+    profiler.dump_stats('build.pstats') # open with pstats or e.g. snakeviz
+    rows, headers = profiler.make_subsystem_table()
+"""
+from typing import Any
+
+import cProfile, io, os, pstats, tracemalloc
+
+# Rules are matched in order against (path, function name), first match wins.
+# path is the file path with os.sep replaced by '/'.
+SUBSYSTEM_RULES = [
+    ('quota', lambda path, fn_name: 'quota' in fn_name.lower()),
+    ('boundary', lambda path, fn_name: '/core/boundary/' in path or 'boundar' in fn_name.lower()),
+    ('filter', lambda path, fn_name: path.endswith('/schedule_event_filter.py') or 'filter' in fn_name.lower()),
+    ('planner', lambda path, fn_name: '/core/planner/' in path),
+    ('serialization', lambda path, fn_name: path.endswith(('/schedule_serializer.py', '/json_codec.py')) or '/json/' in path or fn_name in ('dumps', 'loads')),
+    ('io', lambda path, fn_name: path.endswith(('/event_loader.py', '/config.py', '/_pyio.py', '/codecs.py', '/pathlib.py')) or fn_name in ('open', 'read', 'write', 'read_bytes', 'io.open')),
+    ('validation', lambda path, fn_name: path.endswith(('/validator.py', '/rule_set_schema.py', '/schema.py'))),
+    ('schedule', lambda path, fn_name: '/core/' in path),
+    ('utilities', lambda path, fn_name: '/utilities/' in path),
+]
+SUBSYSTEM_OTHER = 'other'
+
+def classify(path: str, fn_name: str) -> str:
+    """ Returns subsystem of function fn_name in file path. """
+    path = path.replace(os.sep, '/')
+    for subsystem, match in SUBSYSTEM_RULES:
+        if match(path, fn_name):
+            return subsystem
+    return SUBSYSTEM_OTHER
+
+def _short_path(path: str) -> str:
+    path = path.replace(os.sep, '/')
+    if 'py_matplanering/' in path:
+        return path[path.index('py_matplanering/'):]
+    return os.path.basename(path) or path
+
+class Profiler:
+    """ Context manager which profiles CPU time (cProfile) and/or allocations (tracemalloc). """
+    def __init__(self, cpu: bool=True, memory: bool=False, memory_frames: int=1):
+        if not cpu and not memory:
+            raise Exception('Expected at least one of cpu or memory to be profiled')
+        self.cpu = cpu
+        self.memory = memory
+        self.memory_frames = memory_frames
+        self.__profile = cProfile.Profile() if cpu else None
+        self.__started_tracemalloc = False
+        self.__snapshot = None
+        self.__peak_bytes = None
+
+    def start(self):
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.memory_frames)
+                self.__started_tracemalloc = True
+            if hasattr(tracemalloc, 'reset_peak'): # Python 3.9+
+                tracemalloc.reset_peak()
+        if self.__profile is not None:
+            self.__profile.enable()
+
+    def stop(self):
+        if self.__profile is not None:
+            self.__profile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            self.__snapshot = tracemalloc.take_snapshot()
+            self.__peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self.__started_tracemalloc:
+                tracemalloc.stop()
+                self.__started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def get_stats(self) -> pstats.Stats:
+        if self.__profile is None:
+            raise Exception('CPU profiling is not enabled')
+        return pstats.Stats(self.__profile, stream=io.StringIO())
+
+    def dump_stats(self, path: str):
+        """ Writes cProfile stats (.pstats) to path. """
+        self.get_stats().dump_stats(path)
+
+    def get_peak_bytes(self) -> Any:
+        """ Peak traced memory (bytes) during profiling, or None. """
+        return self.__peak_bytes
+
+    def summarize_cpu(self, top: int=5) -> dict:
+        """ Returns { subsystem: {tottime, calls, functions: [(name, calls, tottime, cumtime)]} },
+            functions sorted by tottime (top per subsystem). """
+        summary = {}
+        for (path, line, fn_name), (_, ncalls, tottime, cumtime, _) in self.get_stats().stats.items():
+            subsystem = classify(path, fn_name)
+            row = summary.setdefault(subsystem, dict(tottime=0.0, calls=0, functions=[]))
+            row['tottime'] += tottime
+            row['calls'] += ncalls
+            row['functions'].append(('%s:%s(%s)' % (_short_path(path), line, fn_name), ncalls, tottime, cumtime))
+        for row in summary.values():
+            row['functions'] = sorted(row['functions'], key=lambda fn_row: -fn_row[2])[:top]
+        return summary
+
+    def summarize_memory(self, top: int=5) -> dict:
+        """ Returns { subsystem: {size, count, files: [(path, size, count)]} } of allocations
+            alive at stop(), grouped by the file which allocated them. """
+        if self.__snapshot is None:
+            raise Exception('Memory profiling is not enabled')
+        summary = {}
+        for stat in self.__snapshot.statistics('filename'):
+            path = stat.traceback[0].filename
+            subsystem = classify(path, '')
+            row = summary.setdefault(subsystem, dict(size=0, count=0, files=[]))
+            row['size'] += stat.size
+            row['count'] += stat.count
+            row['files'].append((_short_path(path), stat.size, stat.count))
+        for row in summary.values():
+            row['files'] = sorted(row['files'], key=lambda file_row: -file_row[1])[:top]
+        return summary
+
+    def make_subsystem_table(self, top: int=3) -> tuple:
+        """ Returns (table, headers) of subsystems ordered by own CPU time, with their top functions. """
+        headers = ['Subsystem', 'Time (s)', 'Share', 'Calls', 'Top functions (tottime s)']
+        cpu_summary = self.summarize_cpu(top=top) if self.cpu else {}
+        memory_summary = self.summarize_memory(top=top) if self.__snapshot is not None else {}
+        if memory_summary:
+            headers.append('Retained (KiB)')
+        total = sum(row['tottime'] for row in cpu_summary.values()) or 1.0
+        subsystems = sorted(set(cpu_summary) | set(memory_summary), key=lambda name: -cpu_summary.get(name, dict(tottime=0.0))['tottime'])
+        table = []
+        for subsystem in subsystems:
+            cpu_row = cpu_summary.get(subsystem, dict(tottime=0.0, calls=0, functions=[]))
+            row = [
+                subsystem,
+                round(cpu_row['tottime'], 3),
+                '%.1f%%' % (100 * cpu_row['tottime'] / total),
+                cpu_row['calls'],
+                '\n'.join('%s %.3f' % (fn_row[0], fn_row[2]) for fn_row in cpu_row['functions'])
+            ]
+            if memory_summary:
+                row.append(round(memory_summary.get(subsystem, dict(size=0))['size'] / 1024, 1))
+            table.append(row)
+        return table, headers
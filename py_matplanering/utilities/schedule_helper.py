@@ -9,11 +9,13 @@ from py_matplanering.core.schedule.schedule_input import ScheduleInput
 from py_matplanering.core.schedule.schedule import Schedule, ScheduleEvent
 from py_matplanering.core.context import ScheduleEventFilterContext
 
-from py_matplanering.utilities import (common, loader)
+from py_matplanering.utilities import (loader, json_codec)
+from py_matplanering.utilities.time_helper import intern_date
+from py_matplanering.utilities.metrics import Metrics
 
-from typing import Callable, List
+from typing import Any, Callable, Iterator, List
 
-def make_schedule(sch_options: dict, prep_events: dict={}):
+def make_schedule(sch_options: dict, prep_events: dict=None):
     return Schedule(sch_options, prep_events)
 
 def load_boundaries(sch_inp: ScheduleInput) -> dict:
@@ -51,16 +53,13 @@ def convert_rule_set(inp: ScheduleInput, boundaries: dict) -> dict:
             for rule in rule_set_rs[rule_set['name']]['rules']:
                 if rule['type'] == 'boundary':
                     rule['boundary_module'] = boundaries['boundary_' + rule['boundary']]
-                    cls_name = common.underscore_to_camelcase('boundary_' + rule['boundary'])
-                    rule['boundary_cls'] = getattr(rule['boundary_module'], cls_name)
+                    rule['boundary_cls'] = loader.load_boundary_class('boundary_' + rule['boundary'])
     return rule_set_rs
 
 def convert_boundaries(boundaries: dict) -> dict:
     converted_boundaries = {}
     for boundary_key in list(boundaries):
-        boundary_module = boundaries[boundary_key]
-        cls_name = common.underscore_to_camelcase(boundary_key)
-        boundary_cls = getattr(boundary_module, cls_name)
+        boundary_cls = loader.load_boundary_class(boundary_key)
         converted_boundaries[boundary_key] = boundary_cls()
     return converted_boundaries
 
@@ -74,20 +73,27 @@ def filter_boundaries(boundaries: dict, apply_filters: dict={}) -> dict:
                 filtered_boundaries[boundary_key] = boundary_obj
     return filtered_boundaries
 
-def run_filter_events_function(sch: Schedule, date: str, sch_events: List[ScheduleEvent], filter_fn: Callable) -> List[ScheduleEvent]:
+def run_filter_events_function(sch: Schedule, date: str, sch_events: List[ScheduleEvent], filter_fn: Callable, attr_index: Any=None) -> List[ScheduleEvent]:
     if not isinstance(sch, Schedule):
         raise Exception('sch is not instance of Schedule, instead got: %s' % (sch))
-    filter_ctx = ScheduleEventFilterContext(sch, date, sch_events)
+    filter_ctx = ScheduleEventFilterContext(sch, date, sch_events, attr_index)
     filtered_sch_events = filter_fn(filter_ctx)
     if not isinstance(filtered_sch_events, list):
         raise Exception('Applied filter function unexpectedly returned non list: %s' % (filtered_sch_events))
     return filtered_sch_events
 
-def run_filter_events_function_chain(sch: Schedule, dates: list, sch_events: List[ScheduleEvent], functions: list) -> List[ScheduleEvent]:
+def run_filter_events_function_chain(sch: Schedule, dates: list, sch_events: List[ScheduleEvent], functions: list, attr_index: Any=None, names: list=None) -> List[ScheduleEvent]:
+    """ Runs filter functions in order for every date. Invocations and rejections
+        are counted by filter name (names[idx] of functions[idx], or function name). """
     filtered_sch_events = sch_events
     for date in dates:
-        for filter_fn in functions:
-            filtered_sch_events = run_filter_events_function(sch, date, filtered_sch_events, filter_fn)
+        for idx, filter_fn in enumerate(functions):
+            filter_name = names[idx] if names else getattr(filter_fn, '__name__', repr(filter_fn))
+            n_events = len(filtered_sch_events)
+            filtered_sch_events = run_filter_events_function(sch, date, filtered_sch_events, filter_fn, attr_index)
+            Metrics.inc('filter_invocations_total', filter=filter_name)
+            if len(filtered_sch_events) < n_events:
+                Metrics.inc('filter_rejections_total', n_events - len(filtered_sch_events), filter=filter_name)
             if len(filtered_sch_events) == 0:
                 return []
     return filtered_sch_events
@@ -113,26 +119,80 @@ def count_placed_schedule_days(sch: Schedule) -> int:
         contains at least one event. """
     return len(get_placed_schedule_dates(sch))
 
-def parse_schedule(sch_dct: dict) -> Schedule:
-    """ Converts sch_dct into an instance of Schedule
+def iter_schedule_records(sch_src: Any) -> Iterator[dict]:
+    """ Converts a schedule source into a stream of schedule records
+        (header, day|placement..., footer) as produced by ScheduleSerializer.
+        sch_src may be:
+            * dict:     as returned by Schedule.as_dict() or read from JSON output.
+            * iterable: lines of NDJSON output, e.g. an open file handle,
+                        or already decoded records (e.g. from ScheduleSampler).
+    """
+    if isinstance(sch_src, dict):
+        days = sch_src['days']
+        yield dict(
+            record='header',
+            schedule=dict((key, value) for key, value in sch_src.items() if key not in ['days', 'options']),
+            options=sch_src['options'],
+            stats=dict(
+                days=len(days),
+                placed_days=sum(1 for date in days if len(days[date]['events']) > 0)
+            )
+        )
+        for date, day in days.items():
+            yield dict(record='day', date=date, events=day['events'])
+        return
+    for line in sch_src:
+        if isinstance(line, dict):
+            yield line
+            continue
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        yield json_codec.loads(line)
+
+def parse_schedule(sch_src: Any, verify: bool=True) -> Schedule:
+    """ Converts sch_src into an instance of Schedule
         Also parses any related member instances of Schedule,
         such as ScheduleEvent.
+        sch_src is any source accepted by iter_schedule_records,
+        so NDJSON output can be streamed back in line by line.
+        The schedule is bulk loaded (see Schedule.load_events) since
+        it has already been produced once. verify=True batch-verifies the
+        daily event limit and the placement count of an NDJSON footer.
+        Raises Exception under verify=True if NDJSON records (header with
+        granularity, as written by ScheduleSerializer) end without a footer,
+        e.g. a truncated file.
     """
-    schedule = make_schedule(sch_dct['options'])
-    # set planning interval temporarily to schedule interval,
-    # which allows add_event to be called without raising
-    # exceptions in case planning interval is a subinterval of schedule intervla.
-    planning_interval = schedule.get_planning_interval()
-    schedule.set_planning_interval(schedule.get_schedule_interval())
-    for date in schedule.get_days():
-        sch_events_list = sch_dct['days'][date]['events']
-        for event_dct in sch_events_list:
-            sch_event_obj = ScheduleEvent(event_dct)
-            # Events should by default not contain any candidates.
-            sch_event_obj.set_candidates([])
-            schedule.add_event([date], sch_event_obj)
-    # restore planning interval
-    schedule.set_planning_interval(planning_interval)
+    records = iter_schedule_records(sch_src)
+    header = next(records, None)
+    if header is None or header['record'] != 'header':
+        raise Exception('Schedule records must start with a header record, instead got: %s' % (header))
+    schedule = make_schedule(header['options'])
+    footer = {}
+
+    def iter_placements():
+        for record in records:
+            if record['record'] == 'day':
+                event_dcts = record['events']
+            elif record['record'] == 'placement':
+                event_dcts = [record['event']]
+            elif record['record'] == 'footer':
+                footer.update(record)
+                continue
+            else:
+                raise Exception('Unknown schedule record: %s' % (record['record']))
+            date = intern_date(record['date'])
+            for event_dct in event_dcts:
+                sch_event_obj = ScheduleEvent(event_dct)
+                # Events should by default not contain any candidates.
+                sch_event_obj.set_candidates([])
+                yield date, sch_event_obj
+
+    loaded = schedule.load_events(iter_placements(), verify=verify)
+    if verify and 'granularity' in header and not footer:
+        raise Exception('Schedule records are incomplete: missing footer record')
+    if verify and footer and footer['placements'] != loaded:
+        raise Exception('Schedule records are incomplete. Expected %s placements, instead got: %s' % (footer['placements'], loaded))
     return schedule
 
 def is_schedule_complete(sch: Schedule) -> bool:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Minimal schema language for JSON data which is compiled into validator functions.
+    A schema is a dict with:
+        * type:         'int', 'str', 'list', 'dict' or 'any'
+        * enum:         allowed values
+        * min, max:     bounds of int
+        * items:        schema of list items
+        * min_items:    minimum length of list
+        * properties:   schemas of dict properties
+        * required:     required dict properties
+        * additional:   allow dict properties not in properties (default True)
+        * any_of:       list of schemas of which at least one must match
+        * check:        callable(value) -> error message (or None) for rules across properties
+    compile_schema(schema) returns a function validate(value, path) -> list of error messages.
+    Example:
+    validate = compile_schema(dict(type='list', items=dict(type='int', min=0)))
+    validate([1, -1], 'cap') # => ['cap[1]: expected int >= 0, instead got: -1']
+"""
+from typing import Any, Callable, List
+
+def __type_name(value: Any) -> str:
+    return type(value).__name__
+
+def compile_schema(schema: dict) -> Callable[[Any, str], List[str]]:
+    if 'any_of' in schema:
+        alternatives = [compile_schema(alternative) for alternative in schema['any_of']]
+        def validate_any_of(value: Any, path: str) -> List[str]:
+            errors = []
+            for validate in alternatives:
+                alternative_errors = validate(value, path)
+                if len(alternative_errors) == 0:
+                    return []
+                errors.extend(alternative_errors)
+            return ['%s: no alternative matched (%s)' % (path, '; '.join(errors))]
+        return validate_any_of
+
+    checks = []
+    schema_type = schema.get('type', 'any')
+    if schema_type == 'int':
+        min_, max_ = schema.get('min'), schema.get('max')
+        def check_int(value: Any, path: str) -> List[str]:
+            if not isinstance(value, int) or isinstance(value, bool):
+                return ['%s: expected int, instead got: %s' % (path, __type_name(value))]
+            if min_ is not None and value < min_:
+                return ['%s: expected int >= %s, instead got: %s' % (path, min_, value)]
+            if max_ is not None and value > max_:
+                return ['%s: expected int <= %s, instead got: %s' % (path, max_, value)]
+            return []
+        checks.append(check_int)
+    elif schema_type == 'str':
+        def check_str(value: Any, path: str) -> List[str]:
+            if not isinstance(value, str):
+                return ['%s: expected str, instead got: %s' % (path, __type_name(value))]
+            return []
+        checks.append(check_str)
+    elif schema_type == 'list':
+        validate_item = compile_schema(schema['items']) if 'items' in schema else None
+        min_items = schema.get('min_items', 0)
+        def check_list(value: Any, path: str) -> List[str]:
+            if not isinstance(value, list):
+                return ['%s: expected list, instead got: %s' % (path, __type_name(value))]
+            if len(value) < min_items:
+                return ['%s: expected at least %s item(s), instead got: %s' % (path, min_items, len(value))]
+            errors = []
+            if validate_item is not None:
+                for idx, item in enumerate(value):
+                    errors.extend(validate_item(item, '%s[%s]' % (path, idx)))
+            return errors
+        checks.append(check_list)
+    elif schema_type == 'dict':
+        properties = dict((name, compile_schema(prop_schema)) for name, prop_schema in schema.get('properties', {}).items())
+        required = list(schema.get('required', []))
+        additional = schema.get('additional', True)
+        def check_dict(value: Any, path: str) -> List[str]:
+            if not isinstance(value, dict):
+                return ['%s: expected dict, instead got: %s' % (path, __type_name(value))]
+            errors = []
+            for name in required:
+                if name not in value:
+                    errors.append('%s: missing required property "%s"' % (path, name))
+            for name, prop_value in value.items():
+                if name in properties:
+                    errors.extend(properties[name](prop_value, '%s.%s' % (path, name)))
+                elif not additional:
+                    errors.append('%s: unknown property "%s"' % (path, name))
+            return errors
+        checks.append(check_dict)
+    elif schema_type != 'any':
+        raise Exception('Unknown schema type: %s' % (schema_type))
+
+    if 'enum' in schema:
+        enum = schema['enum']
+        enum_set = set(enum)
+        def check_enum(value: Any, path: str) -> List[str]:
+            try:
+                if value in enum_set:
+                    return []
+            except TypeError:
+                pass # unhashable
+            return ['%s: expected one of %s, instead got: %s' % (path, enum, value)]
+        checks.append(check_enum)
+
+    if 'check' in schema:
+        check_fn = schema['check']
+        def check_custom(value: Any, path: str) -> List[str]:
+            err_msg = check_fn(value)
+            return ['%s: %s' % (path, err_msg)] if err_msg else []
+        checks.append(check_custom)
+
+    def validate(value: Any, path: str='$') -> List[str]:
+        # checks run in order and stop at the first failing check,
+        # e.g. enum is not checked if value is of wrong type.
+        for check in checks:
+            errors = check(value, path)
+            if len(errors) > 0:
+                return errors
+        return []
+    return validate
@@ -7,14 +7,34 @@ built in packages.
 All dates are inclusive.
 """
 import ntpath
-import time, datetime, math, calendar
+import time, datetime, math, calendar, functools
 
 from typing import (Any)
 
+# Process wide pool of date str (%Y-%m-%d). All date str produced by
+# time_helper are interned through the pool, so equal dates share one
+# instance which saves memory and lets comparisons succeed on identity.
+_date_pool = {}
+
+# ordinal (as in datetime.date.toordinal) -> interned date str (%Y-%m-%d).
+_ordinal_dates = {}
+
+def intern_date(date_str: str) -> str:
+    """ Returns the pooled instance of date_str. """
+    return _date_pool.setdefault(date_str, date_str)
+
+def get_date_pool_size() -> int:
+    return len(_date_pool)
+
+def get_pooled_dates() -> list:
+    return list(_date_pool.values())
+
 def format_time_struct(time_struct, format='%Y-%m-%d'):
     return time.strftime(format, time_struct)
 
 def format_date(date, format_='%Y-%m-%d'):
+    if format_ == '%Y-%m-%d':
+        return intern_date(date.strftime(format_))
     return date.strftime(format_)
 
 def format_datetime(datetime, format_='%Y-%m-%d %H:%M:%S'):
@@ -58,15 +78,49 @@ def add_months(date, months):
 def add_days(date, days):
     return date + datetime.timedelta(days=days)
 
+def date_to_ordinal(date_str: str) -> int:
+    """ Converts date str (%Y-%m-%d) into a proleptic Gregorian ordinal. """
+    if len(date_str) == 10:
+        return datetime.date(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])).toordinal()
+    return parse_date(date_str).toordinal()
+
+def ordinal_to_date(ordinal: int) -> str:
+    """ Converts a proleptic Gregorian ordinal into date str (%Y-%m-%d). """
+    date_str = _ordinal_dates.get(ordinal)
+    if date_str is None:
+        date_str = _ordinal_dates[ordinal] = intern_date(datetime.date.fromordinal(ordinal).isoformat())
+    return date_str
+
+def shift_date(date_str: str, days: int) -> str:
+    """ Adds days (may be negative) to date str. """
+    return ordinal_to_date(date_to_ordinal(date_str) + days)
+
+@functools.lru_cache(maxsize=128)
+def _get_date_range(start_date: str, end_date: str) -> tuple:
+    dates = [intern_date(start_date)]
+    for ordinal in range(date_to_ordinal(start_date)+1, date_to_ordinal(end_date)+1):
+        dates.append(ordinal_to_date(ordinal))
+    return tuple(dates)
+
+@functools.lru_cache(maxsize=128)
+def get_date_set(start_date: str, end_date: str) -> frozenset:
+    """ Returns frozenset of dates between start_date and end_date (inclusive),
+        shared by callers with the same interval. """
+    return frozenset(_get_date_range(start_date, end_date))
+
 # Get montly dates between a date interval
 # get_monthly_dates("2017-01-01", "2017-12-01") would produce
 # 2017-01-01, 2017-02-01, 2017-03-01, ..., 2017-12-01
 def get_monthly_dates(start_date: str, end_date: str) -> list:
     dates = []
-    next_date = start_date
+    if start_date > end_date:
+        return dates
+    next_date = intern_date(start_date)
+    next_date_obj = parse_date(start_date)
     while next_date <= end_date:
         dates.append(next_date)
-        next_date = format_date(add_months(parse_date(next_date), +1))
+        next_date_obj = add_months(next_date_obj, +1)
+        next_date = ordinal_to_date(next_date_obj.toordinal())
     return dates
 
 # Get date range between a date interval
@@ -75,30 +129,24 @@ def get_monthly_dates(start_date: str, end_date: str) -> list:
 def get_date_range(start_date: str, end_date: str) -> list:
     if start_date > end_date:
         raise Exception('start_date=%s exceeds end_date=%s' % (start_date, end_date))
-    dates = []
-    next_date = start_date
-    while next_date <= end_date:
-        dates.append(next_date)
-        next_date = format_date(add_days(parse_date(next_date), +1))
-    return dates
+    return list(_get_date_range(start_date, end_date))
 
 # Gets week range between a date interval
 # get_week_range("2017-01-01", "2017-12-01") would produce:
 # [ ['2017-01-01'], ['2017-01-02', '2017-01-03', ..., '2017-01-08'], ['2017-01-09', ...] ]
 def get_week_range(start_date: str, end_date: str) -> list:
     week_range = []
-    cur_date = start_date
+    if start_date > end_date:
+        return week_range
     week_buffer = []
-    prev_date = None
-    while cur_date <= end_date:
-        if prev_date and get_week_number(cur_date) != get_week_number(prev_date):
+    start_ordinal = date_to_ordinal(start_date)
+    for ordinal, date in zip(range(start_ordinal, date_to_ordinal(end_date)+1), _get_date_range(start_date, end_date)):
+        # ISO weeks start on monday, ordinal 1 (0001-01-01) is a monday.
+        if ordinal % 7 == 1 and len(week_buffer) > 0:
             # new week, clear buffer
             week_range.append(week_buffer)
             week_buffer = []
-        week_buffer.append(cur_date)
-        prev_date = cur_date
-        # last action
-        cur_date = format_date(add_days(parse_date(cur_date), +1))
+        week_buffer.append(date)
     if len(week_buffer) > 0:
         # adds remaining buffer
         week_range.append(week_buffer)
@@ -127,7 +175,7 @@ def get_nth_day_of_year(year: int, n: int) -> str:
         raise ValueError("n must be between 1 and 365 (inclusive)")
     first_day = datetime.datetime(year, 1, 1)
     nth_day = first_day + datetime.timedelta(days=n-1)
-    return nth_day.strftime('%Y-%m-%d')
+    return intern_date(nth_day.strftime('%Y-%m-%d'))
 
 def get_weekday_name(date: Any, short: bool=False, to_lower: bool=False) -> str:
     if isinstance(date, str):
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Tracing spans of the planning pipeline (handlers and schedule builder stages).
+    A span records wall time, CPU time and (optionally) the change in memory
+    allocated by Python (tracemalloc) between its start and end.
+    Spans nest, so the self time of a span excludes time spent in its child spans.
+    Tracing is off by default and then costs one flag check per traced call.
+    Example:
+    Tracer.activate(trace_memory=True)
+    with Tracer.span('load', category='io'):
+        ...
+    Tracer.export_chrome_trace('trace.json') # open in chrome://tracing or Perfetto
+"""
+from py_matplanering.utilities import common
+
+from typing import Any, Callable
+
+import functools, json, os, threading, time, tracemalloc
+
+tracer__spans = []
+tracer__settings = dict(on=False, trace_memory=False, started_tracemalloc=False, stack=[])
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', 'depth', 'start_wall', 'start_cpu', 'start_alloc', 'child_wall')
+
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        stack = tracer__settings['stack']
+        self.depth = len(stack)
+        stack.append(self)
+        self.child_wall = 0
+        self.start_alloc = tracemalloc.get_traced_memory()[0] if tracer__settings['trace_memory'] else None
+        self.start_cpu = time.process_time_ns()
+        self.start_wall = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_wall = time.perf_counter_ns()
+        end_cpu = time.process_time_ns()
+        stack = tracer__settings['stack']
+        stack.pop()
+        wall = end_wall - self.start_wall
+        if len(stack) > 0:
+            stack[-1].child_wall += wall
+        span = dict(
+            name=self.name,
+            category=self.category,
+            depth=self.depth,
+            start_ns=self.start_wall,
+            wall_ns=wall,
+            self_wall_ns=wall - self.child_wall,
+            cpu_ns=end_cpu - self.start_cpu,
+            alloc_bytes=None,
+            error=exc_type.__name__ if exc_type is not None else None,
+            args=self.args
+        )
+        if self.start_alloc is not None and tracemalloc.is_tracing():
+            span['alloc_bytes'] = tracemalloc.get_traced_memory()[0] - self.start_alloc
+        tracer__spans.append(span)
+        return False
+
+class _NoSpan:
+    """ Used when tracing is off. """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+class Tracer(metaclass=common.Singleton):
+    @staticmethod
+    def activate(trace_memory: bool=False):
+        """ Starts tracing. trace_memory=True records allocation deltas (starts tracemalloc if needed). """
+        tracer__settings['on'] = True
+        tracer__settings['trace_memory'] = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            tracer__settings['started_tracemalloc'] = True
+
+    @staticmethod
+    def deactivate():
+        tracer__settings['on'] = False
+        if tracer__settings['started_tracemalloc']:
+            tracemalloc.stop()
+            tracer__settings['started_tracemalloc'] = False
+        tracer__settings['trace_memory'] = False
+
+    @staticmethod
+    def is_activated() -> bool:
+        return tracer__settings['on']
+
+    @staticmethod
+    def reset():
+        del tracer__spans[:]
+        del tracer__settings['stack'][:]
+
+    @staticmethod
+    def span(name: str, category: str='', **args) -> Any:
+        """ Context manager of a span. """
+        if not tracer__settings['on']:
+            return _NO_SPAN
+        return _Span(name, category, args)
+
+    @staticmethod
+    def get_spans() -> list:
+        """ Finished spans in order of completion. """
+        return tracer__spans
+
+    @staticmethod
+    def summarize(category: str=None) -> dict:
+        """ Aggregates spans by name: count, wall/self/cpu time (ms) and allocation (bytes). """
+        summary = {}
+        for span in tracer__spans:
+            if category is not None and span['category'] != category:
+                continue
+            row = summary.setdefault(span['name'], dict(category=span['category'], count=0, wall_ms=0.0, self_ms=0.0, cpu_ms=0.0, alloc_bytes=None))
+            row['count'] += 1
+            row['wall_ms'] += span['wall_ns'] / 1e6
+            row['self_ms'] += span['self_wall_ns'] / 1e6
+            row['cpu_ms'] += span['cpu_ns'] / 1e6
+            if span['alloc_bytes'] is not None:
+                row['alloc_bytes'] = (row['alloc_bytes'] or 0) + span['alloc_bytes']
+        return summary
+
+    @staticmethod
+    def to_chrome_trace() -> dict:
+        """ Spans as Chrome trace event format (complete events). """
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for span in sorted(tracer__spans, key=lambda span: (span['start_ns'], span['depth'])):
+            args = dict(span['args'], cpu_ms=span['cpu_ns'] / 1e6, self_ms=span['self_wall_ns'] / 1e6)
+            if span['alloc_bytes'] is not None:
+                args['alloc_bytes'] = span['alloc_bytes']
+            if span['error'] is not None:
+                args['error'] = span['error']
+            events.append(dict(
+                name=span['name'],
+                cat=span['category'],
+                ph='X',
+                ts=span['start_ns'] / 1e3,
+                dur=span['wall_ns'] / 1e3,
+                pid=pid,
+                tid=tid,
+                args=args
+            ))
+        return dict(traceEvents=events, displayTimeUnit='ms')
+
+    @staticmethod
+    def export_chrome_trace(path: str):
+        with open(path, 'w') as fp:
+            json.dump(Tracer.to_chrome_trace(), fp, default=str)
+
+def traced(name: str=None, category: str=''):
+    """ Decorator which runs the decorated function in a span (named by its qualified name by default). """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer__settings['on']:
+                return fn(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Generates synthetic workloads (event data, rule set, init schedule and config)
+    for scaling tests. The output is deterministic per seed, e.g.:
+    workload = generate_workload(n_events=500, horizon_days=730, seed=1)
+    paths = write_workload(workload, 'workloads/w500')
+    # python planera.py workloads/w500/config/sample_config.ini
+"""
+from py_matplanering.utilities import time_helper
+
+from typing import Any
+
+import json, math, os, random
+
+RULE_KINDS = ['period', 'date', 'cap', 'distance']
+DEFAULT_RULE_MIX = dict(period=4, date=1, cap=3, distance=2)
+EVENT_TYPES = ['beef', 'chicken', 'fish', 'pork', 'vegetarian', 'vegan']
+EVENT_DIFFICULTIES = ['easy', 'medium', 'hard']
+EVENT_SIDES = ['rice', 'potatoes', 'pasta', 'salad', 'bread']
+
+def parse_rule_mix(rule_mix_str: str) -> dict:
+    """ Parses 'period=4,cap=3' into dict(period=4, cap=3). """
+    rule_mix = {}
+    for part in rule_mix_str.split(','):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in RULE_KINDS:
+            raise Exception('Unknown rule kind: %s (select from: %s)' % (kind, RULE_KINDS))
+        rule_mix[kind] = int(weight) if weight.strip() else 1
+    return rule_mix
+
+def __make_boundary(rnd: random.Random, kind: str) -> Any:
+    if kind == 'period':
+        variant = rnd.random()
+        if variant < 0.5:
+            weekdays = time_helper.get_named_weekdays(short=True, to_lower=True)
+            return sorted(rnd.sample(weekdays, rnd.randint(1, 5)), key=weekdays.index)
+        if variant < 0.75:
+            return [rnd.choice(['q1', 'q2', 'q3', 'q4'])]
+        months = time_helper.get_named_months(short=True, to_lower=True)
+        return sorted(rnd.sample(months, rnd.randint(1, 4)), key=months.index)
+    if kind == 'date':
+        values = [dict(month_number=rnd.randint(1, 12), day_of_month=rnd.randint(1, 28)) for _ in range(rnd.randint(1, 3))]
+        return [dict(values=values)]
+    if kind == 'cap':
+        time_unit = rnd.choice(['week', 'month', 'month', 'half_year', 'year'])
+        cap = dict(max=rnd.randint(1, 3), time_unit=time_unit)
+        if rnd.random() < 0.25:
+            cap['min'] = 1
+        return [cap]
+    if kind == 'distance':
+        if rnd.random() < 0.75:
+            return [dict(time_unit='day', value=rnd.randint(2, 14))]
+        return [dict(time_unit='week', value=rnd.randint(1, 3))]
+    raise Exception('Unknown rule kind: %s' % (kind))
+
+def generate_rule_set(rnd: random.Random, n_rules: int, rule_mix: dict) -> dict:
+    """ Generates a rule set of n_rules rules, where kinds are drawn by weight of rule_mix. """
+    kinds = [kind for kind in RULE_KINDS if rule_mix.get(kind, 0) > 0]
+    if len(kinds) == 0:
+        raise Exception('Expected rule_mix with at least one positive weight, instead got: %s' % (rule_mix))
+    weights = [rule_mix[kind] for kind in kinds]
+    rule_set = []
+    for idx in range(n_rules):
+        # every kind of the mix is represented before kinds are drawn by weight
+        kind = kinds[idx] if idx < len(kinds) else rnd.choices(kinds, weights)[0]
+        rule_set.append(dict(
+            name='%s_%s' % (kind, idx + 1),
+            id=idx + 1,
+            rules=[dict(type='boundary', boundary=kind, **{kind: __make_boundary(rnd, kind)})]
+        ))
+    return dict(name='Generated ruleset', scope='event', rule_set=rule_set)
+
+def generate_event_data(rnd: random.Random, n_events: int, rule_names: list, rules_per_event: int, startdate: str) -> dict:
+    """ Generates n_events active events, each referencing 1 to rules_per_event rules of rule_names. """
+    events = []
+    for event_id in range(1, n_events + 1):
+        n_refs = min(rnd.randint(1, rules_per_event), len(rule_names))
+        events.append(dict(
+            id=event_id,
+            name='event_%s' % (event_id),
+            link=None,
+            difficulty=rnd.choice(EVENT_DIFFICULTIES),
+            type=rnd.choice(EVENT_TYPES),
+            **{'class': None},
+            meta=dict(scope=None, key='sides', value=rnd.choice(EVENT_SIDES)),
+            mindate=startdate,
+            maxdate='9999-12-31',
+            active=1,
+            free_text=None,
+            rules=sorted(rnd.sample(rule_names, n_refs))
+        ))
+    return dict(name='Generated events', data=events)
+
+def generate_init_schedule(rnd: random.Random, event_data: dict, startdate: str, enddate: str, density: float) -> dict:
+    """ Generates a schedule (as written by planera.py) where density of the days have a placed event. """
+    sch_interval = [startdate, enddate]
+    sch_options = dict(
+        schedule_interval=sch_interval,
+        planning_interval=sch_interval,
+        include_props=['id', 'name', 'prio'],
+        daily_event_limit=1,
+        event_defaults=dict(prio=5000),
+        iter_method='random'
+    )
+    dates = time_helper.get_date_range(startdate, enddate)
+    placed_dates = set(rnd.sample(dates, int(round(len(dates) * density))))
+    days = {}
+    for date in dates:
+        events = []
+        if date in placed_dates:
+            event = rnd.choice(event_data['data'])
+            events.append(dict(id=event['id'], name=event['name'], prio=5000))
+        days[date] = dict(events=events)
+    return dict(
+        schedule_startdate=startdate,
+        schedule_enddate=enddate,
+        planning_startdate=startdate,
+        planning_enddate=enddate,
+        days=days,
+        use_validation=True,
+        event_defaults=sch_options['event_defaults'],
+        name='master',
+        options=sch_options
+    )
+
+def generate_workload(n_events: int=100, horizon_days: int=365, startdate: str='2023-01-01', rule_mix: dict=None,
+                      rule_sharing: float=0.5, rules_per_event: int=2, init_density: float=0.0, seed: int=0) -> dict:
+    """ Generates a workload, returns dict(event_data, rule_set, init_schedule, params).
+        rule_sharing:   0.0 gives (about) one rule per event reference, 1.0 one rule per kind of rule_mix,
+                        shared by all events.
+        init_density:   share of days with a placed event in init_schedule (None if 0). """
+    if n_events < 1 or horizon_days < 1:
+        raise Exception('Expected n_events >= 1 and horizon_days >= 1, instead got: %s, %s' % (n_events, horizon_days))
+    if not 0 <= rule_sharing <= 1 or not 0 <= init_density <= 1:
+        raise Exception('Expected rule_sharing and init_density in [0, 1], instead got: %s, %s' % (rule_sharing, init_density))
+    rule_mix = dict(rule_mix or DEFAULT_RULE_MIX)
+    rnd = random.Random(seed)
+    enddate = time_helper.shift_date(startdate, horizon_days - 1)
+    n_kinds = sum(1 for weight in rule_mix.values() if weight > 0)
+    n_rules = max(n_kinds, int(math.ceil(n_events * rules_per_event * (1 - rule_sharing))))
+    rule_set = generate_rule_set(rnd, n_rules, rule_mix)
+    rule_names = [row['name'] for row in rule_set['rule_set']]
+    event_data = generate_event_data(rnd, n_events, rule_names, rules_per_event, startdate)
+    init_schedule = None
+    if init_density > 0:
+        init_schedule = generate_init_schedule(rnd, event_data, startdate, enddate, init_density)
+    return dict(
+        event_data=event_data,
+        rule_set=rule_set,
+        init_schedule=init_schedule,
+        params=dict(
+            n_events=n_events,
+            horizon_days=horizon_days,
+            startdate=startdate,
+            enddate=enddate,
+            rule_mix=rule_mix,
+            rule_sharing=rule_sharing,
+            rules_per_event=rules_per_event,
+            init_density=init_density,
+            seed=seed
+        )
+    )
+
+def make_config(workload: dict, paths: dict, planner: str='PlannerDefault', iterations: int=1) -> str:
+    """ Returns planera.py config (ini) of workload written to paths. """
+    params = workload['params']
+    lines = [
+        '[Config]',
+        '# generated workload: %s' % (', '.join('%s=%s' % (key, params[key]) for key in sorted(params))),
+        'event_data_path = %s' % (paths['event_data']),
+        'rule_set_path = %s' % (paths['rule_set']),
+        'output_path = %s' % (paths['output']),
+        'planner = %s' % (planner),
+        'schedule_startdate = %s' % (params['startdate']),
+        'schedule_enddate = %s' % (params['enddate']),
+        'planning_startdate = %s' % (params['startdate']),
+        'planning_enddate = %s' % (params['enddate']),
+        'iter_method = random',
+        'iterations = %s' % (iterations),
+    ]
+    if paths.get('init_schedule'):
+        lines.extend([
+            'init_schedule_path = %s' % (paths['init_schedule']),
+            'sample_size_percent = 100',
+            'sample_method = require_placed_day',
+            'strategy = REPLACE_PLACED_DAYS'
+        ])
+    else:
+        lines.append('strategy = IGNORE_PLACED_DAYS')
+    return '\n'.join(lines) + '\n'
+
+def write_workload(workload: dict, out_dir: str, planner: str='PlannerDefault', iterations: int=1) -> dict:
+    """ Writes workload files into out_dir (events.json, ruleset.json, init_schedule.json
+        and config/sample_config.ini) and returns their paths. """
+    os.makedirs(os.path.join(out_dir, 'config'), exist_ok=True)
+    paths = dict(
+        event_data=os.path.join(out_dir, 'events.json'),
+        rule_set=os.path.join(out_dir, 'ruleset.json'),
+        init_schedule=os.path.join(out_dir, 'init_schedule.json') if workload['init_schedule'] is not None else None,
+        output=os.path.join(out_dir, 'output.json'),
+        config=os.path.join(out_dir, 'config', 'sample_config.ini')
+    )
+    for key in ['event_data', 'rule_set', 'init_schedule']:
+        if paths[key] is None:
+            continue
+        with open(paths[key], 'w') as fp:
+            json.dump(workload[key], fp, indent=1)
+    with open(paths['config'], 'w') as fp:
+        fp.write(make_config(workload, paths, planner=planner, iterations=iterations))
+    return paths
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+from py_matplanering.core.boundary.boundary_base import BoundaryError
+from py_matplanering.core.boundary.boundary_date import BoundaryDate
+from py_matplanering.core.context import BoundaryContext
+from py_matplanering.utilities import time_helper
+
+def make_boundary(values: list) -> BoundaryDate:
+    boundary = BoundaryDate()
+    boundary.set_boundary(dict(boundary='date', date=[dict(values=values)]))
+    return boundary
+
+def filter_dates(boundary: BoundaryDate, dates: list) -> list:
+    return boundary.filter_eligible_dates(BoundaryContext(None, [], dates))
+
+def test_month_days_match_every_year():
+    boundary = make_boundary([dict(month_number=12, day_of_month=25), dict(month_number=1, day_of_month=6)])
+    dates = time_helper.get_date_range('2022-06-01', '2025-01-05')
+    assert filter_dates(boundary, dates) == ['2022-12-25', '2023-01-06', '2023-12-25', '2024-01-06', '2024-12-25']
+
+def test_leap_day_is_skipped_in_other_years():
+    boundary = make_boundary([dict(month_number=2, day_of_month=29)])
+    dates = time_helper.get_date_range('2023-01-01', '2028-12-31')
+    assert filter_dates(boundary, dates) == ['2024-02-29', '2028-02-29']
+
+def test_sparse_dates_are_filtered():
+    boundary = make_boundary([dict(month_number=3, day_of_month=1)])
+    dates = ['2022-03-01', '2023-02-28', '2024-03-01', '2025-06-01']
+    assert filter_dates(boundary, dates) == ['2022-03-01', '2024-03-01']
+
+def test_matches_calendar_scan():
+    values = [dict(month_number=month_number, day_of_month=day_of_month) for month_number, day_of_month in [(1, 31), (4, 30), (7, 4), (11, 1)]]
+    boundary = make_boundary(values)
+    dates = time_helper.get_date_range('2019-03-15', '2023-08-20')
+    expected = [date for date in dates if (int(date[5:7]), int(date[8:10])) in [(1, 31), (4, 30), (7, 4), (11, 1)]]
+    assert filter_dates(boundary, dates) == expected
+
+def test_invalid_month_day_is_rejected():
+    with pytest.raises(BoundaryError):
+        make_boundary([dict(month_number=2, day_of_month=30)]).get_month_days()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from py_matplanering.core.boundary.boundary_base import BoundaryError, get_time_span_days
+from py_matplanering.core.boundary.boundary_variety import BoundaryVariety
+from py_matplanering.core.context import BoundaryContext
+from py_matplanering.core.schedule.schedule import Schedule, ScheduleEvent
+from py_matplanering.utilities import time_helper
+
+def make_schedule() -> Schedule:
+    return Schedule(dict(
+        schedule_interval=('2023-01-01', '2023-03-31'),
+        planning_interval=None,
+        daily_event_limit=1,
+        include_props=['id', 'name', 'type']
+    ))
+
+def make_event(event_id: int, type_: str) -> ScheduleEvent:
+    return ScheduleEvent(dict(id=event_id, name='event_%s' % (event_id), type=type_, rules=[]))
+
+def make_boundary(max_: int, window: dict, value: str=None) -> BoundaryVariety:
+    variety = dict(attribute='type', max=max_, window=window)
+    if value is not None:
+        variety['value'] = value
+    boundary = BoundaryVariety()
+    boundary.set_boundary(dict(boundary='variety', variety=[variety]))
+    return boundary
+
+def filter_ids(boundary: BoundaryVariety, sch: Schedule, events: list, dates: list) -> list:
+    eligible = boundary.filter_eligible_events(BoundaryContext(sch, events, dates))
+    return [sch_event.get_id() for sch_event in eligible]
+
+def test_time_span_days():
+    assert get_time_span_days(dict(time_unit='day', value=3)) == 3
+    assert get_time_span_days(dict(time_unit='week', value=2)) == 14
+    assert get_time_span_days(dict(time_unit='month', value=1)) == 30
+    with pytest.raises(BoundaryError):
+        get_time_span_days(dict(time_unit='year', value=1))
+    with pytest.raises(BoundaryError):
+        get_time_span_days(dict(time_unit='day', value=True))
+
+def test_window_limit():
+    sch = make_schedule()
+    boundary = make_boundary(2, dict(time_unit='week', value=1), value='fish')
+    fish, meat = make_event(1, 'fish'), make_event(2, 'meat')
+    sch.add_event(['2023-01-02'], make_event(3, 'fish'))
+    assert filter_ids(boundary, sch, [fish, meat], ['2023-01-05']) == [1, 2]
+    sch.add_event(['2023-01-04'], make_event(4, 'fish'))
+    # two fish within a week of 2023-01-05, a third one exceeds max
+    assert filter_ids(boundary, sch, [fish, meat], ['2023-01-05']) == [2]
+    # 2023-01-10 is within a week of 2023-01-04 only
+    assert filter_ids(boundary, sch, [fish, meat], ['2023-01-10']) == [1, 2]
+    # 2023-01-11 is more than a week after both
+    assert filter_ids(boundary, sch, [fish, meat], ['2023-01-11']) == [1, 2]
+
+def test_window_limit_counts_windows_after_date():
+    sch = make_schedule()
+    boundary = make_boundary(1, dict(time_unit='day', value=3))
+    sch.add_event(['2023-01-10'], make_event(3, 'fish'))
+    assert filter_ids(boundary, sch, [make_event(1, 'fish')], ['2023-01-08']) == []
+    assert filter_ids(boundary, sch, [make_event(1, 'fish')], ['2023-01-07']) == [1]
+    assert filter_ids(boundary, sch, [make_event(1, 'meat')], ['2023-01-10']) == [1]
+
+def test_event_must_fit_every_date():
+    sch = make_schedule()
+    boundary = make_boundary(1, dict(time_unit='day', value=2))
+    sch.add_event(['2023-01-10'], make_event(3, 'fish'))
+    events = [make_event(1, 'fish'), make_event(2, 'meat')]
+    assert filter_ids(boundary, sch, events, ['2023-01-01', '2023-01-05']) == [1, 2]
+    assert filter_ids(boundary, sch, events, ['2023-01-01', '2023-01-11']) == [2]
+
+def test_window_count_matches_sliding_window():
+    rnd = random.Random(7)
+    sch = make_schedule()
+    dates = time_helper.get_date_range('2023-01-01', '2023-03-31')
+    placed = dict()
+    for event_id, date in enumerate(rnd.sample(dates, 40)):
+        type_ = rnd.choice(['fish', 'meat'])
+        sch.add_event([date], make_event(event_id, type_))
+        placed[date] = type_
+    for window in (1, 3, 7, 30):
+        for date in dates:
+            ordinal = time_helper.date_to_ordinal(date)
+            expected = 0
+            for start in range(ordinal-window+1, ordinal+1):
+                count = sum(1 for offset in range(window) if placed.get(time_helper.ordinal_to_date(start+offset)) == 'fish')
+                expected = max(expected, count)
+            assert sch.get_attribute_window_count('type', 'fish', date, window) == expected
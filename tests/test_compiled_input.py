@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+
+from py_matplanering.core.schedule import compiled_input
+from py_matplanering.core.schedule.compiled_input import CompiledInput, CompiledInputCache
+
+EVENT_DATA = dict(name='catalog', data=[dict(id=1, name='first', rules=['r1'])])
+RULE_SET = [dict(rule_set=[dict(id=1, name='r1', rules=[])])]
+SCH_OPTIONS = dict(schedule_interval=('2023-01-01', '2023-12-31'), event_defaults=dict(prio=5000), iter_method='sorted')
+
+def compute_key(event_data: dict=EVENT_DATA, rule_set: list=RULE_SET, **sch_options) -> str:
+    return CompiledInput.compute_key(event_data, rule_set, dict(SCH_OPTIONS, **sch_options))
+
+def test_key_changes_with_input():
+    key = compute_key()
+    assert compute_key() == key
+    assert compute_key(event_data=dict(EVENT_DATA, data=[dict(id=1, name='renamed', rules=['r1'])])) != key
+    assert compute_key(rule_set=[dict(rule_set=[])]) != key
+    assert compute_key(schedule_interval=('2023-01-01', '2024-12-31')) != key
+    assert compute_key(event_defaults=dict(prio=1)) != key
+
+def test_key_ignores_options_without_effect_on_candidates():
+    assert compute_key(iter_method='random') == compute_key()
+
+def test_key_changes_with_code(monkeypatch):
+    key = compute_key()
+    monkeypatch.setattr(compiled_input, 'compute_code_fingerprint', lambda: 'changed code')
+    assert compute_key() != key
+
+def test_store_and_load(tmp_path):
+    cache = CompiledInputCache(str(tmp_path))
+    key = compute_key()
+    assert cache.load(key) is None
+    cache.store(CompiledInput(key, EVENT_DATA, RULE_SET, {1: ['2023-01-02', '2023-01-03']}))
+    artifact = cache.load(key)
+    assert artifact.event_data == EVENT_DATA
+    assert artifact.rule_set == RULE_SET
+    assert artifact.candidates == {1: ['2023-01-02', '2023-01-03']}
+    assert cache.load(compute_key(event_defaults=dict(prio=1))) is None
+
+def test_stale_and_unreadable_artifacts_are_ignored(tmp_path):
+    cache = CompiledInputCache(str(tmp_path))
+    key = compute_key()
+    path = cache.store(CompiledInput(key, EVENT_DATA, RULE_SET))
+    with open(path) as fp:
+        dct = json.load(fp)
+    with open(path, 'w') as fp:
+        json.dump(dict(dct, version=CompiledInput.VERSION - 1), fp)
+    assert cache.load(key) is None
+    with open(path, 'w') as fp:
+        json.dump(dict(dct, key='another key'), fp)
+    assert cache.load(key) is None
+    with open(path, 'w') as fp:
+        fp.write('{"truncated": ')
+    assert cache.load(key) is None
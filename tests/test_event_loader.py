@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io, json
+
+import pytest
+
+from py_matplanering.utilities import event_loader, json_codec
+
+EVENT_DATA = dict(
+    name='catalog',
+    version=2,
+    data=[
+        dict(id=1, name='fisk {med} [sås]', type='fish', active=1, rules=['r1'], mindate='2023-01-01'),
+        dict(id=2, name='citat \\"x\\" och \\\\', type='meat', active=0, rules=[], prio=1.5),
+        dict(id=3, name='räksmörgås', type='fish', active=1, rules=['r1', 'r2'], nested=dict(a=[1, [2, 3]], b=None))
+    ],
+    tail=[1, 2]
+)
+
+@pytest.fixture(params=[backend for backend in json_codec.BACKENDS if backend != 'msgspec' or json_codec.msgspec is not None])
+def backend(request):
+    previous = json_codec.get_backend()
+    if request.param == 'orjson' and json_codec.orjson is None:
+        pytest.skip('orjson is not installed')
+    json_codec.set_backend(request.param)
+    yield request.param
+    json_codec.set_backend(previous)
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64, event_loader.CHUNK_SIZE])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_load_event_data_matches_json(backend, chunk_size, indent):
+    text = json.dumps(EVENT_DATA, indent=indent, ensure_ascii=False)
+    assert event_loader.load_event_data(io.StringIO(text), chunk_size=chunk_size) == EVENT_DATA
+
+def test_load_event_data_filters_events(backend):
+    text = json.dumps(EVENT_DATA)
+    event_data = event_loader.load_event_data(io.StringIO(text), exclude_event_ids=[3], require_active=True, chunk_size=5)
+    assert [row['id'] for row in event_data['data']] == [1]
+
+def test_unterminated_event_is_rejected(backend):
+    text = json.dumps(EVENT_DATA)[:60]
+    with pytest.raises(Exception):
+        event_loader.load_event_data(io.StringIO(text), chunk_size=8)
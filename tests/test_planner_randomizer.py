@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from py_matplanering.core.planner.planner_randomizer import PlannerRandomizer
+
+class FakeScheduleBuilder:
+    def __init__(self):
+        self.build_options = dict()
+
+    def set_build_options(self, build_options: dict):
+        self.build_options.update(build_options)
+
+def test_plan_init_does_not_modify_options():
+    sch_options = dict(schedule_interval=('2023-01-01', '2023-01-10'), planning_interval=None, daily_event_limit=None)
+    planner = PlannerRandomizer()
+    planner.set_schedule_builder(FakeScheduleBuilder())
+    schedule = planner.plan_init(sch_options)
+    assert sch_options['daily_event_limit'] is None
+    assert schedule.sch_options['daily_event_limit'] == 1
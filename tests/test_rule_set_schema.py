@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from py_matplanering.core import rule_set_schema
+
+def make_rule_set(idx: int) -> dict:
+    return dict(rule_set=[dict(id=idx, name='rule_%s' % (idx), rules=[dict(boundary='unknown_%s' % (idx))])])
+
+def test_results_cache_is_bounded():
+    for idx in range(rule_set_schema.RULE_SET_CACHE_SIZE * 3):
+        rule_set_schema.validate_rule_set(make_rule_set(idx))
+        assert len(rule_set_schema._rule_set_results) <= rule_set_schema.RULE_SET_CACHE_SIZE
+
+def test_cached_results_are_not_shared():
+    rule_set = make_rule_set(1000)
+    errors = rule_set_schema.validate_rule_set(rule_set)
+    errors.append('changed')
+    assert rule_set_schema.validate_rule_set(rule_set) == errors[:-1]
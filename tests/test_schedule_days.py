@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+from py_matplanering.core.schedule.schedule import Schedule, ScheduleDays, ScheduleEvent
+from py_matplanering.utilities import time_helper
+
+PLACEMENTS = [('2023-01-02', 1), ('2023-02-14', 2), ('2023-03-31', 3)]
+
+def make_schedule() -> Schedule:
+    return Schedule(dict(
+        schedule_interval=('2023-01-01', '2023-03-31'),
+        planning_interval=None,
+        daily_event_limit=1,
+        include_props=['id', 'name']
+    ))
+
+def make_event(event_id: int) -> ScheduleEvent:
+    return ScheduleEvent(dict(id=event_id, name='event_%s' % (event_id), rules=[]))
+
+def test_sparse_days_serialize_as_dense_days():
+    sch = make_schedule()
+    for date, event_id in PLACEMENTS:
+        sch.add_event([date], make_event(event_id))
+    placed = dict((date, event_id) for date, event_id in PLACEMENTS)
+    dense_days = dict()
+    for date in time_helper.get_date_range('2023-01-01', '2023-03-31'):
+        events = [dict(id=placed[date], name='event_%s' % (placed[date]))] if date in placed else []
+        dense_days[date] = dict(events=events)
+    days = sch.as_dict()['days']
+    assert list(days) == list(dense_days)
+    assert days == dense_days
+    assert sch.get_days().count_materialized() == len(PLACEMENTS)
+
+def test_loaded_schedule_matches_added_schedule():
+    added, loaded = make_schedule(), make_schedule()
+    for date, event_id in PLACEMENTS:
+        added.add_event([date], make_event(event_id))
+    loaded.load_events([(date, make_event(event_id)) for date, event_id in PLACEMENTS])
+    assert loaded.as_dict() == added.as_dict()
+
+def test_reads_do_not_materialize_days():
+    sch = make_schedule()
+    days = sch.get_days()
+    assert days['2023-01-05'] is ScheduleDays.EMPTY_DAY
+    assert sch.get_day('2023-01-06') is ScheduleDays.EMPTY_DAY
+    assert days.get('2023-01-07') is ScheduleDays.EMPTY_DAY
+    assert len(sch.get_events_by_date('2023-01-08')) == 0
+    assert not sch.day_has_event('2023-01-09')
+    assert days.count_materialized() == 0
+    with pytest.raises(KeyError):
+        days['2024-01-01']
+    assert days.get('2024-01-01') is None
+
+def test_materialize_returns_writable_day():
+    days = ScheduleDays(tuple(time_helper.get_date_range('2023-01-01', '2023-01-10')))
+    day = days.materialize('2023-01-03')
+    day['events'].append('event')
+    assert days['2023-01-03'] is day
+    assert days.materialize('2023-01-03') is day
+    assert days.materialized() == [('2023-01-03', day)]
+    with pytest.raises(KeyError):
+        days.materialize('2023-02-01')
+
+def test_prep_events_are_materialized():
+    days = ScheduleDays(tuple(time_helper.get_date_range('2023-01-01', '2023-01-10')), dict(prep_date=[]))
+    assert days.count_materialized() == 0
+    days = ScheduleDays(tuple(time_helper.get_date_range('2023-01-01', '2023-01-10')), {'2023-01-02': ['event']})
+    assert days['2023-01-02'] == dict(events=['event'])
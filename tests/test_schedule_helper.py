@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io, json
+
+import pytest
+
+from py_matplanering.core.schedule.schedule import Schedule, ScheduleEvent
+from py_matplanering.core.schedule.schedule_serializer import ScheduleSerializer
+from py_matplanering.utilities import schedule_helper
+
+def make_schedule() -> Schedule:
+    sch = Schedule(dict(
+        schedule_interval=('2023-01-01', '2023-01-10'),
+        planning_interval=None,
+        daily_event_limit=1,
+        include_props=['id', 'name', 'prio']
+    ))
+    sch.add_event(['2023-01-02'], ScheduleEvent(dict(id=1, name='first', prio=5000, rules=[])))
+    sch.add_event(['2023-01-05'], ScheduleEvent(dict(id=2, name='second', prio=10, rules=[])))
+    return sch
+
+def dump_ndjson_lines(granularity: str) -> list:
+    fp = io.BytesIO()
+    ScheduleSerializer(make_schedule()).dump_ndjson(fp, granularity=granularity)
+    return fp.getvalue().splitlines(keepends=True)
+
+@pytest.mark.parametrize('granularity', ['day', 'placement'])
+def test_ndjson_round_trip(granularity):
+    lines = dump_ndjson_lines(granularity)
+    assert json.loads(lines[-1])['record'] == 'footer'
+    schedule = schedule_helper.parse_schedule(lines)
+    assert schedule.as_dict()['days'] == make_schedule().as_dict()['days']
+
+@pytest.mark.parametrize('granularity', ['day', 'placement'])
+def test_ndjson_without_footer_is_rejected(granularity):
+    lines = dump_ndjson_lines(granularity)[:-1]
+    with pytest.raises(Exception, match='missing footer'):
+        schedule_helper.parse_schedule(lines)
+    # unverified parsing accepts what was read
+    assert schedule_helper.parse_schedule(lines, verify=False) is not None
+
+def test_ndjson_truncated_before_footer_is_rejected():
+    lines = dump_ndjson_lines('placement')
+    truncated = lines[:2] + lines[-1:] # header, first placement, footer
+    with pytest.raises(Exception, match='Expected 2 placements'):
+        schedule_helper.parse_schedule(truncated)
+
+def test_json_output_needs_no_footer():
+    sch_dct = json.loads(ScheduleSerializer(make_schedule()).dumps())
+    schedule = schedule_helper.parse_schedule(sch_dct)
+    assert schedule.as_dict()['days'] == make_schedule().as_dict()['days']
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io, json, re
+
+import pytest
+
+from py_matplanering.core.schedule.schedule import Schedule, ScheduleEvent
+from py_matplanering.core.schedule.schedule_serializer import ScheduleSerializer
+
+from py_matplanering.utilities import json_codec
+
+def make_schedule() -> Schedule:
+    sch = Schedule(dict(
+        schedule_interval=('2023-01-01', '2023-01-10'),
+        planning_interval=None,
+        daily_event_limit=1,
+        include_props=['id', 'name', 'prio']
+    ))
+    sch.add_event(['2023-01-02'], ScheduleEvent(dict(id=1, name='jan_only', prio=5000, rules=[])))
+    sch.add_event(['2023-01-05'], ScheduleEvent(dict(id=2, name='räksmörgås', prio=10, rules=[])))
+    return sch
+
+def normalize(data: bytes) -> bytes:
+    return re.sub(rb'\s+', b'', data)
+
+@pytest.fixture(params=[backend for backend in json_codec.BACKENDS if backend != 'msgspec' or json_codec.msgspec is not None])
+def backend(request):
+    previous = json_codec.get_backend()
+    if request.param == 'orjson' and json_codec.orjson is None:
+        pytest.skip('orjson is not installed')
+    json_codec.set_backend(request.param)
+    yield request.param
+    json_codec.set_backend(previous)
+
+def test_text_and_binary_output_are_identical(backend):
+    serializer = ScheduleSerializer(make_schedule())
+    binary_fp = io.BytesIO()
+    serializer.dump(binary_fp)
+    text_fp = io.StringIO()
+    serializer.dump(text_fp)
+    assert binary_fp.getvalue() == text_fp.getvalue().encode('utf-8')
+    assert normalize(binary_fp.getvalue()) == normalize(text_fp.getvalue().encode('utf-8'))
+
+def test_output_decodes_to_as_dict(backend):
+    sch = make_schedule()
+    binary_fp = io.BytesIO()
+    ScheduleSerializer(sch).dump(binary_fp)
+    assert json.loads(binary_fp.getvalue()) == json.loads(json.dumps(sch.as_dict()))
+
+def test_output_is_compact(backend):
+    output = ScheduleSerializer(make_schedule()).dumps()
+    assert ', ' not in output and '": ' not in output
+
+def test_ndjson_text_and_binary_output_are_identical(backend):
+    serializer = ScheduleSerializer(make_schedule())
+    binary_fp, text_fp = io.BytesIO(), io.StringIO()
+    serializer.dump_ndjson(binary_fp, granularity='placement')
+    serializer.dump_ndjson(text_fp, granularity='placement')
+    assert binary_fp.getvalue() == text_fp.getvalue().encode('utf-8')
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import datetime, random
+
+import pytest
+
+from py_matplanering.utilities import time_helper
+
+# Reference implementations: the parse/format versions which the ordinal based ones replaced.
+def reference_date_range(start_date: str, end_date: str) -> list:
+    dates = []
+    next_date = start_date
+    while next_date <= end_date:
+        dates.append(next_date)
+        next_date = (datetime.datetime.strptime(next_date, '%Y-%m-%d') + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+    return dates
+
+def reference_week_range(start_date: str, end_date: str) -> list:
+    week_range = []
+    week_buffer = []
+    prev_date = None
+    for cur_date in reference_date_range(start_date, end_date):
+        if prev_date and time_helper.get_week_number(cur_date) != time_helper.get_week_number(prev_date):
+            week_range.append(week_buffer)
+            week_buffer = []
+        week_buffer.append(cur_date)
+        prev_date = cur_date
+    if len(week_buffer) > 0:
+        week_range.append(week_buffer)
+    return week_range
+
+def random_intervals(n: int) -> list:
+    rnd = random.Random(5)
+    first = datetime.date(2015, 1, 1)
+    intervals = []
+    for _ in range(n):
+        start = first + datetime.timedelta(days=rnd.randrange(3000))
+        end = start + datetime.timedelta(days=rnd.choice([0, 1, 6, 7, 8, rnd.randrange(60), rnd.randrange(800)]))
+        intervals.append((start.isoformat(), end.isoformat()))
+    return intervals
+
+EDGE_INTERVALS = [
+    ('2020-02-27', '2020-03-02'), # leap day
+    ('2019-02-27', '2019-03-02'),
+    ('2020-12-27', '2021-01-11'), # ISO week 53
+    ('2018-12-30', '2019-01-01'), # ISO week 1 starts in previous year
+    ('2023-01-02', '2023-01-08'), # one whole week, monday to sunday
+    ('2023-01-01', '2023-01-01'),
+]
+
+@pytest.mark.parametrize('start_date, end_date', EDGE_INTERVALS + random_intervals(100))
+def test_ranges_match_reference(start_date, end_date):
+    assert time_helper.get_date_range(start_date, end_date) == reference_date_range(start_date, end_date)
+    assert time_helper.get_week_range(start_date, end_date) == reference_week_range(start_date, end_date)
+
+def test_reversed_interval():
+    with pytest.raises(Exception):
+        time_helper.get_date_range('2023-01-02', '2023-01-01')
+    assert time_helper.get_week_range('2023-01-02', '2023-01-01') == []
+
+def test_date_range_is_not_shared():
+    dates = time_helper.get_date_range('2023-01-01', '2023-01-03')
+    dates.append('2023-01-04')
+    assert time_helper.get_date_range('2023-01-01', '2023-01-03') == ['2023-01-01', '2023-01-02', '2023-01-03']
+
+def test_dates_are_interned():
+    first = time_helper.get_date_range('2023-05-01', '2023-05-10')
+    second = time_helper.get_week_range('2023-05-03', '2023-05-12')
+    assert first[2] is second[0][0]
+    assert time_helper.shift_date('2023-05-01', 2) is first[2]